@@ -43,10 +43,15 @@ app.get('/api/pddikti/reports', (req, res) => {
 });
 
 // 3. Hapus Laporan (Setelah divalidasi)
+// Dengan reportedAt hanya satu laporan yang dihapus: laporan lain ber-vcHash sama
+// (mis. dari kampus yang bukan penerbitnya) tetap di inbox untuk diperiksa manual.
 app.post('/api/pddikti/clear', (req, res) => {
-    const { hash } = req.body;
-    pddiktiInbox = pddiktiInbox.filter(item => item.vcHash !== hash);
-    res.json({ status: "cleared" });
+    const { hash, reportedAt } = req.body;
+    const before = pddiktiInbox.length;
+    pddiktiInbox = pddiktiInbox.filter(item =>
+        item.vcHash !== hash || (reportedAt !== undefined && item.reportedAt !== reportedAt)
+    );
+    res.json({ status: "cleared", removed: before - pddiktiInbox.length });
 });
 
 app.listen(PORT, () => {
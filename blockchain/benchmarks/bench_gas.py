@@ -0,0 +1,148 @@
+"""
+Benchmark gas anchoring ijazah di SimpleDIDRegistry (butuh Anvil).
+
+Men-deploy kontrak baru di node lokal, mendaftarkan & memverifikasi issuer,
+lalu mengukur gasUsed per ijazah untuk `issueCredential` (satu hash per
+transaksi) dan `issueCredentials` (array, jika ada di ABI) pada beberapa
+ukuran batch. Dengan `--baseline-rev`, kontrak dari revisi git tersebut
+di-compile (forge) dan diukur dengan cara yang sama untuk perbandingan.
+
+    anvil &
+    forge build
+    python benchmarks/bench_gas.py
+    python benchmarks/bench_gas.py --baseline-rev a184a32 --out data/bench_gas.json
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3 import Web3  # noqa: E402
+
+import utils  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTRACT_SOURCE = "src/SimpleDIDRegistry.sol"
+ARTIFACT = "out/SimpleDIDRegistry.sol/SimpleDIDRegistry.json"
+
+# Akun anvil #0 (deployer = Kemendikbud, sekaligus kampus yang diukur)
+DEPLOYER_PK = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+# --- ARTIFACT ---
+def load_artifact(path):
+    with open(path) as f:
+        artifact = json.load(f)
+    return artifact["abi"], artifact["bytecode"]["object"]
+
+def compile_revision(rev):
+    """Compile SimpleDIDRegistry.sol dari revisi git `rev` di direktori sementara."""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:./{CONTRACT_SOURCE}"], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    workdir = tempfile.mkdtemp(prefix="bench_gas_")
+    try:
+        os.makedirs(os.path.join(workdir, "src"))
+        shutil.copy(os.path.join(ROOT, "foundry.toml"), workdir)
+        with open(os.path.join(workdir, CONTRACT_SOURCE), "w") as f:
+            f.write(source)
+        subprocess.run(["forge", "build", "--root", workdir], check=True, capture_output=True)
+        return load_artifact(os.path.join(workdir, ARTIFACT))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+# --- TRANSAKSI ---
+class Chain:
+    def __init__(self, rpc_url, private_key):
+        self.w3 = Web3(Web3.HTTPProvider(rpc_url))
+        self.account = self.w3.eth.account.from_key(private_key)
+        self.chain_id = self.w3.eth.chain_id
+
+    def send(self, tx):
+        tx.setdefault("from", self.account.address)
+        tx["nonce"] = self.w3.eth.get_transaction_count(self.account.address, "pending")
+        tx["chainId"] = self.chain_id
+        tx.setdefault("gasPrice", self.w3.eth.gas_price)
+        tx.setdefault("gas", self.w3.eth.estimate_gas(tx))
+        signed = self.account.sign_transaction(tx)
+        receipt = self.w3.eth.wait_for_transaction_receipt(self.w3.eth.send_raw_transaction(signed.raw_transaction))
+        if receipt["status"] != 1:
+            raise RuntimeError(f"Transaksi revert: {receipt['transactionHash'].hex()}")
+        return receipt
+
+    def call(self, function):
+        return self.send(function.build_transaction({"from": self.account.address, "gas": 30_000_000}))
+
+    def deploy(self, abi, bytecode):
+        receipt = self.send({"data": bytecode})
+        contract = self.w3.eth.contract(address=receipt["contractAddress"], abi=abi)
+        self.call(contract.functions.registerDID(f"did:ethr:{self.account.address}", "Universitas Benchmark", "-"))
+        self.call(contract.functions.verifyIssuer(self.account.address))
+        return contract, receipt["gasUsed"]
+
+# --- PENGUKURAN ---
+def fresh_hashes(count):
+    return [os.urandom(32) for _ in range(count)]
+
+def measure(chain, abi, bytecode, singles, batch_sizes):
+    contract, deploy_gas = chain.deploy(abi, bytecode)
+    names = {item.get("name") for item in abi if item.get("type") == "function"}
+    cases = {}
+
+    gas = [chain.call(contract.functions.issueCredential(h))["gasUsed"] for h in fresh_hashes(singles)]
+    cases["issueCredential"] = {"credentials": singles, "gas_per_credential": round(sum(gas) / singles)}
+
+    if "issueCredentials" in names:
+        for size in batch_sizes:
+            hashes = fresh_hashes(size)
+            gas = chain.call(contract.functions.issueCredentials(hashes))["gasUsed"]
+            cases[f"issueCredentials[{size}]"] = {"credentials": size, "gas_per_credential": round(gas / size)}
+        # Separuh hash sudah ada: dilewati (bukan revert); gas dibagi hash yang baru tercatat
+        duplicates = fresh_hashes(max(batch_sizes[-1] // 2, 1))
+        chain.call(contract.functions.issueCredentials(duplicates))
+        gas = chain.call(contract.functions.issueCredentials(duplicates + fresh_hashes(len(duplicates))))["gasUsed"]
+        cases[f"issueCredentials[{len(duplicates) * 2}] 50% duplikat"] = {
+            "credentials": len(duplicates), "gas_per_credential": round(gas / len(duplicates)),
+        }
+    return {"deploy_gas": deploy_gas, "cases": cases}
+
+def print_results(results):
+    baseline = results.get("baseline", {}).get("cases", {}).get("issueCredential", {}).get("gas_per_credential")
+    print(f"{'kontrak':<10} {'kasus':<36} {'gas/ijazah':>12} {'vs baseline':>12}")
+    for label, result in results.items():
+        for case, row in result["cases"].items():
+            ratio = f"{baseline / row['gas_per_credential']:.2f}x" if baseline else ""
+            print(f"{label:<10} {case:<36} {row['gas_per_credential']:>12,} {ratio:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc-url", default=utils.RPC_URL)
+    parser.add_argument("--private-key", default=DEPLOYER_PK, help="Akun Anvil untuk deploy & anchoring")
+    parser.add_argument("--artifact", default=os.path.join(ROOT, ARTIFACT), help="Artifact kontrak saat ini (forge build)")
+    parser.add_argument("--baseline-rev", help="Revisi git kontrak pembanding (di-compile dengan forge)")
+    parser.add_argument("--singles", type=int, default=20, help="Jumlah transaksi issueCredential")
+    parser.add_argument("--batch-sizes", default="1,10,100,200", help="Ukuran batch issueCredentials")
+    parser.add_argument("--out", help="Simpan hasil (JSON)")
+    args = parser.parse_args()
+
+    chain = Chain(args.rpc_url, args.private_key)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+    results = {}
+    if args.baseline_rev:
+        results["baseline"] = measure(chain, *compile_revision(args.baseline_rev), args.singles, batch_sizes)
+        results["baseline"]["rev"] = args.baseline_rev
+    results["current"] = measure(chain, *load_artifact(args.artifact), args.singles, batch_sizes)
+
+    print_results(results)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Hasil disimpan ke {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Micro-benchmark jalur panas kriptografi & serialisasi.
+
+Mengukur throughput dan persentil latency untuk kanonikalisasi JSON,
+hash Keccak, signing EIP-191, ecrecover, serta load_db/save_db wallet
+pada ukuran credential yang realistis. Tidak butuh node blockchain.
+
+    python benchmarks/bench_hotpaths.py                       # jalankan & tampilkan
+    python benchmarks/bench_hotpaths.py --out hasil.json      # simpan hasil
+    python benchmarks/bench_hotpaths.py --baseline benchmarks/baseline.json
+    python benchmarks/bench_hotpaths.py --save-baseline benchmarks/baseline.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import selective_disclosure  # noqa: E402
+import token_codec  # noqa: E402
+import utils  # noqa: E402
+
+# Akun anvil #0 (sama dengan issuer_app) & #1 (holder_app)
+ISSUER_PK = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+ISSUER_DID = "did:ethr:0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+HOLDER_DID = "did:ethr:0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+
+# --- FIXTURE CREDENTIAL ---
+def make_degree(name="Mahasiswa"):
+    return {
+        "@context": ["https://www.w3.org/2018/credentials/v1"],
+        "id": f"urn:uuid:{uuid.uuid4()}",
+        "type": ["VerifiableCredential", "UniversityDegreeCredential"],
+        "issuer": ISSUER_DID,
+        "issuanceDate": "2025-11-24T02:40:12.890096+00:00",
+        "credentialSubject": {
+            "id": HOLDER_DID,
+            "data": {"name": name, "degree": "Sarjana Komputer (S.Kom)", "university": "Universitas Pendidikan Indonesia"},
+        },
+    }
+
+def make_transcript(courses=150):
+    vc = make_degree()
+    vc["type"].append("AcademicTranscriptCredential")
+    vc["credentialSubject"]["data"]["courses"] = [
+        {"code": f"IK{100 + i}", "title": f"Mata Kuliah Informatika {i}", "credits": 3, "grade": "A", "semester": 1 + i % 8}
+        for i in range(courses)
+    ]
+    return vc
+
+def make_signed(credential):
+    return {
+        "credential": credential,
+        "proof": {
+            "type": "EcdsaSecp256k1Signature2019",
+            "verificationMethod": f"{ISSUER_DID}#controller",
+            "jws": utils.sign_data(credential, ISSUER_PK),
+        },
+    }
+
+def make_vp(n_vcs):
+    return {
+        "@context": ["https://www.w3.org/2018/credentials/v1"],
+        "type": ["VerifiablePresentation"],
+        "verifiableCredential": [make_signed(make_degree(f"Mahasiswa {i}")) for i in range(n_vcs)],
+        "holder": HOLDER_DID,
+    }
+
+# --- RUNNER ---
+def measure(fn, min_time=0.5, min_runs=20, max_runs=100000):
+    """Jalankan `fn` berulang; return statistik latency (mikrodetik) & throughput."""
+    fn()  # warm-up
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_runs:
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append((time.perf_counter_ns() - t0) / 1000)
+        if len(samples) >= min_runs and time.perf_counter() - started >= min_time:
+            break
+    samples.sort()
+
+    def pct(p):
+        return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+    return {
+        "runs": len(samples),
+        "ops_per_sec": round(1e6 / statistics.fmean(samples), 2),
+        "p50_us": round(pct(50), 2),
+        "p95_us": round(pct(95), 2),
+        "p99_us": round(pct(99), 2),
+    }
+
+def crypto_cases():
+    signer = utils.get_signer(ISSUER_PK)
+    payloads = {
+        "degree": make_degree(),
+        "transcript": make_transcript(),
+        "vp_1": make_vp(1),
+        "vp_10": make_vp(10),
+        "vp_100": make_vp(100),
+    }
+    for label, payload in payloads.items():
+        signature = utils.sign_data(payload, ISSUER_PK)
+        yield f"canonicalize/{label}", lambda p=payload: utils.CanonicalJSON(p).payload
+        yield f"hash_json/{label}", lambda p=payload: utils.hash_json(p)
+        # CanonicalJSON yang sama dipakai ulang: digest sudah di-memo pada objeknya
+        yield f"hash_json_memo/{label}", lambda c=utils.CanonicalJSON(payload): utils.hash_json(c)
+        yield f"sign_data/{label}", lambda p=payload: utils.sign_data(p, ISSUER_PK)
+        yield f"signer_sign/{label}", lambda p=payload: signer.sign(p)
+        yield f"verify_signature/{label}", lambda p=payload, s=signature: utils.verify_signature(p, s)
+        # Tanpa cache: biaya ecrecover murni per signature
+        yield f"recover_uncached/{label}", lambda p=payload, s=signature: (utils._recovery_cache.clear(), utils.verify_signature(p, s))
+
+def batch_sign_cases():
+    # Sign 100 ijazah sekaligus (serial vs process pool)
+    signer = utils.get_signer(ISSUER_PK)
+    degrees = [make_degree(f"Mahasiswa {i}") for i in range(100)]
+    yield "sign_many/100/serial", lambda: signer.sign_many(degrees, parallel=False)
+    yield "sign_many/100/parallel", lambda: signer.sign_many(degrees, parallel=True)
+
+def codec_cases():
+    # Token ringkas (CBOR + base45) vs JSON pretty-print yang biasa di-paste
+    for label, token in (("vc", make_signed(make_degree())), ("vp_10", {"presentation": make_vp(10)})):
+        pretty = json.dumps(token, indent=4)
+        text = token_codec.to_text(token)
+        yield f"json_loads/{label}", lambda t=pretty: json.loads(t)
+        yield f"codec_to_text/{label}", lambda t=token: token_codec.to_text(t)
+        yield f"codec_from_text/{label}", lambda t=text: token_codec.from_text(t)
+
+def sd_cases():
+    # Selective disclosure transkrip (~750 field): terbit, buka 22 field, verifikasi
+    signer = utils.get_signer(ISSUER_PK)
+    data = make_transcript()["credentialSubject"]["data"]
+    sd_data = selective_disclosure.create_sd_payload(signer, data)
+    vc = selective_disclosure.build_sd_credential(ISSUER_DID, HOLDER_DID, sd_data, "2025-11-24T02:40:12Z")
+    keys = ["name", "degree"] + [f"courses.{i}.grade" for i in range(20)]
+    vp = selective_disclosure.create_presentation(vc, keys)
+    yield "sd_issue/transcript", lambda: selective_disclosure.create_sd_payload(signer, data)
+    yield "sd_present/transcript", lambda: selective_disclosure.create_presentation(vc, keys)
+    yield "sd_verify/transcript", lambda: selective_disclosure.verify_presentation(vp)
+
+def wallet_cases(workdir):
+    # utils.load_db / save_db memakai path relatif "data/"
+    os.chdir(workdir)
+    for size in (10, 100, 1000):
+        wallet = {"credentials": [make_signed(make_degree(f"Mahasiswa {i}")) for i in range(size)]}
+        filename = f"bench_wallet_{size}.json"
+        utils.save_db(filename, wallet)
+        yield f"save_db/{size}", lambda f=filename, w=wallet: utils.save_db(f, w)
+        yield f"load_db/{size}", lambda f=filename: utils.load_db(f)
+
+def run_all(min_time, only=None):
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            cases = list(crypto_cases()) + list(batch_sign_cases()) + list(codec_cases()) + list(sd_cases())
+            for name, fn in cases + list(wallet_cases(workdir)):
+                if only and only not in name:
+                    continue
+                results[name] = measure(fn, min_time=min_time)
+                r = results[name]
+                print(f"{name:32s} {r['ops_per_sec']:>12,.1f} ops/s  p50 {r['p50_us']:>10,.1f}µs  "
+                      f"p95 {r['p95_us']:>10,.1f}µs  p99 {r['p99_us']:>10,.1f}µs")
+        finally:
+            os.chdir(cwd)
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+# --- PERBANDINGAN DENGAN BASELINE ---
+def compare(current, baseline, threshold):
+    """Return daftar regresi: kasus yang p50-nya lebih lambat > threshold dari baseline."""
+    regressions = []
+    for name, base in baseline["results"].items():
+        now = current["results"].get(name)
+        if not now:
+            continue
+        ratio = now["p50_us"] / base["p50_us"] if base["p50_us"] else 1.0
+        marker = "🔴" if ratio > 1 + threshold else ("🟢" if ratio < 1 - threshold else "⚪")
+        print(f"{marker} {name:32s} p50 {base['p50_us']:>10,.1f}µs -> {now['p50_us']:>10,.1f}µs ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-time", type=float, default=0.5, help="Durasi minimum per kasus (detik)")
+    parser.add_argument("--only", help="Hanya jalankan kasus yang namanya mengandung teks ini")
+    parser.add_argument("--out", help="Simpan hasil (JSON)")
+    parser.add_argument("--baseline", help="Bandingkan dengan file baseline (JSON)")
+    parser.add_argument("--save-baseline", help="Simpan hasil sebagai baseline baru")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Toleransi regresi p50 (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    current = run_all(args.min_time, args.only)
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(current, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(current, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ Regresi performa: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ Tidak ada regresi dibanding baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+Load test end-to-end terhadap Anvil lokal.
+
+Men-deploy SimpleDIDRegistry baru, membuat populasi issuer (kampus
+terverifikasi), holder (mahasiswa) dan verifier (HR), lalu menjalankan
+campuran operasi pada laju target (open-loop, per operasi/detik):
+
+    issue    kampus menerbitkan & meng-anchor satu ijazah (issueCredential)
+    revoke   kampus mencabut salah satu ijazahnya (revokeCredential)
+    present  mahasiswa membuat VP ringkas dari 1-3 ijazahnya
+    verify   HR memverifikasi VP terbaru (verification.verify_token)
+
+Semua operasi memakai jalur kode yang sama dengan aplikasi (issuance,
+presentation, verification, utils.Signer, StatusCache, BatchingHTTPProvider).
+Latency diukur dari waktu operasi DIJADWALKAN (antrean ikut terhitung).
+
+    forge build
+    python benchmarks/bench_load.py --anvil --duration 30
+    python benchmarks/bench_load.py --rates issue=50,revoke=5,present=50,verify=200 --out data/load/run.json
+    python benchmarks/bench_load.py --anvil --baseline data/load/run.json
+"""
+import argparse
+import collections
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web3 import Web3  # noqa: E402
+from web3.middleware import Web3Middleware  # noqa: E402
+
+import issuance  # noqa: E402
+import presentation  # noqa: E402
+import utils  # noqa: E402
+import verification  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OPERATIONS = ("issue", "revoke", "present", "verify")
+DEFAULT_RATES = "issue=10,revoke=1,present=10,verify=20"
+FUNDING_WEI = 10 ** 24
+PRESENTATION_POOL = 1000   # VP terbaru yang bisa diambil verifier
+
+# --- NODE ---
+def start_anvil(rpc_url, block_time=None, timeout=15.0):
+    """Jalankan anvil di port dari `rpc_url`; return proses (dimatikan pemanggil)."""
+    port = rpc_url.rsplit(":", 1)[-1].split("/")[0]
+    command = ["anvil", "--port", port, "--silent"] + (["--block-time", str(block_time)] if block_time else [])
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    probe = Web3(Web3.HTTPProvider(rpc_url))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"anvil berhenti (exit {process.returncode}); port {port} sudah dipakai?")
+        if probe.is_connected():
+            return process
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("anvil tidak merespons")
+
+# RPC logis per operasi: dihitung per thread sebelum BatchingHTTPProvider menggabungkannya
+_op_state = threading.local()
+
+class OpCallCounter(Web3Middleware):
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            if getattr(_op_state, "calls", None) is not None:
+                _op_state.calls += 1
+            return make_request(method, params)
+        return middleware
+
+def attach(rpc_url):
+    """Arahkan utils.w3 (dan semua modul yang memakainya) ke node `rpc_url`."""
+    utils.RPC_URL = rpc_url
+    utils.w3 = Web3(utils._build_provider(rpc_url))
+    utils.w3.middleware_onion.add(utils.RPCMetricsMiddleware, name="rpc_metrics")
+    utils.w3.middleware_onion.add(OpCallCounter, name="op_calls")
+    if not utils.w3.is_connected():
+        raise RuntimeError(f"Node {rpc_url} tidak bisa dihubungi")
+
+def new_key():
+    return "0x" + os.urandom(32).hex()
+
+# --- AKTOR ---
+class Actor:
+    """Akun on-chain dengan nonce lokal (transaksi paralel dari satu akun)."""
+
+    def __init__(self, contract, gas_price, chain_id, signer=None):
+        self.contract = contract
+        self.signer = signer or utils.get_signer(new_key())
+        self.address = self.signer.address
+        self.did = self.signer.did
+        self.gas_price = gas_price
+        self.chain_id = chain_id
+        self._nonce = None
+        self._lock = threading.Lock()
+        utils.w3.provider.make_request("anvil_setBalance", [self.address, hex(FUNDING_WEI)])
+
+    def transact(self, function, args, gas=300000):
+        """Kirim transaksi & tunggu receipt; nonce dialokasikan di bawah lock, receipt ditunggu di luar."""
+        with self._lock:
+            if self._nonce is None:
+                self._nonce = utils.w3.eth.get_transaction_count(self.address, 'pending')
+            tx = {
+                'to': self.contract.address,
+                'data': self.contract.encode_abi(function, args=args),
+                'value': 0,
+                'nonce': self._nonce,
+                'gas': gas,
+                'gasPrice': self.gas_price,
+                'chainId': self.chain_id,
+            }
+            try:
+                tx_hash = utils.w3.eth.send_raw_transaction(self.signer.sign_transaction(tx).raw_transaction)
+            except Exception:
+                self._nonce = None   # sinkron ulang dari node pada transaksi berikutnya
+                raise
+            self._nonce += 1
+        receipt = utils.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120, poll_latency=0.05)
+        if receipt['status'] != 1:
+            raise RuntimeError(f"{function} revert")
+        return receipt
+
+class Issuer(Actor):
+    def __init__(self, contract, gas_price, chain_id, index):
+        super().__init__(contract, gas_price, chain_id)
+        self.name = f"Universitas Beban {index}"
+        self.issued = []          # vc_hash yang masih aktif (bisa dicabut)
+        self._issued_lock = threading.Lock()
+
+    def issue(self, holder):
+        payload = issuance.build_credential_payload(
+            self.did, holder.did, f"Mahasiswa {random.randrange(10 ** 6)}", "Sarjana Komputer (S.Kom)"
+        )
+        canonical = utils.canonicalize(payload)
+        vc_hash = utils.hash_json(canonical)
+        self.transact("issueCredential", [vc_hash])
+        holder.receive(issuance.wrap_credential(payload, self.signer.sign(canonical), self.did))
+        with self._issued_lock:
+            self.issued.append(vc_hash)
+
+    def revoke(self):
+        with self._issued_lock:
+            if not self.issued:
+                return False
+            vc_hash = self.issued.pop(random.randrange(len(self.issued)))
+        self.transact("revokeCredential", [vc_hash, "load test"])
+        return True
+
+class Holder:
+    def __init__(self):
+        self.signer = utils.get_signer(new_key())
+        self.did = self.signer.did
+        self.credentials = []
+        self._lock = threading.Lock()
+
+    def receive(self, vc):
+        with self._lock:
+            self.credentials.append(vc)
+
+    def present(self, audience, nonce):
+        with self._lock:
+            if not self.credentials:
+                return None
+            chosen = random.sample(self.credentials, min(len(self.credentials), random.randint(1, 3)))
+        token, _ = presentation.build_compact_presentation(self.signer, self.did, chosen, audience=audience, nonce=nonce)
+        return token
+
+class DirectStatus:
+    """resolve_batch langsung ke node tanpa StatusCache (--no-status-cache)."""
+
+    def __init__(self, contract):
+        self.contract = contract
+
+    def resolve_batch(self, issuer_addrs, vc_hashes):
+        return utils.resolve_batch(self.contract, issuer_addrs, vc_hashes)
+
+# --- SKENARIO ---
+class Scenario:
+    def __init__(self, contract, deployer, issuers, holders, verifiers, status_source):
+        self.contract = contract
+        self.deployer = deployer
+        self.issuers = issuers
+        self.holders = holders
+        self.verifiers = verifiers
+        self.status_source = status_source
+        self.presentations = collections.deque(maxlen=PRESENTATION_POOL)
+        self.verdicts = collections.Counter()
+
+    def op_issue(self):
+        random.choice(self.issuers).issue(random.choice(self.holders))
+        return True
+
+    def op_revoke(self):
+        return random.choice(self.issuers).revoke()
+
+    def op_present(self):
+        # Verifier memberi tantangan (audience + nonce); token diverifikasi dengan tantangan yang sama
+        audience, nonce = random.choice(self.verifiers), os.urandom(16).hex()
+        token = random.choice(self.holders).present(audience, nonce)
+        if token is None:
+            return False
+        self.presentations.append((token, audience, nonce))
+        return True
+
+    def op_verify(self):
+        try:
+            token, audience, nonce = random.choice(self.presentations)
+        except IndexError:
+            return False
+        report = verification.verify_token(token, self.status_source, audience=audience, nonce=nonce)
+        self.verdicts["passed" if report["all_passed"] else "rejected"] += 1
+        return True
+
+def setup(args, gas_price):
+    """Deploy registry, daftarkan & verifikasi issuer, lalu terbitkan ijazah awal."""
+    with open(utils.ARTIFACT_PATH) as f:
+        artifact = json.load(f)
+    deployer = utils.get_signer(new_key())
+    utils.w3.provider.make_request("anvil_setBalance", [deployer.address, hex(FUNDING_WEI)])
+    chain_id = utils.w3.eth.chain_id
+    tx = {
+        'data': artifact["bytecode"]["object"], 'value': 0, 'gas': 8_000_000, 'gasPrice': gas_price,
+        'nonce': utils.w3.eth.get_transaction_count(deployer.address), 'chainId': chain_id,
+    }
+    receipt = utils.w3.eth.wait_for_transaction_receipt(
+        utils.w3.eth.send_raw_transaction(deployer.sign_transaction(tx).raw_transaction)
+    )
+    utils.REGISTRY_CONTRACT_ADDRESS = receipt["contractAddress"]
+    contract = utils.get_contract()
+
+    admin = Actor(contract, gas_price, chain_id, signer=deployer)   # deployer = Kemendikbud
+    issuers = [Issuer(contract, gas_price, chain_id, i) for i in range(args.issuers)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda i: i.transact("registerDID", [i.did, i.name, "-"], gas=500000), issuers))
+        list(pool.map(lambda i: admin.transact("verifyIssuer", [i.address]), issuers))
+
+    holders = [Holder() for _ in range(args.holders)]
+    verifiers = [f"PT Verifier {i}" for i in range(args.verifiers)]
+    status_source = DirectStatus(contract) if args.no_status_cache else utils.get_status_cache(contract)
+    scenario = Scenario(contract, admin, issuers, holders, verifiers, status_source)
+
+    # Ijazah awal agar present/verify/revoke langsung punya data
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        list(pool.map(lambda _: scenario.op_issue(), range(args.seed_credentials)))
+    for _ in range(min(args.seed_credentials, PRESENTATION_POOL)):
+        scenario.op_present()
+    return scenario
+
+# --- PENCATAT HASIL ---
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = collections.defaultdict(list)   # op -> [ms sejak dijadwalkan]
+        self.service = collections.defaultdict(list)   # op -> [ms eksekusi]
+        self.calls = collections.defaultdict(int)      # op -> total RPC logis
+        self.status = collections.defaultdict(collections.Counter)
+        self.errors = collections.defaultdict(collections.Counter)
+
+    def record(self, op, status, scheduled, started, calls, error=None):
+        now = time.perf_counter()
+        with self._lock:
+            self.status[op][status] += 1
+            if status == "ok":
+                self.latency[op].append((now - scheduled) * 1000)
+                self.service[op].append((now - started) * 1000)
+                self.calls[op] += calls
+            elif error:
+                self.errors[op][error[:160]] += 1
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))]
+
+def run_op(scenario, recorder, op, scheduled):
+    started = time.perf_counter()
+    _op_state.calls = 0
+    try:
+        done = getattr(scenario, f"op_{op}")()
+        recorder.record(op, "ok" if done else "skipped", scheduled, started, _op_state.calls)
+    except Exception as e:
+        recorder.record(op, "failed", scheduled, started, 0, f"{type(e).__name__}: {e}")
+    finally:
+        _op_state.calls = None
+
+def drive(scenario, rates, duration, concurrency, poisson):
+    """Penjadwal open-loop: satu thread per operasi, eksekusi di thread pool bersama."""
+    recorder = Recorder()
+    start = time.perf_counter()
+    end = start + duration
+
+    def schedule(op, rate, pool):
+        scheduled = start
+        while True:
+            scheduled += random.expovariate(rate) if poisson else 1.0 / rate
+            if scheduled >= end:
+                return
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(run_op, scenario, recorder, op, scheduled)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        threads = [threading.Thread(target=schedule, args=(op, rate, pool), daemon=True)
+                   for op, rate in rates.items() if rate > 0]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return recorder, time.perf_counter() - start
+
+def summarize(recorder, rates, elapsed):
+    operations = {}
+    for op, rate in rates.items():
+        latency = sorted(recorder.latency[op])
+        service = sorted(recorder.service[op])
+        status = recorder.status[op]
+        operations[op] = {
+            "target_per_s": rate,
+            "ok": status["ok"],
+            "skipped": status["skipped"],
+            "failed": status["failed"],
+            "throughput_per_s": round(status["ok"] / elapsed, 2),
+            "p50_ms": round(percentile(latency, 50), 2),
+            "p95_ms": round(percentile(latency, 95), 2),
+            "p99_ms": round(percentile(latency, 99), 2),
+            "max_ms": round(latency[-1], 2) if latency else 0.0,
+            "service_p50_ms": round(percentile(service, 50), 2),
+            "rpc_calls_per_op": round(recorder.calls[op] / status["ok"], 2) if status["ok"] else 0.0,
+            "errors": dict(recorder.errors[op].most_common(5)),
+        }
+
+    counters = dict(utils.metrics.counters)
+    http = {dict(labels).get("kind"): value for (name, labels), value in counters.items() if name == "rpc_http_requests_total"}
+    methods = {dict(labels)["method"]: hist.count for (name, labels), hist in utils.metrics.histograms.items()
+               if name == "rpc_request_seconds"}
+    total_ok = sum(row["ok"] for row in operations.values())
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "operations": operations,
+        "rpc": {
+            "calls": sum(methods.values()),
+            "http_requests": http,
+            "batched_calls": sum(v for (name, _), v in counters.items() if name == "rpc_batched_calls_total"),
+            "http_requests_per_op": round(sum(http.values()) / total_ok, 2) if total_ok else 0.0,
+            "methods": dict(sorted(methods.items(), key=lambda item: -item[1])),
+        },
+    }
+
+def print_summary(result):
+    print(f"\n{'operasi':<9} {'target/s':>9} {'ok/s':>8} {'ok':>7} {'gagal':>6} {'skip':>6} "
+          f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rpc/op':>7}")
+    for op, row in result["operations"].items():
+        print(f"{op:<9} {row['target_per_s']:>9} {row['throughput_per_s']:>8} {row['ok']:>7} {row['failed']:>6} "
+              f"{row['skipped']:>6} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {row['rpc_calls_per_op']:>7}")
+        for error, count in row["errors"].items():
+            print(f"   ⚠️ {count}x {error}")
+    rpc = result["rpc"]
+    print(f"\n📡 {rpc['calls']:,} panggilan RPC • HTTP {rpc['http_requests']} • {rpc['http_requests_per_op']} request/op "
+          f"• {rpc['batched_calls']:,} panggilan di dalam batch")
+
+# --- PERBANDINGAN DENGAN BASELINE ---
+def compare(current, baseline, threshold):
+    """Return operasi yang throughput-nya turun atau p95-nya naik lebih dari threshold."""
+    regressions = []
+    for op, base in baseline["operations"].items():
+        now = current["operations"].get(op)
+        if not now or not base["ok"]:
+            continue
+        tput = now["throughput_per_s"] / base["throughput_per_s"] if base["throughput_per_s"] else 1.0
+        p95 = now["p95_ms"] / base["p95_ms"] if base["p95_ms"] else 1.0
+        worse = tput < 1 - threshold or p95 > 1 + threshold
+        print(f"{'🔴' if worse else '⚪'} {op:<8} ok/s {base['throughput_per_s']:>8} -> {now['throughput_per_s']:>8} "
+              f"({tput:.2f}x)  p95 {base['p95_ms']:>9} -> {now['p95_ms']:>9} ms ({p95:.2f}x)")
+        if worse:
+            regressions.append(op)
+    return regressions
+
+def parse_rates(text):
+    rates = {}
+    for part in text.split(","):
+        op, _, rate = part.partition("=")
+        if op.strip() not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"Operasi tidak dikenal: {op} (pilihan: {', '.join(OPERATIONS)})")
+        rates[op.strip()] = float(rate)
+    return rates
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpc-url", default=utils.RPC_URL)
+    parser.add_argument("--anvil", action="store_true", help="Jalankan anvil sendiri (default: pakai node yang sudah jalan)")
+    parser.add_argument("--block-time", type=float, help="Diteruskan ke anvil (default: automine)")
+    parser.add_argument("--issuers", type=int, default=4)
+    parser.add_argument("--holders", type=int, default=100)
+    parser.add_argument("--verifiers", type=int, default=10)
+    parser.add_argument("--seed-credentials", type=int, default=50, help="Ijazah yang diterbitkan sebelum pengukuran")
+    parser.add_argument("--rates", type=parse_rates, default=DEFAULT_RATES, help="Laju target per operasi/detik")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durasi pengukuran (detik)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Operasi paralel maksimum")
+    parser.add_argument("--poisson", action="store_true", help="Kedatangan acak (Poisson) alih-alih interval tetap")
+    parser.add_argument("--no-status-cache", action="store_true", help="Verifier membaca status langsung ke node")
+    parser.add_argument("--out", help="Simpan hasil (JSON)")
+    parser.add_argument("--baseline", help="Bandingkan dengan hasil run sebelumnya (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Toleransi regresi (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)   # utils.ARTIFACT_PATH relatif terhadap folder blockchain/
+    node = start_anvil(args.rpc_url, args.block_time) if args.anvil else None
+    try:
+        attach(args.rpc_url)
+        gas_price = 2 * utils.w3.eth.gas_price
+        print(f"⚙️ Setup: deploy registry, {args.issuers} issuer, {args.holders} holder, "
+              f"{args.seed_credentials} ijazah awal...")
+        scenario = setup(args, gas_price)
+        print(f"🚀 Registry {scenario.contract.address} • {args.duration:.0f} detik • laju {args.rates}")
+
+        utils.metrics.reset()
+        recorder, elapsed = drive(scenario, args.rates, args.duration, args.concurrency, args.poisson)
+        result = summarize(recorder, args.rates, elapsed)
+        result["verdicts"] = dict(scenario.verdicts)
+        result["meta"] = {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "git_rev": subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("out", "baseline")},
+        }
+    finally:
+        if node is not None:
+            node.terminate()
+
+    print_summary(result)
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"💾 Hasil disimpan ke {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n❌ Regresi: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✅ Tidak ada regresi dibanding baseline.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import presentation
+import token_codec
+import utils
+import verification
+
+REPORT_FIELDS = ["applicant", "holder", "type", "documents", "passed", "failed",
+                 "all_passed", "issues", "block", "error"]
+STATUS_CHUNK = 500   # kunci per panggilan resolveBatch (batas gas eth_call)
+
+# --- BACA TOKEN PELAMAR (JSONL / ZIP) ---
+def _entry(label, data):
+    # Baris boleh berupa token langsung atau {"applicant": "...", "token": {...}}
+    if isinstance(data, dict) and "token" in data:
+        return str(data.get("applicant") or label), data["token"]
+    return label, data
+
+def _read_lines(handle, label):
+    for number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield _entry(f"{label}:{number}", token_codec.loads(line))
+        except (ValueError, RecursionError) as e:   # JSON / token ringkas (SSI1:...) rusak atau terlalu dalam
+            yield f"{label}:{number}", e
+
+def read_tokens(source):
+    """
+    Generator (applicant, token) dari file JSONL (satu token per baris)
+    atau ZIP berisi file .json (satu token) / .jsonl. `source` boleh path
+    atau file-like. Token yang gagal di-parse di-yield sebagai exception.
+    """
+    name = str(source) if isinstance(source, (str, os.PathLike)) else getattr(source, "name", "")
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            for member in archive.namelist():
+                if member.endswith(".jsonl"):
+                    with archive.open(member) as f:
+                        yield from _read_lines(io.TextIOWrapper(f, encoding="utf-8"), member)
+                elif member.endswith(".json"):
+                    try:
+                        yield _entry(member, token_codec.loads(archive.read(member)))
+                    except (ValueError, RecursionError) as e:
+                        yield member, e
+        return
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as f:
+            yield from _read_lines(f, os.path.basename(name))
+    else:
+        handle = source
+        if isinstance(handle.read(0), bytes):
+            handle = io.TextIOWrapper(handle, encoding="utf-8")
+        yield from _read_lines(handle, name or "input")
+
+# --- WORKER (process terpisah) ---
+def _init_worker():
+    # Worker sudah paralel per proses; jangan buka process pool recovery lagi di dalamnya
+    utils.PARALLEL_RECOVERY_MIN = float("inf")
+
+def _describe_issues(verdict):
+    issues = []
+    if not verdict["signature_valid"]:
+        issues.append("signature tidak valid")
+    if not (verdict["issuer"]["active"] and verdict["issuer"]["verified"]):
+        issues.append("penerbit tidak terverifikasi")
+    if verdict["merkle_ok"] is False:
+        issues.append("bukti Merkle tidak cocok")
+    if verdict["digest_ok"] is False:
+        issues.append("isi bundle tidak cocok dengan digest")
+    if verdict["holder_bound"] is False:
+        issues.append("credentialSubject.id bukan milik holder")
+    if verdict["status"] == "revoked":
+        issues.append("dicabut")
+    elif verdict["status"] == "unregistered":
+        issues.append("belum ter-anchor")
+    return f"#{verdict['index']} " + ", ".join(issues) if issues else ""
+
+# --- VERIFIKASI MASSAL ---
+class BulkVerifier:
+    """
+    Verifikasi ribuan token pelamar sekaligus.
+
+    Credential identik (isi kanonik + signature sama) di seluruh batch hanya
+    diproses sekali: hash, recover signature dan bukti Merkle dikerjakan di
+    worker process, dan setiap issuer / hash hanya di-resolve sekali lewat
+    `status_source.resolve_batch` (hasilnya dipakai bersama semua pelamar).
+    Token diproses per `chunk_size` sehingga hasil & progres muncul bertahap.
+    VP ringkas dicek terhadap tantangan `audience` & `nonce` satu angkatan
+    (yang diumumkan verifier ke seluruh pelamar).
+    """
+
+    def __init__(self, status_source, revocations=None, workers=None, chunk_size=256, audience=None, nonce=None):
+        self.status_source = status_source
+        self.revocations = revocations
+        self.audience = audience
+        self.nonce = nonce
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+        self.documents = {}          # (vc_hash, jws) -> dokumen hasil prepare_document
+        self.issuer_status = {}
+        self.credential_status = {}
+        self.block = None
+        self.stats = {"tokens": 0, "credentials": 0, "unique_credentials": 0,
+                      "resolved_issuers": 0, "resolved_hashes": 0, "seconds": 0.0, "tokens_per_sec": 0.0}
+
+    # --- Tahap 1: parse & dedupe ---
+    def _parse_chunk(self, entries, queued):
+        """Return (daftar pelamar, VC unik baru). `queued` = kunci yang sudah dijadwalkan."""
+        applicants, fresh = [], []
+        for applicant, token in entries:
+            row = {"applicant": applicant, "keys": [], "info": None, "error": ""}
+            applicants.append(row)
+            if isinstance(token, Exception):
+                row["error"] = f"Format JSON Error: {token}"
+                continue
+            try:
+                info = verification.parse_token(token, audience=self.audience, nonce=self.nonce)
+                digests = info.get("digests") or [None] * len(info["credentials"])
+                if None in info["credentials"]:
+                    raise verification.TokenFormatError("Bundle VP ringkas tidak lengkap.")
+                for vc, digest in zip(info["credentials"], digests):
+                    # Isi VC diserialisasi sekali di sini; worker memakai ulang bentuk kanoniknya
+                    content, proof = verification.split_credential(vc)
+                    canonical = utils.canonicalize(content)
+                    if digest is None:
+                        key = (bytes(canonical.digest), proof["jws"])
+                    else:
+                        # VP ringkas: digest (isi + proof) jadi kunci dedupe, asal isi bundle cocok
+                        actual = presentation.credential_digest(vc, canonical)
+                        key = (digest,) if actual == digest else (digest, actual)
+                    row["keys"].append(key)
+                    if key not in queued:
+                        queued.add(key)
+                        fresh.append((key, vc, digest, canonical))
+                row["info"] = info
+            except Exception as e:
+                row["error"] = str(e) if isinstance(e, verification.TokenFormatError) else f"Token tidak valid: {e}"
+            self.stats["credentials"] += len(row["keys"])
+        return applicants, fresh
+
+    # --- Tahap 2: status on-chain (hanya kunci yang belum pernah di-resolve) ---
+    def _resolve(self, documents):
+        issuers, hashes = verification.status_keys(documents)
+        issuers = list(dict.fromkeys(a for a in issuers if a not in self.issuer_status))
+        hashes = list(dict.fromkeys(bytes(h) for h in hashes if bytes(h) not in self.credential_status))
+        if self.revocations is not None:
+            leaf_keys = verification.revocation_keys(documents)
+            self.credential_status.update(self.revocations.known_status([h for h in hashes if h not in leaf_keys]))
+            hashes = [h for h in hashes if h not in self.credential_status]
+
+        while issuers or hashes:
+            issuer_part, hashes_part = issuers[:STATUS_CHUNK], hashes[:STATUS_CHUNK]
+            issuers, hashes = issuers[STATUS_CHUNK:], hashes[STATUS_CHUNK:]
+            issuer_status, credential_status, self.block = self.status_source.resolve_batch(issuer_part, hashes_part)
+            self.issuer_status.update(issuer_status)
+            self.credential_status.update(credential_status)
+            self.stats["resolved_issuers"] += len(issuer_status)
+            self.stats["resolved_hashes"] += len(credential_status)
+
+    # --- Tahap 3: verdict per pelamar ---
+    def _report(self, row):
+        result = {"applicant": row["applicant"], "holder": "", "type": "", "documents": 0, "passed": 0,
+                  "failed": 0, "all_passed": False, "issues": "", "block": self.block, "error": row["error"]}
+        if row["info"] is None:
+            return result, []
+
+        documents = [self.documents[key] for key in row["keys"]]
+        report = verification.build_report(row["info"], documents, self.issuer_status,
+                                           self.credential_status, self.block)
+        verdicts = report["documents"]
+        passed = sum(v["passed"] for v in verdicts)
+        issues = [_describe_issues(v) for v in verdicts]
+        if report["holder_valid"] is False:
+            issues.insert(0, "signature holder tidak valid")
+        if report["challenge_valid"] is False:
+            issues.insert(0, "audience / nonce tidak cocok")
+        result.update(
+            holder=report["holder"] or "", type=report["type"], documents=len(verdicts),
+            passed=passed, failed=len(verdicts) - passed, all_passed=report["all_passed"],
+            issues="; ".join(filter(None, issues)),
+        )
+        return result, verdicts
+
+    def _finish_chunk(self, applicants, futures):
+        prepared = []
+        for keys, future in futures:
+            documents = future.result()
+            self.documents.update(zip(keys, documents))
+            prepared.extend(documents)
+        self._resolve(prepared)
+        for row in applicants:
+            yield self._report(row)
+
+    def _chunks(self, entries):
+        chunk = []
+        for entry in entries:
+            chunk.append(entry)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def run(self, entries, on_progress=None):
+        """
+        Generator `(result, verdicts)` per pelamar (urutan input). `result`
+        adalah baris laporan (REPORT_FIELDS), `verdicts` verdict per dokumen.
+        `on_progress(stats)` dipanggil setelah setiap chunk selesai.
+        """
+        started = time.perf_counter()
+        queued = set()
+        window = deque()
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                       mp_context=multiprocessing.get_context("spawn"))
+        try:
+            for chunk in self._chunks(entries):
+                applicants, fresh = self._parse_chunk(chunk, queued)
+                self.stats["unique_credentials"] += len(fresh)
+
+                # Bagi VC unik ke semua worker; tanpa pool dikerjakan di proses ini
+                futures = []
+                step = max(1, -(-len(fresh) // self.workers))
+                for i in range(0, len(fresh), step):
+                    part = fresh[i:i + step]
+                    keys, vcs, digests, canonicals = (list(col) for col in zip(*part))
+                    if pool is None:
+                        futures.append((keys, _Done(verification.prepare_documents(vcs, digests, canonicals))))
+                    else:
+                        futures.append((keys, pool.submit(verification.prepare_documents, vcs, digests, canonicals)))
+                window.append((applicants, futures))
+
+                # Parsing chunk berikutnya berjalan sambil worker memproses chunk ini
+                while len(window) > 1 or (window and pool is None):
+                    yield from self._drain(window.popleft(), started, on_progress)
+            while window:
+                yield from self._drain(window.popleft(), started, on_progress)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def _drain(self, item, started, on_progress):
+        for result in self._finish_chunk(*item):
+            self.stats["tokens"] += 1
+            yield result
+        self.stats["seconds"] = round(time.perf_counter() - started, 3)
+        self.stats["tokens_per_sec"] = round(self.stats["tokens"] / self.stats["seconds"], 1) if self.stats["seconds"] else 0.0
+        if on_progress:
+            on_progress(dict(self.stats))
+
+class _Done:
+    """Hasil yang sudah jadi, dengan antarmuka Future.result()."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def result(self):
+        return self.value
+
+# --- LAPORAN ---
+def write_reports(results, csv_out=None, json_out=None):
+    """
+    Tulis hasil per pelamar ke CSV (REPORT_FIELDS) dan/atau JSON (beserta
+    verdict per dokumen). `results` = iterable (result, verdicts); ditulis
+    bertahap. Return jumlah pelamar.
+    """
+    writer = None
+    if csv_out is not None:
+        writer = csv.DictWriter(csv_out, fieldnames=REPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    if json_out is not None:
+        json_out.write("[")
+
+    count = 0
+    for result, verdicts in results:
+        if writer is not None:
+            writer.writerow(result)
+        if json_out is not None:
+            json_out.write(("," if count else "") + "\n" + json.dumps(dict(result, verdicts=verdicts)))
+        count += 1
+
+    if json_out is not None:
+        json_out.write("\n]\n")
+    return count
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verifikasi massal token pelamar (JSONL / ZIP).")
+    parser.add_argument("source", help="File .jsonl (satu token per baris) atau .zip")
+    parser.add_argument("--csv", default="data/bulk_verification.csv")
+    parser.add_argument("--json", default="data/bulk_verification.json")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah worker process (default: jumlah CPU)")
+    parser.add_argument("--chunk", type=int, default=256, help="Token per chunk")
+    parser.add_argument("--audience", help="Audience yang diharapkan (wajib untuk VP ringkas)")
+    parser.add_argument("--nonce", help="Nonce tantangan angkatan ini (wajib untuk VP ringkas)")
+    args = parser.parse_args()
+
+    contract = utils.get_contract()
+    bulk = BulkVerifier(utils.get_status_cache(contract), workers=args.workers, chunk_size=args.chunk,
+                        audience=args.audience, nonce=args.nonce)
+    for path in (args.csv, args.json):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(args.csv, "w", newline="", encoding="utf-8") as csv_out, open(args.json, "w", encoding="utf-8") as json_out:
+        total = write_reports(
+            bulk.run(read_tokens(args.source), on_progress=lambda s: print(
+                f"⏳ {s['tokens']} token • {s['tokens_per_sec']:,.1f} token/s • "
+                f"{s['unique_credentials']}/{s['credentials']} VC unik")),
+            csv_out, json_out,
+        )
+    print(f"✅ {total} pelamar diverifikasi dalam {bulk.stats['seconds']:.1f}s → {args.csv}, {args.json}")
@@ -1,43 +1,75 @@
 from web3 import Web3
+import argparse
+import datetime
 import json
 
+import status_history
+
 # 1. SETUP
 w3 = Web3(Web3.HTTPProvider("http://127.0.0.1:8545"))
 
 # ALAMAT KONTRAK (Sesuai Log Anda)
-CONTRACT_ADDR = "0x700b6A60ce7EaaEA56F065753d8dcB9653dbAD35" 
+CONTRACT_ADDR = "0x700b6A60ce7EaaEA56F065753d8dcB9653dbAD35"
 
 # ALAMAT ISSUER (Account 0 - Yang mau dicek)
 ISSUER_ADDR = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
 
+parser = argparse.ArgumentParser(description="Cek status issuer (dan ijazah) di registry.")
+parser.add_argument("issuer", nargs="?", default=ISSUER_ADDR, help="Alamat issuer")
+parser.add_argument("--vc-hash", help="Cek juga status hash ijazah ini (0x...)")
+parser.add_argument("--as-of-block", type=int, help="Status per nomor blok (dari riwayat event)")
+parser.add_argument("--as-of-time", help="Status per waktu, mis. '2025-11-24 10:00' (waktu lokal)")
+args = parser.parse_args()
+
 # Load ABI
 with open('./out/SimpleDIDRegistry.sol/SimpleDIDRegistry.json') as f:
     abi = json.load(f)['abi']
 
 contract = w3.eth.contract(address=CONTRACT_ADDR, abi=abi)
 
-print(f"🔍 Memeriksa status Blockchain untuk: {ISSUER_ADDR}")
+print(f"🔍 Memeriksa status Blockchain untuk: {args.issuer}")
 
 try:
-    # Panggil fungsi resolveDID
-    # Returns: (isActive, isVerified, name, didURI)
-    data = contract.functions.resolveDID(ISSUER_ADDR).call()
-    
+    if args.as_of_block is not None or args.as_of_time:
+        # Point-in-time: dibaca dari index riwayat event, bukan state terkini
+        history = status_history.StatusHistory(contract)
+        history.sync()
+        timestamp = None
+        if args.as_of_time:
+            timestamp = int(datetime.datetime.fromisoformat(args.as_of_time).timestamp())
+        source = history.at(block=args.as_of_block, timestamp=timestamp)
+        vc_hashes = [Web3.to_bytes(hexstr=args.vc_hash)] if args.vc_hash else []
+        issuer_status, credential_status, block = source.resolve_batch([args.issuer], vc_hashes)
+        print(f"\n📅 Status historis per blok #{block}")
+        data = issuer_status[args.issuer]
+    else:
+        # Panggil fungsi resolveDID
+        # Returns: (isActive, isVerified, name, didURI)
+        data = contract.functions.resolveDID(args.issuer).call()
+        credential_status = {}
+        if args.vc_hash:
+            vc_hash = Web3.to_bytes(hexstr=args.vc_hash)
+            credential_status[vc_hash] = contract.functions.verifyCredentialStatus(vc_hash).call()
+
     print(data)
-    
+
     is_active = data[0]
     is_verified = data[1]
-    
+
     print("\n--- DATA ON-CHAIN ---")
     print(f"1. Registered (Active)? : {is_active}")
     print(f"2. Verified (Centang)?  : {is_verified}")
-    
+
     if is_verified:
         print("\n✅ STATUS: SUDAH TERVERIFIKASI.")
         print("Masalah ada di Frontend React (useBlockchain.ts tidak membaca update).")
     else:
         print("\n❌ STATUS: BELUM TERVERIFIKASI.")
         print("Perintah 'cast send' Anda mungkin gagal atau salah alamat.")
-        
+
+    for vc_hash, (exists, is_revoked, is_validated, issuer) in credential_status.items():
+        print(f"\n--- IJAZAH 0x{vc_hash.hex()} ---")
+        print(f"Terdaftar: {exists} • Dicabut: {is_revoked} • Divalidasi PDDikti: {is_validated} • Issuer: {issuer}")
+
 except Exception as e:
-    print(f"Error: {e}")
\ No newline at end of file
+    print(f"Error: {e}")
@@ -0,0 +1,35 @@
+import streamlit as st
+import utils
+
+# --- PANEL DIAGNOSTIK (Opsional, di sidebar setiap aplikasi) ---
+def render_panel():
+    """
+    Tampilkan metrik RPC & jalur panas (utils.metrics) di sidebar.
+    Panel hanya dirender jika dicentang, jadi tidak membebani rerun biasa.
+    """
+    with st.sidebar:
+        if not st.checkbox("🩺 Diagnostics", key="show_diagnostics"):
+            return
+
+        rows = utils.metrics.snapshot()
+        rpc_rows = [r for r in rows if r["metric"] == "rpc_request_seconds"]
+        span_rows = [r for r in rows if r["metric"] != "rpc_request_seconds"]
+
+        total_calls = sum(r["count"] for r in rpc_rows)
+        total_time = sum(r["total_s"] for r in rpc_rows)
+        c1, c2 = st.columns(2)
+        c1.metric("RPC Calls", total_calls)
+        c2.metric("RPC Time", f"{total_time:.2f}s")
+
+        st.caption("JSON-RPC per method")
+        st.dataframe(rpc_rows, hide_index=True, use_container_width=True)
+        st.caption("Hashing / Signing / Recovery / Wallet I/O")
+        st.dataframe(span_rows, hide_index=True, use_container_width=True)
+
+        st.download_button(
+            "⬇️ Prometheus (text)", utils.metrics.render_prometheus(),
+            file_name="metrics.txt", mime="text/plain",
+        )
+        if st.button("♻️ Reset Metrik"):
+            utils.metrics.reset()
+            st.rerun()
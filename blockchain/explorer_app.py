@@ -1,10 +1,14 @@
 import streamlit as st
 import utils
+import diagnostics
+import indexer
+import analytics
 import pandas as pd
 from datetime import datetime
 
 # --- CONFIG & STYLING ---
 st.set_page_config(page_title="Etherscan Lokal", page_icon="🔗", layout="wide")
+diagnostics.render_panel()
 
 # Custom CSS agar hash panjang tidak merusak tampilan tapi bisa discroll/copy
 st.markdown("""
@@ -32,6 +36,38 @@ if not utils.w3.is_connected():
 contract = utils.get_contract()
 contract_addr = utils.REGISTRY_CONTRACT_ADDRESS.lower() if contract else ""
 
+# Indexer jalan di thread background (satu per proses server)
+chain_index = indexer.get_indexer(contract)
+TABLE_LIMIT = 50000             # baris terbaru di tabel transaksi (tabel virtual, bukan widget per baris)
+DEFAULT_ANALYTICS_BLOCKS = 5000
+
+@st.cache_data(ttl=15, show_spinner="Memuat data analitik...")
+def load_frames(from_block, to_block):
+    return analytics.load_frames(chain_index.db_path, from_block, to_block)
+
+@st.cache_data(max_entries=32, show_spinner="Memuat transaksi...")
+def load_transactions(search, indexed_block):
+    """
+    Tabel transaksi untuk kata kunci `search`. `indexed_block` hanya kunci
+    cache: hasil dipakai ulang di setiap rerun (klik baris, ganti tab)
+    sampai indexer menambah blok baru.
+    """
+    total = chain_index.count_transactions(search)
+    rows = chain_index.list_transactions(search, limit=TABLE_LIMIT)
+    if not rows:
+        return total, None
+    table = pd.DataFrame(rows)
+    return total, pd.DataFrame({
+        "Time": pd.to_datetime(table["timestamp"], unit="s"),
+        "Block": table["block_number"],
+        "Method": table["method"],
+        "Tx Hash": table["hash"],
+        "From": table["from_addr"],
+        "To": table["to_addr"].fillna("Create Contract"),
+        "Value (ETH)": pd.to_numeric(table["value"]) / 1e18,
+        "Status": table["status"].map({1: "✅", 0: "❌"}),
+    })
+
 # --- FUNGSI DECODER ---
 def decode_tx_input(tx_input):
     if tx_input == "0x": return "Transfer ETH", {}
@@ -54,8 +90,11 @@ if "tx" in st.query_params:
     st.markdown("---")
 
     try:
-        tx = utils.w3.eth.get_transaction(tx_hash)
-        receipt = utils.w3.eth.get_transaction_receipt(tx_hash)
+        # Satu round trip untuk tx + receipt
+        tx, receipt = utils.rpc_batch(
+            lambda: utils.w3.eth.get_transaction(tx_hash),
+            lambda: utils.w3.eth.get_transaction_receipt(tx_hash),
+        )
         
         status_html = '<span class="status-success">Success</span>' if receipt['status'] == 1 else '<span class="status-fail">Failed</span>'
         method_name, params = decode_tx_input(tx['input'])
@@ -111,6 +150,14 @@ if "tx" in st.query_params:
         else:
             st.text_area("Raw Input Data", tx['input'], height=100)
 
+        # --- EVENT REGISTRY (dari index) ---
+        events = chain_index.events_for_tx(tx_hash)
+        if events:
+            st.markdown("### 📣 Registry Events")
+            for ev in events:
+                st.write(f"**{ev['event']}** (log #{ev['log_index']})")
+                st.json(ev['args'])
+
     except Exception as e:
         st.error(f"Transaksi tidak ditemukan atau error: {e}")
 
@@ -122,76 +169,83 @@ else:
     st.title("🧱 Local Blockchain Explorer")
     
     m1, m2, m3, m4 = st.columns(4)
-    latest_block = utils.w3.eth.block_number
-    gas_price = utils.w3.eth.gas_price
+    latest_block, gas_price, chain_id = utils.rpc_batch(
+        lambda: utils.w3.eth.get_block_number(),
+        lambda: utils.w3.eth.gas_price,
+        lambda: utils.w3.eth.chain_id,
+    )
+    index_stats = chain_index.stats()
     
     m1.metric("Latest Block", f"#{latest_block}")
     m2.metric("Gas Price", f"{utils.w3.from_wei(gas_price, 'gwei'):.2f} Gwei")
-    m3.metric("Chain ID", utils.w3.eth.chain_id)
-    m4.metric("Transactions", "Real-time")
+    m3.metric("Chain ID", chain_id)
+    m4.metric("Transactions", index_stats["tx_count"])
+
+    if index_stats["indexed_block"] < latest_block:
+        st.caption(f"⏳ Indexer: blok #{index_stats['indexed_block']} dari #{latest_block}")
+    if chain_index.last_error:
+        st.warning(f"Indexer error: {chain_index.last_error}")
     
     st.markdown("---")
     
-    # --- LIST TRANSAKSI (MANUAL TABLE BIAR BISA KLIK) ---
-    st.subheader("📜 Latest Transactions")
-    
-    # Ambil 15 Blok Terakhir
-    blocks_to_scan = 15
-    start = max(0, latest_block - blocks_to_scan)
-    
-    # Header Tabel Custom
-    h1, h2, h3, h4, h5 = st.columns([1.5, 3, 3, 1, 1])
-    h1.markdown("**Method**")
-    h2.markdown("**Tx Hash**")
-    h3.markdown("**From / To**")
-    h4.markdown("**Value**")
-    h5.markdown("**Action**")
-    
-    st.divider()
+    tab_txs, tab_analytics = st.tabs(["📜 Latest Transactions", "📊 Analytics"])
 
-    found_tx = False
-    
-    # Loop mundur dari blok terbaru
-    for b_idx in range(latest_block, start - 1, -1):
-        block = utils.w3.eth.get_block(b_idx, full_transactions=True)
-        timestamp = datetime.fromtimestamp(block['timestamp']).strftime('%H:%M:%S')
-        
-        for tx in block['transactions']:
-            found_tx = True
-            method_name, _ = decode_tx_input(tx['input'])
-            tx_hash_str = tx['hash'].hex()
-            
-            # Layout Baris
-            c1, c2, c3, c4, c5 = st.columns([1.5, 3, 3, 1, 1])
-            
-            with c1:
-                st.code(method_name, language="text")
-            
-            with c2:
-                # Tampilkan HASH LENGKAP tanpa pruning
-                st.code(tx_hash_str, language="text")
-                st.caption(f"Block #{b_idx} • {timestamp}")
-            
-            with c3:
-                st.write("From:")
-                st.code(tx['from'], language="text")
-                st.write("To:")
-                st.code(tx['to'] if tx['to'] else "Create Contract", language="text")
-                
-            with c4:
-                val = utils.w3.from_wei(tx['value'], 'ether')
-                st.write(f"{val} ETH")
-            
-            with c5:
-                # Tombol untuk melihat detail (Routing)
-                if st.button("View", key=tx_hash_str):
-                    go_to_tx(tx_hash_str)
-                    st.rerun() # Refresh agar pindah halaman
-            
-            st.divider() # Garis pemisah antar transaksi
+    # --- LIST TRANSAKSI (Satu tabel virtual, klik baris untuk detail) ---
+    with tab_txs:
+        search = st.text_input("🔎 Cari Tx Hash / Alamat / VC Hash / Nomor Blok", placeholder="0x...")
+        total, table = load_transactions(search, index_stats["indexed_block"])
+
+        if table is not None:
+            selected = st.dataframe(
+                table, hide_index=True, use_container_width=True, height=600,
+                on_select="rerun", selection_mode="single-row",
+            )
+            st.caption(f"Menampilkan {len(table):,} dari {total:,} transaksi terbaru • pilih baris untuk melihat detail")
+            if selected.selection.rows:
+                go_to_tx(table["Tx Hash"].iloc[selected.selection.rows[0]])
+                st.rerun() # Refresh agar pindah halaman
+        else:
+            st.info("Tidak ada transaksi yang cocok." if search else "Belum ada transaksi yang terindeks.")
+
+    # --- ANALITIK (Rentang blok, dihitung vektor dengan pandas) ---
+    with tab_analytics:
+        indexed_block = index_stats["indexed_block"]
+        if indexed_block < 1:
+            st.info("Belum cukup blok yang terindeks untuk analitik.")
+        else:
+            from_block, to_block = st.slider(
+                "Rentang blok", 0, indexed_block,
+                (max(0, indexed_block - DEFAULT_ANALYTICS_BLOCKS), indexed_block),
+            )
+            txs, events = load_frames(from_block, to_block)
+
+            rates = analytics.registry_rates(events)
+            a1, a2, a3, a4 = st.columns(4)
+            a1.metric("Transaksi", f"{len(txs):,}")
+            a2.metric("Ijazah Diterbitkan", f"{int(rates['anchored'].sum()):,}")
+            a3.metric("Ijazah Dicabut", f"{int(rates['revoked'].sum()):,}")
+            a4.metric("Total Fee", f"{txs['fee_eth'].sum():.6f} ETH")
+
+            st.markdown("#### 🎓 Penerbitan & Pencabutan per Jam")
+            if rates.empty:
+                st.caption("Tidak ada event penerbitan / pencabutan di rentang ini.")
+            else:
+                st.bar_chart(rates)
+
+            st.markdown("#### ⛽ Gas per Method")
+            gas = analytics.gas_by_method(txs)
+            st.bar_chart(gas["gas_total"])
+            st.dataframe(gas, use_container_width=True)
+
+            st.markdown("#### 💸 Distribusi Fee per Issuer (ETH)")
+            fees = analytics.fee_by_issuer(txs, events, contract_addr)
+            if fees.empty:
+                st.caption("Belum ada transaksi ke registry di rentang ini.")
+            else:
+                st.bar_chart(fees[["fee_p50", "fee_p95", "fee_max"]])
+                st.dataframe(fees, use_container_width=True, column_config={
+                    col: st.column_config.NumberColumn(format="%.8f") for col in fees.columns if col.startswith("fee_")
+                })
 
-    if not found_tx:
-        st.info("Belum ada transaksi di 15 blok terakhir.")
-    
     if st.button("🔄 Refresh Data"):
-        st.rerun()
\ No newline at end of file
+        st.rerun()
@@ -1,38 +1,69 @@
 import streamlit as st
 import utils
+import diagnostics
+import wallet_store
+import presentation
+import selective_disclosure
+import token_codec
 import json
 
 st.set_page_config(page_title="Holder Wallet", page_icon="Gp")
+diagnostics.render_panel()
 
 # --- SESSION SETUP ---
 # Hardcode Akun Mahasiswa (Dari Anvil Account #1)
 HOLDER_PK = "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
 HOLDER_ADDR = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
 HOLDER_DID = f"did:ethr:{HOLDER_ADDR}"
+HOLDER_SIGNER = utils.get_signer(HOLDER_PK)  # key di-load sekali per proses
 
-# Load Wallet DB
-wallet_db = utils.load_db("holder_wallet.json")
-if "credentials" not in wallet_db:
-    wallet_db["credentials"] = []
+PAGE_SIZE = 20
+
+# Load Wallet DB (SQLite; wallet JSON lama dimigrasi otomatis sekali)
+@st.cache_resource
+def get_wallet():
+    store = wallet_store.WalletStore()
+    store.migrate_json()
+    return store
+
+wallet = get_wallet()
+if "selected_vc_ids" not in st.session_state:
+    st.session_state.selected_vc_ids = []
+
+def page_selector(total, key):
+    """Pilih halaman; return offset baris."""
+    pages = max(1, -(-total // PAGE_SIZE))
+    page = st.number_input(f"Halaman (dari {pages})", min_value=1, max_value=pages, value=1, key=key)
+    return (page - 1) * PAGE_SIZE
+
+def render_token(token, as_text):
+    """Tampilkan token sebagai JSON, atau teks ringkas jika toggle aktif."""
+    if not as_text:
+        st.json(token)
+        return
+    text = token_codec.to_text(token)
+    st.code(text, language="text", wrap_lines=True)
+    st.caption(f"📉 {len(text):,} karakter (JSON: {len(json.dumps(token, indent=4)):,})")
 
 st.title("👤 Holder Wallet (Mahasiswa)")
 st.info(f"My DID: `{HOLDER_DID}`")
 
 # MENU TAB
-tab1, tab2, tab3 = st.tabs(["📥 Terima Ijazah", "💼 Koleksi Saya", "📤 Share Presentation"])
+tab1, tab2, tab3, tab4 = st.tabs(["📥 Terima Ijazah", "💼 Koleksi Saya", "📤 Share Presentation", "🔒 Selective Disclosure"])
 
 with tab1:
     st.subheader("Simpan Ijazah Baru")
-    vc_input = st.text_area("Tempel (Paste) JSON Ijazah dari Kampus di sini:")
+    vc_input = st.text_area("Tempel (Paste) JSON Ijazah dari Kampus di sini (atau teks ringkas SSI1:...):")
     
     if st.button("Simpan ke Wallet"):
         try:
-            vc_json = json.loads(vc_input)
+            vc_json = token_codec.loads(vc_input)
             # Validasi sederhana
             if "proof" in vc_json and "credential" in vc_json:
-                wallet_db["credentials"].append(vc_json)
-                utils.save_db("holder_wallet.json", wallet_db)
-                st.success("Ijazah berhasil disimpan di Wallet!")
+                if wallet.add(vc_json) is not None:
+                    st.success("Ijazah berhasil disimpan di Wallet!")
+                else:
+                    st.info("Ijazah ini sudah ada di Wallet.")
             else:
                 st.error("Format JSON tidak valid (Harus format VC).")
         except:
@@ -40,46 +71,100 @@ with tab1:
 
 with tab2:
     st.subheader("Koleksi Kredensial")
-    if not wallet_db["credentials"]:
+    total = wallet.count()
+    if not total:
         st.write("Belum ada ijazah.")
     else:
-        for idx, vc in enumerate(wallet_db["credentials"]):
-            with st.expander(f"🎓 Ijazah #{idx+1} - {vc['credential']['credentialSubject']['data']['degree']}"):
+        f1, f2 = st.columns(2)
+        issuer_filter = f1.selectbox("Filter Penerbit", [""] + wallet.distinct("issuer"))
+        degree_filter = f2.selectbox("Filter Gelar", [""] + wallet.distinct("degree"))
+        total = wallet.count(issuer=issuer_filter, degree=degree_filter)
+        offset = page_selector(total, "koleksi_page")
+
+        for pos, (cred_id, vc) in enumerate(
+            wallet.page(PAGE_SIZE, offset, issuer=issuer_filter, degree=degree_filter), start=offset + 1
+        ):
+            with st.expander(f"🎓 Ijazah #{pos} - {vc['credential']['credentialSubject']['data']['degree']}"):
                 st.json(vc)
 
 with tab3:
     st.subheader("Buat Verifiable Presentation (VP)")
     st.write("Pilih kredensial yang ingin diserahkan ke Bank/Perusahaan:")
     
-    selected_indices = []
-    for idx, vc in enumerate(wallet_db["credentials"]):
-        if st.checkbox(f"Sertakan: {vc['credential']['credentialSubject']['data']['degree']}", key=idx):
-            selected_indices.append(vc)
-    
+    offset = page_selector(wallet.count(), "share_page")
+    selected_ids = st.session_state.selected_vc_ids
+    for item in wallet.summaries(PAGE_SIZE, offset):
+        checked = st.checkbox(f"Sertakan: {item['degree']}", value=item["id"] in selected_ids, key=f"vc_{item['id']}")
+        if checked and item["id"] not in selected_ids:
+            selected_ids.append(item["id"])
+        elif not checked and item["id"] in selected_ids:
+            selected_ids.remove(item["id"])
+    st.caption(f"{len(selected_ids)} dokumen dipilih")
+
+    # VP ringkas: holder hanya menandatangani daftar digest, VC dikirim sebagai bundle
+    compact = st.toggle("📎 Format ringkas (hash-referencing)", value=True,
+                        help="Tanda tangan hanya atas amplop kecil (DID, nonce, audience, digest VC). "
+                             "Verifier bisa melewati VC yang digest-nya sudah pernah dicek.")
+    if compact:
+        # Audience & nonce diberikan verifier; token hanya lolos di verifier & sesi tersebut
+        c1, c2, c3 = st.columns(3)
+        audience = c1.text_input("Audience (penerima)", placeholder="mis. PT Bank Contoh")
+        nonce = c2.text_input("Nonce dari verifier", placeholder="tantangan dari portal verifier")
+        detached = c3.toggle("Bundle terpisah", help="Token hanya berisi amplop; bundle VC diunduh sebagai file sendiri")
+
+    as_text = st.toggle("🔤 Keluaran teks ringkas (CBOR + base45, siap QR)")
+
     if st.button("Generate Presentation Token"):
+        selected_indices = wallet.get_many(selected_ids)
         if not selected_indices:
             st.warning("Pilih minimal satu dokumen.")
+        elif compact and not (audience.strip() and nonce.strip()):
+            # Tanpa tantangan verifier, token ringkas tidak akan lolos verifikasi
+            st.warning("Isi Audience dan Nonce dari verifier, atau matikan format ringkas.")
+        elif compact:
+            final_vp, bundle = presentation.build_compact_presentation(
+                HOLDER_SIGNER, HOLDER_DID, selected_indices, audience=audience.strip(), nonce=nonce.strip(),
+                include_bundle=not detached,
+            )
+            st.success(f"Token Presentasi Ringkas Siap! ({len(bundle)} dokumen)")
+            render_token(final_vp, as_text)
+            d1, d2 = st.columns(2)
+            if as_text:
+                d1.download_button("⬇️ Token (SSI1)", token_codec.to_text(final_vp), "presentation.txt", "text/plain")
+            else:
+                d1.download_button("⬇️ Token (JSON)", json.dumps(final_vp), "presentation.json", "application/json")
+            if detached:
+                d2.download_button("⬇️ Bundle VC (JSON)", json.dumps(bundle), "bundle.json", "application/json")
+            st.info("👇 Salin Token JSON ini (dan bundle, jika terpisah) untuk diserahkan ke Portal Bank")
         else:
-            # Membuat VP Payload
-            vp_payload = {
-                "@context": ["https://www.w3.org/2018/credentials/v1"],
-                "type": ["VerifiablePresentation"],
-                "verifiableCredential": selected_indices,
-                "holder": HOLDER_DID
-            }
-            
-            # Sign VP oleh Mahasiswa (Membuktikan kepemilikan)
-            signature = utils.sign_data(vp_payload, HOLDER_PK)
-            
-            final_vp = {
-                "presentation": vp_payload,
-                "proof": {
-                    "type": "EcdsaSecp256k1Signature2019",
-                    "verificationMethod": f"{HOLDER_DID}#controller",
-                    "jws": signature
-                }
-            }
-            
+            # VP format lama: seluruh VC di-embed & ikut ditandatangani (membuktikan kepemilikan)
+            final_vp = presentation.build_presentation(HOLDER_SIGNER, HOLDER_DID, selected_indices)
+
             st.success("Token Presentasi Siap!")
-            st.json(final_vp)
-            st.info("👇 Salin Token JSON ini untuk diserahkan ke Portal Bank")
\ No newline at end of file
+            render_token(final_vp, as_text)
+            st.info("👇 Salin Token JSON ini untuk diserahkan ke Portal Bank")
+
+with tab4:
+    st.subheader("Buka Sebagian Data (Selective Disclosure)")
+    st.write("Tempel VC Selective Disclosure (dari Issuer Portal / portal React), lalu pilih field yang ingin dibuka. "
+             "Field lain hanya dikirim sebagai hash.")
+    sd_input = st.text_area("JSON VC Selective Disclosure (atau teks ringkas SSI1:...):", key="sd_vc")
+    sd_vc = None
+    if sd_input:
+        try:
+            sd_vc = token_codec.loads(sd_input)
+            if not selective_disclosure.is_sd_credential(sd_vc):
+                st.error("VC ini tidak mendukung Selective Disclosure (tidak ada sdData).")
+                sd_vc = None
+        except ValueError:
+            st.error("Error parsing JSON.")
+
+    if sd_vc is not None:
+        raw_values = sd_vc.get("credential", sd_vc)["credentialSubject"]["sdData"]["rawValues"]
+        keys = st.multiselect(f"Field yang dibuka ({len(raw_values)} field)", list(raw_values), default=list(raw_values))
+        sd_as_text = st.toggle("🔤 Keluaran teks ringkas (CBOR + base45, siap QR)", key="sd_as_text")
+        if st.button("Generate Selective Disclosure Token"):
+            sd_vp = selective_disclosure.create_presentation(sd_vc, keys)
+            st.success(f"Token Siap! {len(sd_vp['revealed'])} field dibuka, {len(sd_vp['hiddenHashes'])} disembunyikan.")
+            render_token(sd_vp, sd_as_text)
+            st.info("👇 Salin token ini untuk diserahkan ke Verifier (Portal Python maupun React)")
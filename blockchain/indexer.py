@@ -0,0 +1,308 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import utils
+
+DB_PATH = "data/explorer_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    number      INTEGER PRIMARY KEY,
+    hash        TEXT NOT NULL,
+    parent_hash TEXT NOT NULL,
+    timestamp   INTEGER NOT NULL,
+    tx_count    INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS txs (
+    hash         TEXT PRIMARY KEY,
+    block_number INTEGER NOT NULL,
+    tx_index     INTEGER NOT NULL,
+    from_addr    TEXT NOT NULL,
+    to_addr      TEXT,
+    value        TEXT NOT NULL,
+    gas_price    TEXT NOT NULL,
+    gas_used     INTEGER,
+    status       INTEGER,
+    method       TEXT,
+    params       TEXT,
+    input        TEXT
+);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index    INTEGER NOT NULL,
+    tx_hash      TEXT NOT NULL,
+    event        TEXT NOT NULL,
+    vc_hash      TEXT,
+    address      TEXT,
+    args         TEXT,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE INDEX IF NOT EXISTS idx_txs_block ON txs (block_number, tx_index);
+CREATE INDEX IF NOT EXISTS idx_txs_from ON txs (from_addr);
+CREATE INDEX IF NOT EXISTS idx_txs_to ON txs (to_addr);
+CREATE INDEX IF NOT EXISTS idx_events_vc ON events (vc_hash);
+CREATE INDEX IF NOT EXISTS idx_events_tx ON events (tx_hash);
+CREATE INDEX IF NOT EXISTS idx_events_addr ON events (address);
+"""
+
+def _hex(value):
+    return "0x" + bytes(value).hex()
+
+def _tx_input(tx):
+    # Anvil memakai 'input', beberapa node lama masih 'data'
+    return tx.get('input', tx.get('data', b""))
+
+def _jsonable(value):
+    """Parameter hasil decode (bytes, tuple, AttributeDict) -> tipe JSON."""
+    if isinstance(value, (bytes, bytearray)):
+        return _hex(value)
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, int) and not isinstance(value, bool) and abs(value) > 2**53:
+        return str(value)
+    return value
+
+# --- INDEXER BLOK & TRANSAKSI ---
+class ChainIndexer:
+    """
+    Indexer inkremental untuk explorer_app.
+
+    Mengikuti chain dari cursor yang tersimpan di SQLite, menyimpan blok,
+    transaksi + receipt, nama method hasil decode, dan event registry.
+    Jika hash blok di cursor tidak lagi cocok dengan chain (reorg), data
+    sejak titik fork dibuang dan diindeks ulang; pencarian fork dibatasi
+    `confirmations` blok ke belakang.
+    """
+
+    def __init__(self, contract=None, db_path=DB_PATH, confirmations=12, batch_blocks=200):
+        self.contract = contract
+        self.db_path = db_path
+        self.confirmations = confirmations
+        self.batch_blocks = batch_blocks
+        self.topic_map = utils.event_topic_map(contract) if contract else {}
+        self.contract_addr = contract.address.lower() if contract else ""
+        self.last_error = None
+
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        conn = self._connect()
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- Cursor ---
+    def cursor(self, conn=None):
+        """Nomor blok terakhir yang sudah diindeks (-1 jika belum ada)."""
+        if conn is None:
+            with self._db() as conn:
+                return self.cursor(conn)
+        row = conn.execute("SELECT MAX(number) FROM blocks").fetchone()
+        return -1 if row[0] is None else row[0]
+
+    # --- Decode ---
+    def _decode_input(self, tx):
+        tx_input = _tx_input(tx)
+        if not tx_input or bytes(tx_input) == b"":
+            return "Transfer ETH", {}
+        if not self.contract or not tx['to'] or tx['to'].lower() != self.contract_addr:
+            return "Contract Deployment / Unknown", {}
+        try:
+            func_obj, func_params = self.contract.decode_function_input(tx_input)
+            return func_obj.fn_name, _jsonable(dict(func_params))
+        except Exception:
+            return "Contract Deployment / Unknown", {}
+
+    # --- Reorg ---
+    def _find_fork_point(self, conn):
+        """Blok pertama yang harus dibuang, atau None jika chain lokal masih cocok."""
+        top = self.cursor(conn)
+        if top < 0:
+            return None
+        for number in range(top, max(-1, top - self.confirmations - 1), -1):
+            row = conn.execute("SELECT hash FROM blocks WHERE number = ?", (number,)).fetchone()
+            if row is None:
+                continue
+            if row["hash"] == _hex(utils.w3.eth.get_block(number)['hash']):
+                return None if number == top else number + 1
+        # Fork lebih dalam dari confirmation depth: buang seluruh jendela konfirmasi
+        return max(0, top - self.confirmations)
+
+    def _rollback(self, conn, from_block):
+        conn.execute("DELETE FROM events WHERE block_number >= ?", (from_block,))
+        conn.execute("DELETE FROM txs WHERE block_number >= ?", (from_block,))
+        conn.execute("DELETE FROM blocks WHERE number >= ?", (from_block,))
+
+    # --- Indexing ---
+    def _index_block(self, conn, number):
+        block = utils.w3.eth.get_block(number, full_transactions=True)
+        conn.execute(
+            "INSERT OR REPLACE INTO blocks VALUES (?, ?, ?, ?, ?)",
+            (number, _hex(block['hash']), _hex(block['parentHash']), block['timestamp'], len(block['transactions'])),
+        )
+        # Semua receipt blok ini dalam satu request batch
+        receipts = utils.rpc_batch(*(
+            lambda h=tx['hash']: utils.w3.eth.get_transaction_receipt(h) for tx in block['transactions']
+        ))
+        for tx, receipt in zip(block['transactions'], receipts):
+            method, params = self._decode_input(tx)
+            tx_hash = _hex(tx['hash'])
+            conn.execute(
+                "INSERT OR REPLACE INTO txs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    tx_hash, number, receipt['transactionIndex'],
+                    tx['from'].lower(), tx['to'].lower() if tx['to'] else None,
+                    str(tx['value']), str(tx.get('gasPrice', 0)),
+                    receipt['gasUsed'], receipt['status'],
+                    method, json.dumps(params), _hex(_tx_input(tx)),
+                ),
+            )
+            for log in receipt['logs']:
+                if log['address'].lower() != self.contract_addr:
+                    continue
+                decoded = utils.decode_log(self.topic_map, log)
+                if decoded is None:
+                    continue
+                name, args = decoded
+                vc_hash = args.get("vcHash")
+                address = args.get("issuer") or args.get("owner")
+                conn.execute(
+                    "INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        number, log['logIndex'], tx_hash, name,
+                        _hex(vc_hash) if vc_hash is not None else None,
+                        address.lower() if address else None,
+                        json.dumps(_jsonable(dict(args))),
+                    ),
+                )
+
+    def sync_once(self):
+        """Indeks paling banyak `batch_blocks` blok baru. Return jumlah blok yang diproses."""
+        with self._write_lock, self._db() as conn:
+            fork = self._find_fork_point(conn)
+            if fork is not None:
+                self._rollback(conn, fork)
+                conn.commit()
+
+            latest = utils.w3.eth.block_number
+            start = self.cursor(conn) + 1
+            end = min(latest, start + self.batch_blocks - 1)
+            for number in range(start, end + 1):
+                self._index_block(conn, number)
+                conn.commit()  # satu transaksi SQLite per blok: cursor selalu konsisten
+            return max(0, end - start + 1)
+
+    # --- Background thread ---
+    def _run(self, poll_interval):
+        while not self._stop.is_set():
+            try:
+                processed = self.sync_once()
+                self.last_error = None
+            except Exception as e:
+                processed = 0
+                self.last_error = e
+            if not processed:
+                self._stop.wait(poll_interval)
+
+    def start(self, poll_interval=2.0):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(poll_interval,), daemon=True, name="chain-indexer")
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    # --- Query (dipakai explorer_app) ---
+    def stats(self):
+        with self._db() as conn:
+            return {
+                "indexed_block": self.cursor(conn),
+                "tx_count": conn.execute("SELECT COUNT(*) FROM txs").fetchone()[0],
+                "event_count": conn.execute("SELECT COUNT(*) FROM events").fetchone()[0],
+            }
+
+    def _search_clause(self, term):
+        """WHERE clause untuk pencarian: tx hash, alamat, VC hash, atau nomor blok."""
+        if not term:
+            return "", ()
+        term = term.strip().lower()
+        if term.isdigit():
+            return "WHERE t.block_number = ?", (int(term),)
+        if len(term) == 42:
+            return "WHERE t.from_addr = ? OR t.to_addr = ? OR t.hash IN (SELECT tx_hash FROM events WHERE address = ?)", (term, term, term)
+        return "WHERE t.hash = ? OR t.hash IN (SELECT tx_hash FROM events WHERE vc_hash = ?)", (term, term)
+
+    def count_transactions(self, term=None):
+        where, args = self._search_clause(term)
+        with self._db() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM txs t {where}", args).fetchone()[0]
+
+    def list_transactions(self, term=None, limit=20, offset=0):
+        """Transaksi terbaru dulu, dengan pagination."""
+        where, args = self._search_clause(term)
+        with self._db() as conn:
+            rows = conn.execute(
+                f"""SELECT t.*, b.timestamp FROM txs t JOIN blocks b ON b.number = t.block_number
+                    {where} ORDER BY t.block_number DESC, t.tx_index DESC LIMIT ? OFFSET ?""",
+                args + (limit, offset),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    def events_for_tx(self, tx_hash):
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT * FROM events WHERE tx_hash = ? ORDER BY log_index", (tx_hash.lower(),)
+            ).fetchall()
+            return [dict(r, args=json.loads(r["args"])) for r in rows]
+
+    def credential_history(self, vc_hash):
+        with self._db() as conn:
+            rows = conn.execute(
+                "SELECT * FROM events WHERE vc_hash = ? ORDER BY block_number, log_index", (vc_hash.lower(),)
+            ).fetchall()
+            return [dict(r, args=json.loads(r["args"])) for r in rows]
+
+_indexer = None
+_indexer_lock = threading.Lock()
+
+def get_indexer(contract):
+    """Satu indexer + thread background per proses server explorer."""
+    global _indexer
+    with _indexer_lock:
+        if _indexer is None:
+            _indexer = ChainIndexer(contract).start()
+        return _indexer
+
+if __name__ == "__main__":
+    # Mode CLI: indeks sampai head lalu terus mengikuti chain
+    idx = ChainIndexer(utils.get_contract())
+    while True:
+        n = idx.sync_once()
+        if n:
+            print(f"📚 Terindeks sampai blok #{idx.cursor()}")
+        else:
+            time.sleep(2)
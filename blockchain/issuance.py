@@ -0,0 +1,427 @@
+import csv
+import datetime
+import io
+import json
+import os
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import merkle
+import utils
+
+DEFAULT_UNIVERSITY = "Universitas Pendidikan Indonesia"
+
+# --- PAYLOAD IJAZAH ---
+def build_credential_payload(issuer_did, student_did, name, degree, university=DEFAULT_UNIVERSITY):
+    """Struktur VC yang sama persis dengan form penerbitan di issuer_app."""
+    return {
+        "@context": ["https://www.w3.org/2018/credentials/v1"],
+        "id": f"urn:uuid:{str(uuid.uuid4())}",
+        "type": ["VerifiableCredential", "UniversityDegreeCredential"],
+        "issuer": issuer_did,
+        "issuanceDate": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "credentialSubject": {
+            "id": student_did,
+            "data": {"name": name, "degree": degree, "university": university}
+        }
+    }
+
+def wrap_credential(credential_payload, signature, issuer_did):
+    return {
+        "credential": credential_payload,
+        "proof": {
+            "type": "EcdsaSecp256k1Signature2019",
+            "verificationMethod": f"{issuer_did}#controller",
+            "jws": signature
+        }
+    }
+
+# --- BACA DATA WISUDAWAN (CSV / JSONL, streaming) ---
+def read_graduates(source):
+    """
+    Generator baris wisudawan dari file export registrar.
+    `source` boleh path atau file-like (mis. hasil st.file_uploader).
+    Kolom wajib: name, degree, did. Kolom opsional: university.
+    BOM UTF-8 (export Excel) dibuang agar header pertama tetap "name".
+    """
+    if isinstance(source, (str, os.PathLike)):
+        name = str(source)
+        handle = open(source, "r", encoding="utf-8-sig", newline="")
+    else:
+        name = getattr(source, "name", "")
+        handle = source
+        if isinstance(handle.read(0), bytes):
+            handle = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+
+    try:
+        if name.endswith(".jsonl") or name.endswith(".ndjson"):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(handle)
+    finally:
+        if isinstance(source, (str, os.PathLike)):
+            handle.close()
+
+# --- PIPELINE PENERBITAN MASSAL ---
+class BulkIssuer:
+    """
+    Penerbitan ijazah massal untuk hari wisuda.
+
+    Nonce dihitung lokal lewat utils.TxSender (disinkronkan ulang dari node
+    hanya setelah pengiriman gagal), transaksi `issueCredential` dikirim
+    beruntun dengan jendela in-flight terbatas, dan receipt dipantau paralel.
+    Setiap baris menghasilkan satu record hasil (berhasil / gagal) sehingga
+    kegagalan tidak menghentikan batch.
+    """
+
+    def __init__(self, contract, issuer_address, private_key, window=32,
+                 gas=500000, gas_price_gwei=1, max_retries=3, receipt_timeout=120):
+        self.contract = contract
+        self.issuer_address = issuer_address
+        self.issuer_did = f"did:ethr:{issuer_address}"
+        self.signer = utils.get_signer(private_key)
+        self.window = window
+        self.gas = gas
+        self.gas_price = utils.w3.to_wei(gas_price_gwei, 'gwei')
+        self.max_retries = max_retries
+        self.receipt_timeout = receipt_timeout
+
+    def _build_tx(self, vc_hash, nonce):
+        # Dirakit manual agar tidak ada RPC tambahan (estimateGas / chainId) per transaksi
+        return {
+            'to': self.contract.address,
+            'data': self.contract.encode_abi("issueCredential", args=[vc_hash]),
+            'value': 0,
+            'nonce': nonce,
+            'gas': self.gas,
+            'gasPrice': self.gas_price,
+            'chainId': self.chain_id,
+        }
+
+    def _prepare(self, index, row):
+        credential_payload = build_credential_payload(
+            self.issuer_did, row['did'], row['name'], row['degree'],
+            row.get('university') or DEFAULT_UNIVERSITY,
+        )
+        canonical = utils.canonicalize(credential_payload)
+        return {
+            "row": index,
+            "name": row['name'],
+            "payload": credential_payload,
+            "canonical": canonical,
+            "vc_hash": utils.hash_json(canonical),
+        }
+
+    def _signed_items(self, rows, chunk):
+        """
+        Generator `(item, failed_result)` per baris. Signature off-chain
+        dibuat per `chunk` item sekaligus lewat signer.sign_many (bisa
+        multi-core) sebelum transaksinya dikirim.
+        """
+        pending = []
+        for index, row in enumerate(rows, start=1):
+            try:
+                pending.append(self._prepare(index, row))
+            except Exception as e:
+                yield None, {"row": index, "name": row.get('name', ''), "vc_hash": "", "tx_hash": "",
+                             "status": "failed", "error": f"Data tidak valid: {e}"}
+                continue
+            if len(pending) >= chunk:
+                yield from self._sign_pending(pending)
+                pending = []
+        if pending:
+            yield from self._sign_pending(pending)
+
+    def _sign_pending(self, items):
+        for item, signature in zip(items, self.signer.sign_many([item["canonical"] for item in items])):
+            item["signature"] = signature
+            yield item, None
+
+    def _start(self):
+        """chainId & nonce awal dalam satu batch RPC; pengiriman lewat utils.TxSender."""
+        self.chain_id, nonce = utils.rpc_batch(
+            lambda: utils.w3.eth.chain_id,
+            lambda: utils.w3.eth.get_transaction_count(self.issuer_address, 'pending'),
+        )
+        self.sender = utils.TxSender(self.signer, nonce, max_retries=self.max_retries)
+
+    def _send(self, item):
+        """Kirim satu transaksi; nonce hanya dipakai jika node menerimanya."""
+        return self.sender.send(lambda nonce: self._build_tx(item["vc_hash"], nonce))
+
+    def _wait_receipt(self, tx_hash):
+        return utils.w3.eth.wait_for_transaction_receipt(
+            tx_hash, timeout=self.receipt_timeout, poll_latency=0.2
+        )
+
+    def _finish(self, item, tx_hash, future):
+        result = {
+            "row": item["row"],
+            "name": item["name"],
+            "vc_hash": item["vc_hash"].hex(),
+            "tx_hash": tx_hash.hex(),
+        }
+        try:
+            receipt = future.result()
+        except Exception as e:
+            return dict(result, status="failed", error=f"Receipt: {e}"), None
+
+        if receipt['status'] != 1:
+            return dict(result, status="failed", error="Transaksi revert (hash duplikat / issuer belum terverifikasi?)"), None
+
+        # VC (signature dari _signed_items) hanya dirilis untuk ijazah yang sudah ter-anchor
+        final_vc = wrap_credential(item["payload"], item["signature"], self.issuer_did)
+        return dict(result, status="issued", block=receipt['blockNumber'], error=""), final_vc
+
+    def run(self, rows):
+        """
+        Generator: proses `rows` (dict name/degree/did) dan yield
+        `(result, final_vc)` per baris segera setelah receipt-nya diketahui.
+        `final_vc` bernilai None untuk baris yang gagal.
+        """
+        self._start()
+        inflight = {}
+
+        with ThreadPoolExecutor(max_workers=self.window) as pool:
+            for item, failed in self._signed_items(rows, max(self.window, utils.PARALLEL_SIGN_MIN)):
+                if failed:
+                    yield failed, None
+                    continue
+
+                tx_hash, error = self._send(item)
+                if tx_hash is None:
+                    yield {"row": item["row"], "name": item["name"], "vc_hash": item["vc_hash"].hex(), "tx_hash": "",
+                           "status": "failed", "error": f"Kirim transaksi: {error}"}, None
+                    continue
+                inflight[pool.submit(self._wait_receipt, tx_hash)] = (item, tx_hash)
+
+                # Jendela penuh: tunggu minimal satu receipt sebelum kirim lagi
+                while len(inflight) >= self.window:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield self._finish(*inflight.pop(future), future)
+
+            for future in list(inflight):
+                yield self._finish(*inflight.pop(future), future)
+
+class MerkleBatchIssuer(BulkIssuer):
+    """
+    Varian BulkIssuer yang hanya meng-anchor root Merkle per `batch_size`
+    ijazah (satu transaksi `issueCredential(root)` per batch). Setiap VC
+    membawa jalur inklusinya di `proof.anchor` sehingga verifier cukup
+    mengecek satu root di blockchain.
+    """
+
+    def __init__(self, contract, issuer_address, private_key, batch_size=1024, **kwargs):
+        super().__init__(contract, issuer_address, private_key, **kwargs)
+        self.batch_size = batch_size
+
+    def _anchor_batch(self, items):
+        """Anchor satu batch. Return daftar hasil per baris."""
+        levels = merkle.build_levels([item["vc_hash"] for item in items])
+        root = merkle.root_of(levels)
+        base = {"root": "0x" + root.hex()}
+
+        tx_hash, error = self._send({"vc_hash": root})
+        if tx_hash is None:
+            return [
+                (dict(base, row=item["row"], name=item["name"], vc_hash=item["vc_hash"].hex(), tx_hash="",
+                      status="failed", error=f"Kirim transaksi: {error}"), None)
+                for item in items
+            ]
+
+        # Satu receipt untuk seluruh batch
+        future = Future()
+        try:
+            future.set_result(self._wait_receipt(tx_hash))
+        except Exception as e:
+            future.set_exception(e)
+
+        results = []
+        for index, item in enumerate(items):
+            result, final_vc = self._finish(item, tx_hash, future)
+            if final_vc is not None:
+                final_vc["proof"]["anchor"] = merkle.anchor_proof(root, merkle.proof_for(levels, index))
+            results.append((dict(base, **result), final_vc))
+        return results
+
+    def run(self, rows):
+        self._start()
+        batch = []
+
+        for item, failed in self._signed_items(rows, self.batch_size):
+            if failed:
+                yield failed, None
+                continue
+
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield from self._anchor_batch(batch)
+                batch = []
+
+        if batch:
+            yield from self._anchor_batch(batch)
+
+class ArrayBatchIssuer(BulkIssuer):
+    """
+    Varian BulkIssuer yang meng-anchor `batch_size` hash VC per transaksi
+    `issueCredentials(bytes32[])`. Berbeda dengan MerkleBatchIssuer, setiap
+    hash tetap tercatat sendiri di kontrak (VC tidak butuh bukti inklusi);
+    transaksi batch dikirim beruntun dengan jendela in-flight `window`.
+
+    Kontrak melewati hash yang sudah ada, jadi status per baris diambil dari
+    event CredentialAnchored di receipt, bukan dari status transaksi.
+    """
+
+    def __init__(self, contract, issuer_address, private_key, batch_size=200, window=4,
+                 gas_base=60000, gas_per_item=30000, **kwargs):
+        super().__init__(contract, issuer_address, private_key, window=window, **kwargs)
+        self.batch_size = batch_size
+        self.gas_base = gas_base
+        self.gas_per_item = gas_per_item
+        self._events = utils.event_topic_map(contract, ["CredentialAnchored"])
+
+    def _build_tx(self, vc_hashes, nonce):
+        return {
+            'to': self.contract.address,
+            'data': self.contract.encode_abi("issueCredentials", args=[vc_hashes]),
+            'value': 0,
+            'nonce': nonce,
+            'gas': self.gas_base + self.gas_per_item * len(vc_hashes),
+            'gasPrice': self.gas_price,
+            'chainId': self.chain_id,
+        }
+
+    def _anchored(self, receipt):
+        """Hash yang benar-benar dicatat transaksi ini atas nama issuer ini."""
+        anchored = set()
+        for log in receipt['logs']:
+            decoded = utils.decode_log(self._events, log)
+            if decoded is not None and decoded[1]["issuer"] == self.issuer_address:
+                anchored.add(bytes(decoded[1]["vcHash"]))
+        return anchored
+
+    def _finish_batch(self, items, tx_hash, future):
+        results = []
+        try:
+            receipt = future.result()
+        except Exception as e:
+            receipt, error = None, f"Receipt: {e}"
+        else:
+            error = "" if receipt['status'] == 1 else "Transaksi revert (issuer belum terverifikasi?)"
+        anchored = self._anchored(receipt) if receipt is not None and not error else set()
+
+        for item in items:
+            result = {"row": item["row"], "name": item["name"], "vc_hash": item["vc_hash"].hex(), "tx_hash": tx_hash.hex()}
+            if error:
+                results.append((dict(result, status="failed", error=error), None))
+            elif bytes(item["vc_hash"]) not in anchored:
+                results.append((dict(result, status="failed", error="Hash duplikat (sudah ter-anchor)"), None))
+            else:
+                final_vc = wrap_credential(item["payload"], item["signature"], self.issuer_did)
+                results.append((dict(result, status="issued", block=receipt['blockNumber'], error=""), final_vc))
+        return results
+
+    def _send_batch(self, items):
+        """Satu transaksi issueCredentials lewat utils.TxSender (retry + sinkron ulang nonce)."""
+        vc_hashes = [item["vc_hash"] for item in items]
+        return self.sender.send(lambda nonce: self._build_tx(vc_hashes, nonce))
+
+    def run(self, rows):
+        self._start()
+        inflight = {}
+        batch = []
+
+        def submit(items):
+            tx_hash, error = self._send_batch(items)
+            if tx_hash is None:
+                return [({"row": item["row"], "name": item["name"], "vc_hash": item["vc_hash"].hex(), "tx_hash": "",
+                          "status": "failed", "error": f"Kirim transaksi: {error}"}, None) for item in items]
+            inflight[pool.submit(self._wait_receipt, tx_hash)] = (items, tx_hash)
+            return []
+
+        with ThreadPoolExecutor(max_workers=self.window) as pool:
+            for item, failed in self._signed_items(rows, self.batch_size):
+                if failed:
+                    yield failed, None
+                    continue
+
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    yield from submit(batch)
+                    batch = []
+
+                # Jendela penuh: tunggu minimal satu receipt sebelum kirim lagi
+                while len(inflight) >= self.window:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from self._finish_batch(*inflight.pop(future), future)
+
+            if batch:
+                yield from submit(batch)
+            for future in list(inflight):
+                yield from self._finish_batch(*inflight.pop(future), future)
+
+REPORT_FIELDS = ["row", "name", "vc_hash", "tx_hash", "root", "status", "block", "error"]
+
+def issue_file(issuer, source, vc_out_path, report_path, on_result=None):
+    """
+    Jalankan BulkIssuer atas file wisudawan. VC yang terbit ditulis
+    bertahap ke `vc_out_path` (JSONL) dan laporan per baris ke `report_path` (CSV).
+    """
+    summary = {"issued": 0, "failed": 0}
+    signed_before = issuer.signer.stats()
+    for path in (vc_out_path, report_path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    with open(vc_out_path, "w", encoding="utf-8") as vc_out, \
+         open(report_path, "w", encoding="utf-8", newline="") as report_out:
+        report = csv.DictWriter(report_out, fieldnames=REPORT_FIELDS, extrasaction="ignore")
+        report.writeheader()
+
+        for result, final_vc in issuer.run(read_graduates(source)):
+            if final_vc is not None:
+                vc_out.write(json.dumps(final_vc) + "\n")
+                vc_out.flush()
+            report.writerow(result)
+            summary[result["status"]] += 1
+            if on_result:
+                on_result(result, summary)
+
+    # Throughput signing (VC + transaksi) selama file ini diproses
+    signed_after = issuer.signer.stats()
+    seconds = signed_after["seconds"] - signed_before["seconds"]
+    summary["signatures"] = signed_after["signatures"] - signed_before["signatures"]
+    summary["signatures_per_sec"] = round(summary["signatures"] / seconds, 1) if seconds > 0 else 0.0
+    return summary
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Penerbitan ijazah massal dari export registrar (CSV/JSONL).")
+    parser.add_argument("source", help="File wisudawan (kolom: name, degree, did)")
+    parser.add_argument("--private-key", required=True, help="Private key kampus (issuer)")
+    parser.add_argument("--out", default="data/issued_vcs.jsonl")
+    parser.add_argument("--report", default="data/issuance_report.csv")
+    parser.add_argument("--window", type=int, default=32, help="Jumlah transaksi in-flight maksimum")
+    parser.add_argument("--merkle-batch", type=int, default=0,
+                        help="Anchor root Merkle per N ijazah (0 = satu transaksi per ijazah)")
+    parser.add_argument("--array-batch", type=int, default=0,
+                        help="Anchor N hash per transaksi issueCredentials (0 = satu transaksi per ijazah)")
+    args = parser.parse_args()
+
+    account = utils.w3.eth.account.from_key(args.private_key)
+    if args.merkle_batch:
+        bulk = MerkleBatchIssuer(utils.get_contract(), account.address, args.private_key, batch_size=args.merkle_batch)
+    elif args.array_batch:
+        bulk = ArrayBatchIssuer(utils.get_contract(), account.address, args.private_key, batch_size=args.array_batch)
+    else:
+        bulk = BulkIssuer(utils.get_contract(), account.address, args.private_key, window=args.window)
+    result = issue_file(
+        bulk, args.source, args.out, args.report,
+        on_result=lambda r, s: print(f"[{r['row']}] {r['status']} {r['vc_hash']} {r['error']}"),
+    )
+    print(f"✅ Selesai: {result['issued']} terbit, {result['failed']} gagal "
+          f"({result['signatures']} signature, {result['signatures_per_sec']:,.1f} sig/s)")
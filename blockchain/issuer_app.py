@@ -1,9 +1,16 @@
 import streamlit as st
 import utils
+import diagnostics
+import issuance
+import selective_disclosure
+import token_codec
+import merkle
 import datetime
-import uuid
+import json
+import os
 
 st.set_page_config(page_title="Issuer Portal", page_icon="🏛️", layout="wide")
+diagnostics.render_panel()
 
 # AKUN KAMPUS (anvil #0)
 ISSUER_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
@@ -14,10 +21,15 @@ ISSUER_DID = f"did:ethr:{ISSUER_ADDRESS}"
 ADMIN_PRIVATE_KEY = "0x2a871d0798f97d79848a013d4936a73bf4cc922c825d33c1cf7073dff6d409c6"
 ADMIN_ADDRESS = "0xa0Ee7A142d267C1f36714E4a8F75612F20a79720"
 
+# Key di-load sekali per proses (bertahan antar rerun)
+ISSUER_SIGNER = utils.get_signer(ISSUER_PRIVATE_KEY)
+ADMIN_SIGNER = utils.get_signer(ADMIN_PRIVATE_KEY)
+
 contract = utils.get_contract()
 if not contract:
     st.error("Gagal load contract. Cek utils.py!")
     st.stop()
+status_cache = utils.get_status_cache(contract)
 
 st.title("🏛️ Portal Akademik (Issuer)")
 st.caption(f"Issuer DID: `{ISSUER_DID}`")
@@ -27,7 +39,7 @@ st.divider()
 col_stat, col_action = st.columns([3, 1])
 
 try:
-    is_active, is_verified, org_name, _ = contract.functions.resolveDID(ISSUER_ADDRESS).call()
+    is_active, is_verified, org_name = status_cache.resolve_did(ISSUER_ADDRESS)
     
     with col_stat:
         if is_active:
@@ -44,21 +56,23 @@ try:
                 tx = contract.functions.registerDID(ISSUER_DID, "Universitas Pendidikan Indonesia").build_transaction({
                     'from': ISSUER_ADDRESS, 'nonce': utils.w3.eth.get_transaction_count(ISSUER_ADDRESS), 'gas': 1000000, 'gasPrice': utils.w3.to_wei('1', 'gwei')
                 })
-                utils.w3.eth.send_raw_transaction(utils.w3.eth.account.sign_transaction(tx, ISSUER_PRIVATE_KEY).raw_transaction)
+                utils.w3.eth.send_raw_transaction(ISSUER_SIGNER.sign_transaction(tx).raw_transaction)
+                status_cache.invalidate(issuer=ISSUER_ADDRESS)
                 st.rerun()
         elif not is_verified:
             if st.button("👑 Self-Verify (Simulasi Admin)"):
                 tx = contract.functions.verifyIssuer(ISSUER_ADDRESS).build_transaction({ # harusnya dari admin
                     'from': ADMIN_ADDRESS, 'nonce': utils.w3.eth.get_transaction_count(ADMIN_ADDRESS), 'gas': 1000000, 'gasPrice': utils.w3.to_wei('1', 'gwei')
                 })
-                utils.w3.eth.send_raw_transaction(utils.w3.eth.account.sign_transaction(tx, ADMIN_PRIVATE_KEY).raw_transaction)
+                utils.w3.eth.send_raw_transaction(ADMIN_SIGNER.sign_transaction(tx).raw_transaction)
+                status_cache.invalidate(issuer=ISSUER_ADDRESS)
                 st.success("Akun Terverifikasi!")
                 st.rerun()
 except Exception as e:
     st.error(f"Blockchain Error: {e}")
 
 # --- TABS MENU ---
-tab_issue, tab_revoke = st.tabs(["📤 Terbitkan Ijazah", "🚨 Cabut Ijazah (Revoke)"])
+tab_issue, tab_bulk, tab_revoke = st.tabs(["📤 Terbitkan Ijazah", "📦 Penerbitan Massal (Wisuda)", "🚨 Cabut Ijazah (Revoke)"])
 
 # TAB 1: PENERBITAN (ANCHORING)
 with tab_issue:
@@ -68,28 +82,43 @@ with tab_issue:
         mhs_name = c1.text_input("Nama Mahasiswa")
         degree = c2.selectbox("Gelar", ["Sarjana Komputer (S.Kom)", "Magister Komputer (M.Kom)"])
         target_did = st.text_input("DID Wallet Mahasiswa", placeholder="did:ethr:0x...")
+        sd_mode = st.checkbox("🔒 Selective Disclosure (mahasiswa bisa membuka field tertentu saja)")
         
         submitted = st.form_submit_button("🔏 Tanda Tangani & Catat di Blockchain")
 
     if submitted:
         if not is_verified:
             st.error("Gagal: Kampus harus Terverifikasi (Centang Biru) dulu sebelum menerbitkan ijazah!")
+        elif sd_mode:
+            # Format sama dengan portal React: hash per field + salt, anchor = Keccak(signature)
+            sd_data = selective_disclosure.create_sd_payload(
+                ISSUER_SIGNER, {"name": mhs_name, "degree": degree, "university": issuance.DEFAULT_UNIVERSITY}
+            )
+            issuance_date = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            final_vc = selective_disclosure.build_sd_credential(ISSUER_DID, target_did, sd_data, issuance_date)
+            vc_hash = selective_disclosure.anchor_hash(sd_data["signature"])
+            try:
+                tx = contract.functions.issueCredential(vc_hash).build_transaction({
+                    'from': ISSUER_ADDRESS,
+                    'nonce': utils.w3.eth.get_transaction_count(ISSUER_ADDRESS),
+                    'gas': 500000, 'gasPrice': utils.w3.to_wei('1', 'gwei')
+                })
+                tx_hash = utils.w3.eth.send_raw_transaction(ISSUER_SIGNER.sign_transaction(tx).raw_transaction)
+                status_cache.invalidate(vc_hash=vc_hash)
+
+                st.success("✅ Ijazah Selective Disclosure Tercatat & Terbit!")
+                st.info(f"🔗 Blockchain Tx: `{tx_hash.hex()}`")
+                st.info(f"🔑 VC Hash (Anchor): `{vc_hash.hex()}`")
+                st.json(final_vc)
+            except Exception as e:
+                st.error(f"Gagal Anchoring: {e}")
         else:
             # 1. Buat Data JSON
-            credential_payload = {
-                "@context": ["https://www.w3.org/2018/credentials/v1"],
-                "id": f"urn:uuid:{str(uuid.uuid4())}",
-                "type": ["VerifiableCredential", "UniversityDegreeCredential"],
-                "issuer": ISSUER_DID,
-                "issuanceDate": datetime.datetime.now(datetime.timezone.utc).isoformat(),
-                "credentialSubject": {
-                    "id": target_did,
-                    "data": {"name": mhs_name, "degree": degree, "university": "Universitas Pendidikan Indonesia"}
-                }
-            }
-
-            # 2. Hitung Hash (Sidik Jari)
-            vc_hash = utils.hash_json(credential_payload)
+            credential_payload = issuance.build_credential_payload(ISSUER_DID, target_did, mhs_name, degree)
+
+            # 2. Hitung Hash (Sidik Jari) - bentuk kanonik dipakai ulang saat sign
+            canonical = utils.canonicalize(credential_payload)
+            vc_hash = utils.hash_json(canonical)
 
             try:
                 # 3. Kirim Hash ke Blockchain (Anchoring)
@@ -98,45 +127,111 @@ with tab_issue:
                     'nonce': utils.w3.eth.get_transaction_count(ISSUER_ADDRESS), 
                     'gas': 500000, 'gasPrice': utils.w3.to_wei('1', 'gwei')
                 })
-                signed_tx = utils.w3.eth.account.sign_transaction(tx, ISSUER_PRIVATE_KEY)
+                signed_tx = ISSUER_SIGNER.sign_transaction(tx)
                 tx_hash = utils.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+                status_cache.invalidate(vc_hash=vc_hash)
 
                 # 4. Sign Off-Chain
-                signature = utils.sign_data(credential_payload, ISSUER_PRIVATE_KEY)
+                signature = ISSUER_SIGNER.sign(canonical)
                 
-                final_vc = {
-                    "credential": credential_payload,
-                    "proof": {
-                        "type": "EcdsaSecp256k1Signature2019",
-                        "verificationMethod": f"{ISSUER_DID}#controller",
-                        "jws": signature
-                    }
-                }
+                final_vc = issuance.wrap_credential(credential_payload, signature, ISSUER_DID)
                 
                 st.success("✅ Ijazah Tercatat & Terbit!")
                 st.info(f"🔗 Blockchain Tx: `{tx_hash.hex()}`")
                 st.info(f"🔑 VC Hash (Anchor): `{vc_hash.hex()}`")
                 st.json(final_vc)
+                with st.expander("📦 Format ringkas (base45 / QR)"):
+                    st.code(token_codec.to_text(final_vc), language="text", wrap_lines=True)
                 
             except Exception as e:
                 st.error(f"Gagal Anchoring: {e}")
 
-# TAB 2: PENCABUTAN (REVOCATION)
+# TAB 2: PENERBITAN MASSAL (WISUDA)
+with tab_bulk:
+    st.subheader("Penerbitan Massal dari Export Registrar")
+    st.write("Unggah file CSV / JSONL dengan kolom `name`, `degree`, `did` (opsional: `university`).")
+    graduates_file = st.file_uploader("File Wisudawan", type=["csv", "jsonl", "ndjson"])
+    mode = st.radio("Mode Anchoring", ["Satu transaksi per ijazah", "Batch hash (banyak hash per transaksi)",
+                                       "Batch Merkle (satu root per batch)"], horizontal=True)
+    if mode.startswith("Batch Merkle"):
+        batch_size = st.number_input("Ijazah per root Merkle", min_value=2, max_value=100000, value=1024)
+    elif mode.startswith("Batch hash"):
+        batch_size = st.number_input("Hash per transaksi", min_value=2, max_value=1000, value=200)
+    else:
+        window = st.slider("Transaksi in-flight maksimum", 1, 128, 32)
+
+    if st.button("🎓 Terbitkan Semua") and graduates_file:
+        if not is_verified:
+            st.error("Gagal: Kampus harus Terverifikasi (Centang Biru) dulu sebelum menerbitkan ijazah!")
+        else:
+            os.makedirs("data", exist_ok=True)
+            stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            vc_out_path = f"data/issued_{stamp}.jsonl"
+            report_path = f"data/issuance_report_{stamp}.csv"
+
+            progress = st.empty()
+            failures = []
+
+            def on_result(result, summary):
+                progress.info(f"⏳ Terbit: {summary['issued']} • Gagal: {summary['failed']}")
+                if result["status"] == "failed":
+                    failures.append(result)
+
+            if mode.startswith("Batch Merkle"):
+                bulk = issuance.MerkleBatchIssuer(contract, ISSUER_ADDRESS, ISSUER_PRIVATE_KEY, batch_size=int(batch_size))
+            elif mode.startswith("Batch hash"):
+                bulk = issuance.ArrayBatchIssuer(contract, ISSUER_ADDRESS, ISSUER_PRIVATE_KEY, batch_size=int(batch_size))
+            else:
+                bulk = issuance.BulkIssuer(contract, ISSUER_ADDRESS, ISSUER_PRIVATE_KEY, window=window)
+            summary = issuance.issue_file(bulk, graduates_file, vc_out_path, report_path, on_result=on_result)
+
+            progress.success(f"✅ Selesai: {summary['issued']} ijazah terbit, {summary['failed']} gagal. "
+                             f"Signing: {summary['signatures_per_sec']:,.1f} signature/detik.")
+            if failures:
+                st.dataframe(failures, use_container_width=True)
+            with open(vc_out_path, "rb") as f:
+                st.download_button("⬇️ Unduh VC (JSONL)", f, file_name=os.path.basename(vc_out_path))
+            with open(report_path, "rb") as f:
+                st.download_button("⬇️ Unduh Laporan (CSV)", f, file_name=os.path.basename(report_path))
+
+# TAB 3: PENCABUTAN (REVOCATION)
 with tab_revoke:
     st.warning("Fitur ini digunakan untuk membatalkan validitas ijazah secara permanen di Blockchain.")
     hash_input = st.text_input("Masukkan Hash VC yang ingin dicabut (Lihat di JSON Verifier):")
+    batch_vc_input = st.text_area("Khusus ijazah hasil Batch Merkle: tempel JSON VC lengkap (hash & bukti diambil otomatis)")
     reason_input = st.text_input("Alasan Pencabutan", value="Kesalahan Data Administrasi")
     
     if st.button("🔥 Cabut Ijazah Permanen"):
-        if hash_input:
+        if batch_vc_input:
+            try:
+                batch_vc = json.loads(batch_vc_input)
+                anchor = merkle.parse_anchor(batch_vc["proof"])
+                if not anchor:
+                    st.error("VC ini tidak di-anchor lewat Batch Merkle. Gunakan kolom Hash VC.")
+                else:
+                    root, path = anchor
+                    vc_hash = utils.hash_json(batch_vc["credential"])
+                    tx = contract.functions.revokeBatchedCredential(root, vc_hash, path, reason_input).build_transaction({
+                        'from': ISSUER_ADDRESS, 
+                        'nonce': utils.w3.eth.get_transaction_count(ISSUER_ADDRESS), 
+                        'gas': 500000, 'gasPrice': utils.w3.to_wei('1', 'gwei')
+                    })
+                    signed = ISSUER_SIGNER.sign_transaction(tx)
+                    utils.w3.eth.send_raw_transaction(signed.raw_transaction)
+                    status_cache.invalidate(vc_hash=merkle.revocation_key(root, vc_hash))
+                    st.error(f"Ijazah {vc_hash.hex()[:10]}... BERHASIL DICABUT!")
+            except Exception as e:
+                st.error(f"Gagal mencabut: {e}")
+        elif hash_input:
             try:
                 tx = contract.functions.revokeCredential(hash_input, reason_input).build_transaction({
                     'from': ISSUER_ADDRESS, 
                     'nonce': utils.w3.eth.get_transaction_count(ISSUER_ADDRESS), 
                     'gas': 500000, 'gasPrice': utils.w3.to_wei('1', 'gwei')
                 })
-                signed = utils.w3.eth.account.sign_transaction(tx, ISSUER_PRIVATE_KEY)
+                signed = ISSUER_SIGNER.sign_transaction(tx)
                 utils.w3.eth.send_raw_transaction(signed.raw_transaction)
+                status_cache.invalidate(vc_hash=utils.w3.to_bytes(hexstr=hash_input))
                 st.error(f"Ijazah {hash_input[:10]}... BERHASIL DICABUT!")
             except Exception as e:
                 st.error(f"Gagal mencabut: {e}")
\ No newline at end of file
@@ -0,0 +1,74 @@
+from web3 import Web3
+
+# --- MERKLE TREE UNTUK ANCHORING BATCH ---
+# Skema sama dengan `_processProof` di SimpleDIDRegistry.sol:
+#   leaf   = keccak256(vcHash)           (double hash, mencegah second-preimage)
+#   parent = keccak256(min(a, b) ++ max(a, b))
+# Node ganjil di ujung level dinaikkan apa adanya ke level berikutnya.
+# Pencabutan satu ijazah di dalam batch dicatat on-chain per root, di kunci
+#   revocation_key = keccak256(root ++ vcHash)   (batchRevocationKey di kontrak)
+
+ANCHOR_TYPE = "MerkleBatchAnchor2025"
+
+def leaf_of(vc_hash):
+    return Web3.keccak(bytes(vc_hash))
+
+def hash_pair(a, b):
+    return Web3.keccak(a + b) if a < b else Web3.keccak(b + a)
+
+def build_levels(vc_hashes):
+    """Semua level tree, dari daun (index 0) sampai root (index terakhir)."""
+    if not vc_hashes:
+        raise ValueError("Batch Merkle tidak boleh kosong")
+    level = [bytes(leaf_of(h)) for h in vc_hashes]
+    levels = [level]
+    while len(level) > 1:
+        nxt = [bytes(hash_pair(level[i], level[i + 1])) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        levels.append(nxt)
+        level = nxt
+    return levels
+
+def root_of(levels):
+    return levels[-1][0]
+
+def proof_for(levels, index):
+    """Daftar hash saudara (sibling) dari daun `index` sampai root."""
+    path = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append(level[sibling])
+        index //= 2
+    return path
+
+def compute_root(vc_hash, path):
+    node = bytes(leaf_of(vc_hash))
+    for sibling in path:
+        node = bytes(hash_pair(node, bytes(sibling)))
+    return node
+
+def verify_proof(vc_hash, path, root):
+    return compute_root(vc_hash, path) == bytes(root)
+
+def revocation_key(root, vc_hash):
+    """Kunci status pencabutan `vc_hash` di dalam batch `root` (lihat revokeBatchedCredential)."""
+    return bytes(Web3.keccak(bytes(root) + bytes(vc_hash)))
+
+# --- FORMAT DI DALAM `proof` VC ---
+def anchor_proof(root, path):
+    return {
+        "type": ANCHOR_TYPE,
+        "merkleRoot": "0x" + bytes(root).hex(),
+        "merklePath": ["0x" + bytes(p).hex() for p in path],
+    }
+
+def parse_anchor(vc_proof):
+    """Return (root, path) jika VC di-anchor lewat batch Merkle, selain itu None."""
+    anchor = vc_proof.get("anchor")
+    if not anchor or anchor.get("type") != ANCHOR_TYPE:
+        return None
+    root = Web3.to_bytes(hexstr=anchor["merkleRoot"])
+    path = [Web3.to_bytes(hexstr=p) for p in anchor["merklePath"]]
+    return root, path
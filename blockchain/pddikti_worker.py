@@ -0,0 +1,304 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+from web3 import Web3
+
+import utils
+
+AGENT_URL = "http://localhost:4000"   # cloud agent (apps/cloud-agent/server.js)
+STATUS_CHUNK = 500                    # hash per panggilan resolveBatch
+
+# --- CEK LAPORAN ---
+def submitted_credential(report):
+    """VC yang dilaporkan kampus (field `credential`, atau `credentialJson` berupa teks)."""
+    credential = report.get("credential") or report.get("credentialJson")
+    if isinstance(credential, str):
+        credential = json.loads(credential)
+    if not isinstance(credential, dict):
+        raise ValueError("laporan tidak berisi credential")
+    # Wrapper {credential, proof} dari issuer_app: yang di-anchor hanya isinya
+    if "credential" in credential and "proof" in credential:
+        credential = credential["credential"]
+    return credential
+
+def expected_hashes(credential):
+    """
+    Hash anchor yang sah untuk credential: hash_json isi VC (issuer_app /
+    issuance.py). VC selective disclosure dari portal React di-anchor
+    sebagai keccak(signature daftar hash), jadi itu juga diterima.
+    """
+    hashes = {bytes(utils.hash_json(credential))}
+    sd_data = (credential.get("credentialSubject") or {}).get("sdData") or {}
+    if isinstance(sd_data.get("signature"), str):
+        hashes.add(bytes(Web3.keccak(text=sd_data["signature"])))
+    return hashes
+
+def reported_issuer(report, credential):
+    """Alamat issuer (lowercase) menurut laporan: field `issuer`, atau DID issuer di credential."""
+    issuer = report.get("issuer") or credential.get("issuer") or ""
+    if isinstance(issuer, dict):
+        issuer = issuer.get("id") or ""
+    return str(issuer).split(":")[-1].lower()
+
+def check_report(report):
+    """Return (vc_hash bytes, alamat issuer laporan, alasan_tolak atau None)."""
+    vc_hash = Web3.to_bytes(hexstr=report["vcHash"])
+    if len(vc_hash) != 32:
+        return vc_hash, None, "vcHash bukan bytes32"
+    try:
+        credential = submitted_credential(report)
+    except (ValueError, TypeError) as e:
+        return vc_hash, None, f"credential tidak valid: {e}"
+    if vc_hash not in expected_hashes(credential):
+        return vc_hash, None, "vcHash tidak cocok dengan hash credential"
+    return vc_hash, reported_issuer(report, credential), None
+
+# --- WORKER VALIDASI ---
+class ValidationWorker:
+    """
+    Worker legalisir PDDikti: kuras inbox `/api/pddikti/reports`, cek ulang
+    hash setiap laporan terhadap credential yang dikirim, cek status on-chain
+    (resolveBatch), lalu validasi per `batch_size` hash dalam satu transaksi
+    `validateCredentials`. Paling banyak `window` transaksi in-flight; nonce
+    dihitung lokal lewat utils.TxSender (retry + sinkron ulang). Laporan yang
+    sudah tuntas (tervalidasi, atau dicabut sehingga tidak mungkin
+    divalidasi) dihapus per (vcHash, reportedAt) lewat `/api/pddikti/clear`.
+
+    Laporan yang hash-nya tidak cocok, atau yang issuer-nya beda dengan
+    issuer yang meng-anchor hash itu on-chain, dibiarkan di inbox untuk
+    diperiksa manual (dan tidak dicek ulang); yang belum di-anchor dicoba
+    lagi di putaran berikutnya. `stats["reports"]` menghitung laporan
+    berbeda (vcHash, reportedAt) sekali saja; `awaiting_anchor` = jumlah
+    hash yang menunggu anchor pada putaran terakhir.
+    """
+
+    def __init__(self, contract, private_key, agent_url=AGENT_URL, batch_size=256, window=4,
+                 gas_base=60000, gas_per_item=35000, gas_price_gwei=1, receipt_timeout=120,
+                 clear_workers=8):
+        self.contract = contract
+        self.signer = utils.get_signer(private_key)
+        self.agent_url = agent_url.rstrip("/")
+        self.batch_size = batch_size
+        self.window = window
+        self.gas_base = gas_base
+        self.gas_per_item = gas_per_item
+        self.gas_price = utils.w3.to_wei(gas_price_gwei, 'gwei')
+        self.receipt_timeout = receipt_timeout
+        self.clear_workers = clear_workers
+        self.session = requests.Session()
+        self._events = utils.event_topic_map(contract, ["CredentialValidated"])
+        self.rejected = {}      # (vcHash, reportedAt) -> alasan (tidak dicek ulang)
+        self.seen = set()       # (vcHash, reportedAt) yang ada di inbox putaran sebelumnya
+        self.sender = None
+        self.stats = {"reports": 0, "validated": 0, "already_validated": 0, "revoked": 0,
+                      "rejected": 0, "awaiting_anchor": 0, "cleared": 0, "transactions": 0, "failed": 0}
+
+    # --- Cloud agent ---
+    def fetch_reports(self):
+        response = self.session.get(f"{self.agent_url}/api/pddikti/reports", timeout=30)
+        response.raise_for_status()
+        return response.json()
+
+    def _clear_one(self, report_key):
+        report_hash, reported_at = report_key
+        response = self.session.post(f"{self.agent_url}/api/pddikti/clear",
+                                     json={"hash": report_hash, "reportedAt": reported_at}, timeout=30)
+        response.raise_for_status()
+
+    def clear(self, report_keys):
+        """
+        Hapus laporan (vcHash, reportedAt) dari inbox, satu laporan per request
+        (dikirim paralel); laporan lain ber-vcHash sama tidak ikut terhapus.
+        """
+        if not report_keys:
+            return
+        with ThreadPoolExecutor(max_workers=self.clear_workers) as pool:
+            for _ in pool.map(self._clear_one, report_keys):
+                self.stats["cleared"] += 1
+        utils.metrics.inc("pddikti_cleared_total", len(report_keys))
+
+    # --- Status on-chain ---
+    def _status(self, hashes):
+        status = {}
+        for i in range(0, len(hashes), STATUS_CHUNK):
+            _, credential_status, _ = utils.resolve_batch(self.contract, [], hashes[i:i + STATUS_CHUNK])
+            status.update(credential_status)
+        return status
+
+    # --- Transaksi ---
+    def _build_tx(self, hashes, nonce):
+        # Dirakit manual (tanpa estimateGas) seperti issuance.BulkIssuer
+        return {
+            'to': self.contract.address,
+            'data': self.contract.encode_abi("validateCredentials", args=[hashes]),
+            'value': 0,
+            'nonce': nonce,
+            'gas': self.gas_base + self.gas_per_item * len(hashes),
+            'gasPrice': self.gas_price,
+            'chainId': self.chain_id,
+        }
+
+    def _send_batch(self, hashes):
+        """Return (tx_hash, None) atau (None, error); lihat utils.TxSender."""
+        return self.sender.send(lambda nonce: self._build_tx(hashes, nonce))
+
+    def _wait_receipt(self, tx_hash):
+        return utils.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.receipt_timeout, poll_latency=0.2)
+
+    def _confirmed(self, receipt):
+        """Hash yang benar-benar divalidasi oleh transaksi ini (event CredentialValidated)."""
+        confirmed = set()
+        for log in receipt['logs']:
+            decoded = utils.decode_log(self._events, log)
+            if decoded is not None:
+                confirmed.add(bytes(decoded[1]["vcHash"]))
+        return confirmed
+
+    def _submit(self, pending):
+        """Kirim validasi per batch. Return set hash yang terkonfirmasi."""
+        hashes = list(pending)
+        confirmed = set()
+        self.chain_id, nonce = utils.rpc_batch(
+            lambda: utils.w3.eth.chain_id,
+            lambda: utils.w3.eth.get_transaction_count(self.signer.address, 'pending'),
+        )
+        self.sender = utils.TxSender(self.signer, nonce)
+        inflight = {}
+
+        def finish(future):
+            batch = inflight.pop(future)
+            try:
+                receipt = future.result()
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                print(f"⚠️ Receipt gagal ({len(batch)} hash): {e}")
+                return
+            if receipt['status'] != 1:
+                self.stats["failed"] += len(batch)
+                print(f"⚠️ Transaksi revert ({len(batch)} hash) - akun ini PDDikti?")
+                return
+            confirmed.update(self._confirmed(receipt))
+
+        with ThreadPoolExecutor(max_workers=self.window) as pool:
+            for i in range(0, len(hashes), self.batch_size):
+                batch = hashes[i:i + self.batch_size]
+                tx_hash, error = self._send_batch(batch)
+                if error is not None:
+                    self.stats["failed"] += len(batch)
+                    print(f"⚠️ Kirim transaksi gagal ({len(batch)} hash): {error}")
+                    continue
+                self.stats["transactions"] += 1
+                inflight[pool.submit(self._wait_receipt, tx_hash)] = batch
+                while len(inflight) >= self.window:
+                    done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(future)
+            for future in list(inflight):
+                finish(future)
+        return confirmed
+
+    # --- Satu putaran ---
+    def run_once(self):
+        """Proses seluruh isi inbox saat ini. Return jumlah laporan yang dihapus dari inbox."""
+        reports = self.fetch_reports()
+        # Laporan yang belum tuntas muncul lagi setiap putaran: hitung sekali per laporan
+        current = {(r.get("vcHash"), r.get("reportedAt")) for r in reports}
+        self.stats["reports"] += len(current - self.seen)
+        self.seen = current
+        self.rejected = {key: reason for key, reason in self.rejected.items() if key in current}
+
+        by_hash = {}        # vc_hash -> [(issuer, (vcHash string persis seperti di laporan, reportedAt))]
+        for report in reports:
+            report_hash = report.get("vcHash")
+            report_key = (report_hash, report.get("reportedAt"))
+            if not isinstance(report_hash, str) or report_key in self.rejected:
+                continue
+            try:
+                vc_hash, issuer, reason = check_report(report)
+            except ValueError as e:
+                vc_hash, issuer, reason = None, None, f"vcHash tidak valid: {e}"
+            if reason is not None:
+                self._reject(report_key, reason)
+                continue
+            by_hash.setdefault(vc_hash, []).append((issuer, report_key))
+
+        status = self._status(list(by_hash))
+        done, pending = [], []
+        self.stats["awaiting_anchor"] = 0
+        for vc_hash, (exists, is_revoked, is_validated, anchored_by) in status.items():
+            if exists:
+                # Hanya laporan dari kampus yang meng-anchor hash ini yang diproses
+                matching = [entry for entry in by_hash[vc_hash] if entry[0] == anchored_by.lower()]
+                for issuer, report_key in by_hash[vc_hash]:
+                    if issuer != anchored_by.lower():
+                        self._reject(report_key, f"issuer laporan {issuer} bukan issuer on-chain {anchored_by}")
+                by_hash[vc_hash] = matching
+                if not matching:
+                    continue
+            if not exists:
+                self.stats["awaiting_anchor"] += 1
+            elif is_validated:
+                self.stats["already_validated"] += 1
+                done.append(vc_hash)
+            elif is_revoked:
+                self.stats["revoked"] += 1
+                done.append(vc_hash)
+            else:
+                pending.append(vc_hash)
+
+        confirmed = self._submit(pending) if pending else set()
+        self.stats["validated"] += len(confirmed)
+        utils.metrics.inc("pddikti_validated_total", len(confirmed))
+
+        # Hash di batch tanpa event (mis. dicabut di antara cek & transaksi) dicek ulang putaran berikutnya.
+        # Hanya laporan yang cocok yang dihapus; laporan ditolak ber-vcHash sama tetap di inbox
+        to_clear = list(dict.fromkeys(
+            report_key for vc_hash in done + list(confirmed) for _, report_key in by_hash[vc_hash]
+        ))
+        self.clear(to_clear)
+        return len(to_clear)
+
+    def _reject(self, report_key, reason):
+        self.rejected[report_key] = reason
+        self.stats["rejected"] += 1
+        print(f"⛔ {report_key[0]}: {reason}")
+
+    def run_forever(self, poll_interval=5.0, on_round=None):
+        """Loop worker: putaran berikutnya langsung jika inbox masih berisi, selain itu tunggu `poll_interval`."""
+        while True:
+            try:
+                cleared = self.run_once()
+            except requests.RequestException as e:
+                print(f"⚠️ Cloud agent tidak bisa dihubungi: {e}")
+                cleared = 0
+            if on_round:
+                on_round(dict(self.stats))
+            if not cleared:
+                time.sleep(poll_interval)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Worker legalisir PDDikti (validasi massal dari inbox cloud agent).")
+    parser.add_argument("--private-key", required=True, help="Private key akun PDDikti")
+    parser.add_argument("--agent-url", default=AGENT_URL)
+    parser.add_argument("--batch-size", type=int, default=256, help="Hash per transaksi validateCredentials")
+    parser.add_argument("--window", type=int, default=4, help="Transaksi in-flight maksimum")
+    parser.add_argument("--interval", type=float, default=5.0, help="Jeda polling saat inbox kosong (detik)")
+    parser.add_argument("--once", action="store_true", help="Proses isi inbox sekali lalu keluar")
+    args = parser.parse_args()
+
+    worker = ValidationWorker(utils.get_contract(), args.private_key, agent_url=args.agent_url,
+                              batch_size=args.batch_size, window=args.window)
+
+    def report(stats):
+        print(f"📋 {stats['validated']} divalidasi • {stats['already_validated']} sudah • {stats['revoked']} dicabut "
+              f"• {stats['awaiting_anchor']} menunggu anchor • {stats['rejected']} ditolak • {stats['cleared']} dihapus")
+
+    if args.once:
+        worker.run_once()
+        report(worker.stats)
+    else:
+        worker.run_forever(args.interval, on_round=report)
@@ -0,0 +1,70 @@
+import datetime
+import secrets
+
+import utils
+
+# --- VERIFIABLE PRESENTATION (Holder) ---
+# Dua format yang sama-sama diterima verification.parse_token:
+#   embedded : {"presentation": {..., "verifiableCredential": [VC, ...]}, "proof"}
+#              holder menandatangani seluruh VC di dalamnya (format lama)
+#   compact  : {"presentation": {..., "credentialDigests": ["0x..", ...]}, "proof", "bundle"}
+#              holder hanya menandatangani amplop kecil (DID, nonce, audience,
+#              daftar digest); VC lengkap dikirim terpisah sebagai bundle
+#              {digest: VC} yang bisa dicek isinya (content-addressed).
+
+VP_CONTEXT = ["https://www.w3.org/2018/credentials/v1"]
+COMPACT_TYPE = "CompactVerifiablePresentation"
+
+def credential_digest(vc_wrapper, content=None):
+    """
+    Alamat konten VC di bundle: Keccak256 JSON kanonik VC lengkap (isi + proof).
+    `content` = CanonicalJSON isi VC yang sudah ada (mis. dari tahap recover);
+    untuk wrapper {credential, proof} JSON kanoniknya cukup disambung.
+    """
+    if content is not None and content.data is vc_wrapper.get("credential"):
+        parts = {key: content if key == "credential" else utils.canonicalize(value)
+                 for key, value in vc_wrapper.items()}
+        return "0x" + utils.CanonicalJSON.compose(vc_wrapper, parts).digest.hex()
+    return "0x" + utils.hash_json(vc_wrapper).hex()
+
+def make_bundle(credentials):
+    """{digest: VC} untuk daftar VC (urutan dipertahankan, duplikat digabung)."""
+    return {credential_digest(vc): vc for vc in credentials}
+
+def _proof(signer, holder_did, payload):
+    return {
+        "type": "EcdsaSecp256k1Signature2019",
+        "verificationMethod": f"{holder_did}#controller",
+        "jws": signer.sign(payload),
+    }
+
+def build_presentation(signer, holder_did, credentials):
+    """VP format lama: seluruh VC di-embed dan ikut ditandatangani."""
+    vp_payload = {
+        "@context": VP_CONTEXT,
+        "type": ["VerifiablePresentation"],
+        "verifiableCredential": list(credentials),
+        "holder": holder_did,
+    }
+    return {"presentation": vp_payload, "proof": _proof(signer, holder_did, vp_payload)}
+
+def build_compact_presentation(signer, holder_did, credentials, audience=None, nonce=None, include_bundle=True):
+    """
+    VP ringkas. Return (token, bundle). Jika `include_bundle`, bundle juga
+    disisipkan di token (satu file siap kirim); jika tidak, bundle dikirim
+    terpisah dan verifier cukup meminta VC yang digest-nya belum pernah dicek.
+    """
+    bundle = make_bundle(credentials)
+    envelope = {
+        "@context": VP_CONTEXT,
+        "type": ["VerifiablePresentation", COMPACT_TYPE],
+        "holder": holder_did,
+        "nonce": nonce or secrets.token_hex(16),
+        "audience": audience,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "credentialDigests": list(bundle),
+    }
+    token = {"presentation": envelope, "proof": _proof(signer, holder_did, envelope)}
+    if include_bundle:
+        token["bundle"] = bundle
+    return token, bundle
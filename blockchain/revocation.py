@@ -0,0 +1,339 @@
+import heapq
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+import utils
+
+INDEX_PATH = "data/revocations.idx"
+
+# Layout file index:
+#   header (64 byte) | bloom filter (bloom_bytes) | record terurut (count x 32 byte)
+# Record = vcHash mentah 32 byte, urut naik, tanpa duplikat.
+# Pencabutan baru (dari event) ditambahkan ke `<path>.tail` (append-only,
+# tidak terurut) sampai di-compact ke file utama lewat rebuild().
+MAGIC = b"SSIREV01"
+HEADER = struct.Struct("<8sQQQI")   # magic, count, cursor blok, bloom_bytes, bloom_k
+HEADER_SIZE = 64
+RECORD_SIZE = 32
+BLOOM_BITS_PER_ITEM = 10            # ~1% false positive dengan k=7
+BLOOM_K = 7
+BLOOM_MIN_BYTES = 1024
+
+def _bloom_positions(vc_hash, m_bits, k):
+    # vcHash sudah berupa Keccak (seragam): cukup double hashing dari potongan byte-nya
+    h1 = int.from_bytes(vc_hash[:8], "little")
+    h2 = int.from_bytes(vc_hash[8:16], "little") | 1
+    return [(h1 + i * h2) % m_bits for i in range(k)]
+
+def _bloom_size(count):
+    return max(BLOOM_MIN_BYTES, (count * BLOOM_BITS_PER_ITEM + 7) // 8)
+
+# --- INDEX PENCABUTAN (Offline, jutaan hash) ---
+class RevocationIndex:
+    """
+    Himpunan vcHash yang sudah dicabut, untuk cek status lokal tanpa RPC.
+
+    Record 32 byte terurut di file yang di-mmap (cari dengan binary search,
+    tidak di-load ke memori), didahului Bloom filter sehingga hash yang
+    tidak dicabut (kasus umum) hampir selalu ditolak tanpa menyentuh record.
+    Event `CredentialRevoked` baru ditambahkan inkremental ke file tail;
+    rebuild() menggabungkan keduanya ke file baru lalu menukarnya secara
+    atomik (os.replace), jadi pembaca tidak pernah melihat file setengah jadi.
+
+    get_logs saat sync tidak memegang lock lookup. Index yang belum selesai
+    dibangun tetap bisa dipakai: hash yang belum tercatat dianggap miss dan
+    ditanyakan ke node seperti biasa (pencabutan tidak pernah dibatalkan,
+    jadi hit selalu benar).
+    """
+
+    def __init__(self, path=INDEX_PATH, contract=None, compact_threshold=65536, max_log_range=2000, poll_interval=5.0):
+        self.path = path
+        self.tail_path = path + ".tail"
+        self.cursor_path = path + ".cursor"
+        self.contract = contract
+        self.compact_threshold = compact_threshold
+        self.max_log_range = max_log_range
+        self.poll_interval = poll_interval
+        self._last_sync = 0.0
+
+        self._lock = threading.RLock()        # lookup & tulis file
+        self._sync_lock = threading.Lock()    # satu sync / rebuild dari chain pada satu waktu
+        self._sync_thread = None
+        self._file = None
+        self._mm = None
+        self.count = 0
+        self.cursor = -1          # blok terakhir yang sudah diproses (-1 = belum pernah)
+        self.tail = set()
+        self._events = utils.event_topic_map(contract, ["CredentialRevoked"]) if contract else None
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if not os.path.exists(path):
+            self._write_index(iter(()), 0, -1)
+        self._open()
+        self._load_tail()
+
+    # --- File ---
+    def _open(self):
+        handle = open(self.path, "rb")
+        mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, cursor, bloom_bytes, bloom_k = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            handle.close()
+            raise ValueError(f"{self.path} bukan file index pencabutan")
+
+        old_file, old_mm = self._file, self._mm
+        self._file, self._mm = handle, mm
+        self.count = count
+        self.cursor = max(self.cursor, cursor - 1)
+        self._bloom_offset = HEADER_SIZE
+        self._bloom_bits = bloom_bytes * 8
+        self._bloom_k = bloom_k
+        self._records_offset = HEADER_SIZE + bloom_bytes
+        if old_mm is not None:
+            old_mm.close()
+            old_file.close()
+
+    def _write_index(self, sorted_hashes, count, cursor):
+        """Tulis index baru ke file sementara lalu tukar atomik. `sorted_hashes` boleh generator."""
+        bloom_bytes = _bloom_size(count)
+        bloom = bytearray(bloom_bytes)
+        m_bits = bloom_bytes * 8
+        tmp_path = self.path + ".tmp"
+
+        written = 0
+        with open(tmp_path, "wb") as out:
+            out.seek(HEADER_SIZE + bloom_bytes)
+            previous = None
+            for vc_hash in sorted_hashes:
+                if vc_hash == previous:
+                    continue
+                out.write(vc_hash)
+                for pos in _bloom_positions(vc_hash, m_bits, BLOOM_K):
+                    bloom[pos >> 3] |= 1 << (pos & 7)
+                previous = vc_hash
+                written += 1
+
+            # cursor disimpan +1 agar 0 berarti "belum pernah sync"
+            out.seek(0)
+            out.write(HEADER.pack(MAGIC, written, cursor + 1, bloom_bytes, BLOOM_K).ljust(HEADER_SIZE, b"\0"))
+            out.write(bloom)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _load_tail(self):
+        if os.path.exists(self.tail_path):
+            with open(self.tail_path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % RECORD_SIZE  # abaikan record terpotong (crash saat append)
+            self.tail = {data[i:i + RECORD_SIZE] for i in range(0, usable, RECORD_SIZE)}
+        if os.path.exists(self.cursor_path):
+            with open(self.cursor_path) as f:
+                self.cursor = max(self.cursor, json.load(f)["cursor"])
+
+    def _save_cursor(self):
+        tmp_path = self.cursor_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"cursor": self.cursor}, f)
+        os.replace(tmp_path, self.cursor_path)
+
+    def _record(self, i):
+        start = self._records_offset + i * RECORD_SIZE
+        return self._mm[start:start + RECORD_SIZE]
+
+    def _iter_records(self):
+        for i in range(self.count):
+            yield self._record(i)
+
+    # --- Lookup ---
+    def _in_bloom(self, vc_hash):
+        mm, offset = self._mm, self._bloom_offset
+        for pos in _bloom_positions(vc_hash, self._bloom_bits, self._bloom_k):
+            if not mm[offset + (pos >> 3)] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def _in_records(self, vc_hash):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            if record < vc_hash:
+                lo = mid + 1
+            elif record > vc_hash:
+                hi = mid
+            else:
+                return True
+        return False
+
+    def __contains__(self, vc_hash):
+        key = bytes(vc_hash)
+        with self._lock:
+            if key in self.tail:
+                return True
+            return self.count > 0 and self._in_bloom(key) and self._in_records(key)
+
+    def __len__(self):
+        return self.count + len(self.tail)
+
+    def revoked(self, vc_hashes):
+        """Subset `vc_hashes` (bytes) yang tercatat dicabut."""
+        return {bytes(h) for h in vc_hashes if h in self}
+
+    def known_status(self, vc_hashes):
+        """
+        Status lokal untuk hash yang dicabut, dalam bentuk hasil
+        `verifyCredentialStatus` (exists, isRevoked, isValidated, issuer).
+        Hash lain tidak ada di hasil dan tetap perlu ditanyakan ke node.
+        """
+        return {vc_hash: (True, True, False, None) for vc_hash in self.revoked(vc_hashes)}
+
+    # --- Tulis ---
+    def add(self, vc_hashes, cursor=None):
+        """Tambah hash (append ke tail). Compact otomatis jika tail melewati ambang."""
+        with self._lock:
+            # dict.fromkeys: hash yang sama bisa muncul dua kali dalam satu batch event
+            fresh = [h for h in dict.fromkeys(bytes(h) for h in vc_hashes) if h not in self]
+            if fresh:
+                with open(self.tail_path, "ab") as f:
+                    f.write(b"".join(fresh))
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.tail.update(fresh)
+            if cursor is not None:
+                self.cursor = cursor
+                self._save_cursor()
+            if len(self.tail) >= self.compact_threshold:
+                self.rebuild()
+            return len(fresh)
+
+    def rebuild(self, vc_hashes=None):
+        """
+        Tulis ulang file utama. Tanpa argumen: gabungkan record lama + tail
+        (merge streaming, tidak memuat seluruh index ke memori). Dengan
+        `vc_hashes`: ganti seluruh isi index dengan himpunan tersebut.
+        """
+        with self._lock:
+            if vc_hashes is None:
+                merged = heapq.merge(self._iter_records(), sorted(self.tail))
+                self._write_index(merged, self.count + len(self.tail), self.cursor)
+            else:
+                hashes = sorted({bytes(h) for h in vc_hashes})
+                self._write_index(iter(hashes), len(hashes), self.cursor)
+            self._open()
+            # Isi tail sudah masuk file utama; crash sebelum baris ini hanya menyisakan duplikat
+            with open(self.tail_path, "wb"):
+                pass
+            self.tail = set()
+
+    # --- Sinkronisasi dengan registry ---
+    def _fetch_revoked(self, from_block, to_block):
+        logs = utils.w3.eth.get_logs({
+            "address": self.contract.address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [list(self._events)],
+        })
+        hashes = []
+        for log in logs:
+            decoded = utils.decode_log(self._events, log)
+            if decoded is not None:
+                hashes.append(bytes(decoded[1]["vcHash"]))
+        return hashes
+
+    def sync(self, force=False):
+        """
+        Tambahkan event CredentialRevoked sejak cursor (paling sering sekali
+        per `poll_interval` detik kecuali `force`). Return jumlah hash baru.
+        """
+        added = 0
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_sync < self.poll_interval:
+                return 0
+            self._last_sync = now
+        with self._sync_lock, utils.metrics.span("revocation_sync"):
+            latest = utils.w3.eth.block_number
+            while self.cursor < latest:
+                to_block = min(latest, self.cursor + self.max_log_range)
+                # get_logs di luar self._lock: lookup tetap jalan selama sync
+                added += self.add(self._fetch_revoked(self.cursor + 1, to_block), cursor=to_block)
+        return added
+
+    def start_background_sync(self):
+        """Sync di thread daemon setiap `poll_interval` detik (sekali per proses)."""
+        with self._lock:
+            if self._sync_thread is None:
+                self._sync_thread = threading.Thread(target=self._sync_loop, daemon=True, name="revocation-sync")
+                self._sync_thread.start()
+
+    def _sync_loop(self):
+        while True:
+            try:
+                self.sync(force=True)
+            except Exception:
+                utils.metrics.inc("revocation_sync_errors_total")
+            time.sleep(self.poll_interval)
+
+    def rebuild_from_chain(self):
+        """Bangun ulang dari nol dengan memindai seluruh event, lalu tukar atomik."""
+        with self._sync_lock:
+            latest = utils.w3.eth.block_number
+            hashes, block = set(), 0
+            while block <= latest:
+                to_block = min(latest, block + self.max_log_range)
+                hashes.update(self._fetch_revoked(block, to_block))
+                block = to_block + 1
+            with self._lock:
+                self.cursor = latest
+                self.rebuild(hashes)
+                self._save_cursor()
+            return len(hashes)
+
+    def close(self):
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._file.close()
+                self._mm = self._file = None
+
+_revocations = None
+_revocations_lock = threading.Lock()
+
+def get_revocation_index(contract):
+    """
+    Satu RevocationIndex per proses server verifier, disinkronkan di
+    background (verifikasi tidak pernah menunggu scan get_logs).
+    """
+    global _revocations
+    with _revocations_lock:
+        if _revocations is None:
+            _revocations = RevocationIndex(contract=contract)
+            _revocations.start_background_sync()
+        return _revocations
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Index pencabutan ijazah (offline).")
+    parser.add_argument("command", choices=["sync", "rebuild", "compact", "check"])
+    parser.add_argument("hashes", nargs="*", help="vcHash (hex) untuk perintah check")
+    parser.add_argument("--path", default=INDEX_PATH)
+    args = parser.parse_args()
+
+    index = RevocationIndex(args.path, contract=utils.get_contract())
+    if args.command == "sync":
+        print(f"🔄 {index.sync(force=True)} pencabutan baru, total {len(index)} (blok #{index.cursor})")
+    elif args.command == "rebuild":
+        print(f"🧱 Index dibangun ulang: {index.rebuild_from_chain()} hash dicabut (blok #{index.cursor})")
+    elif args.command == "compact":
+        index.rebuild()
+        print(f"🧱 Tail digabung: {len(index)} hash dicabut")
+    else:
+        for h in args.hashes:
+            print(f"{h}: {'❌ DICABUT' if utils.w3.to_bytes(hexstr=h) in index else '✅ tidak tercatat dicabut'}")
@@ -0,0 +1,225 @@
+import json
+import os
+from decimal import Decimal
+
+from eth_hash.auto import keccak
+from web3 import Web3
+
+import utils
+
+# --- SELECTIVE DISCLOSURE (Interoperabel dengan apps/*/src/utils/selectiveDisclosure.ts) ---
+# Issuer  : per field hash = Keccak256("key:value|salt") (salt 16 byte hex),
+#           daftar hash diurutkan lalu JSON.stringify-nya ditandatangani (EIP-191).
+#           VC -> credentialSubject.sdData {rawValues, salts, hashes, signature};
+#           hash anchor on-chain = Keccak256(signature) (sama dengan IssuerPage.tsx).
+# Holder  : presentasi {revealed: [{key, value, salt, hash}], hiddenHashes, signature, issuerDID}
+# Verifier: hitung ulang hash field yang dibuka, gabung dengan hiddenHashes,
+#           urutkan, recover signer.
+# Data bertingkat (mis. transkrip dengan daftar mata kuliah) diratakan menjadi
+# field ber-path ("courses.0.grade"); portal React membacanya sebagai field biasa.
+
+SD_TYPE = "SelectiveDisclosureCredential"
+SALT_BYTES = 16
+
+# --- NILAI FIELD (Sama dengan String(value) di JavaScript) ---
+def _js_number(value):
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value == 0:
+        return "0"
+    # Digit terpendek Python & JS sama; hanya aturan notasi eksponen yang beda
+    sign, digits, exponent = Decimal(repr(abs(value))).normalize().as_tuple()
+    digits = "".join(map(str, digits))
+    k, n = len(digits), exponent + len(digits)
+    if k <= n <= 21:
+        text = digits + "0" * (n - k)
+    elif 0 < n <= 21:
+        text = digits[:n] + "." + digits[n:]
+    elif -6 < n <= 0:
+        text = "0." + "0" * -n + digits
+    else:
+        mantissa = digits[0] + ("." + digits[1:] if k > 1 else "")
+        text = f"{mantissa}e{'+' if n - 1 >= 0 else '-'}{abs(n - 1)}"
+    return ("-" if value < 0 else "") + text
+
+def field_value(value):
+    """Representasi string sebuah nilai field, identik dengan String(value) di JS."""
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        # Angka JS selalu double: di atas 2^53 presisinya hilang, >= 1e21 bernotasi eksponen
+        if abs(value) <= 2 ** 53:
+            return str(value)
+        try:
+            return _js_number(float(value))
+        except OverflowError:
+            return "Infinity" if value > 0 else "-Infinity"
+    if isinstance(value, float):
+        return _js_number(value)
+    if isinstance(value, (list, tuple)):
+        return ",".join("" if item is None else field_value(item) for item in value)
+    return "[object Object]"
+
+def flatten_fields(data, prefix=""):
+    """{path: string} dari data credential; dict & list bertingkat diratakan dengan titik."""
+    fields = {}
+    items = data.items() if isinstance(data, dict) else enumerate(data)
+    for key, value in items:
+        path = f"{prefix}{key}"
+        if isinstance(value, (dict, list)) and value:
+            fields.update(flatten_fields(value, path + "."))
+        else:
+            fields[path] = field_value(value)
+    return fields
+
+def field_hash(key, value, salt):
+    return "0x" + keccak(f"{key}:{value}|{salt}".encode('utf-8')).hex()
+
+def signed_payload(hashes):
+    """Teks yang ditandatangani issuer: JSON.stringify(hash terurut)."""
+    return json.dumps(sorted(hashes), separators=(",", ":"))
+
+def anchor_hash(signature):
+    """Hash anchor on-chain untuk credential SD: Keccak256(UTF-8 signature)."""
+    return Web3.keccak(text=signature)
+
+# --- ISSUER ---
+def create_sd_payloads(signer, records):
+    """
+    sdData untuk banyak credential dalam satu lintasan: salt seluruh field
+    diambil dari satu buffer os.urandom, hash dihitung dalam satu loop, dan
+    daftar hash ditandatangani lewat signer.sign_messages (paralel jika banyak).
+    """
+    all_fields = [flatten_fields(record) for record in records]
+    total = sum(len(fields) for fields in all_fields)
+    entropy = os.urandom(SALT_BYTES * total).hex()
+    step = SALT_BYTES * 2
+
+    payloads, offset = [], 0
+    for fields in all_fields:
+        salts, hashes = {}, {}
+        for key, value in fields.items():
+            salt = "0x" + entropy[offset:offset + step]
+            offset += step
+            salts[key] = salt
+            hashes[key] = field_hash(key, value, salt)
+        payloads.append({"rawValues": fields, "salts": salts, "hashes": hashes})
+
+    signatures = signer.sign_messages([signed_payload(p["hashes"].values()) for p in payloads])
+    for payload, signature in zip(payloads, signatures):
+        payload["signature"] = "0x" + signature
+    return payloads
+
+def create_sd_payload(signer, data):
+    return create_sd_payloads(signer, [data])[0]
+
+def build_sd_credential(issuer_did, holder_did, sd_data, issuance_date):
+    """VC selective disclosure, struktur sama dengan vcPayload di IssuerPage.tsx."""
+    return {
+        "@context": ["https://www.w3.org/2018/credentials/v1"],
+        "type": ["VerifiableCredential", SD_TYPE],
+        "issuer": issuer_did,
+        "issuanceDate": issuance_date,
+        "credentialSubject": {"id": holder_did, "sdData": sd_data},
+    }
+
+def is_sd_credential(vc):
+    vc = vc.get("credential", vc)
+    return "sdData" in (vc.get("credentialSubject") or {})
+
+# --- HOLDER ---
+def create_presentation(full_vc, keys_to_reveal):
+    """Presentasi SD: field di `keys_to_reveal` dibuka, sisanya hanya hash-nya."""
+    full_vc = full_vc.get("credential", full_vc)
+    sd_data = full_vc["credentialSubject"].get("sdData") or full_vc["credentialSubject"]
+    reveal = set(keys_to_reveal)
+    unknown = reveal.difference(sd_data["rawValues"])
+    if unknown:
+        raise KeyError(f"Field tidak ada di credential: {', '.join(sorted(unknown))}")
+
+    revealed, hidden = [], []
+    for key, value in sd_data["rawValues"].items():
+        if key in reveal:
+            revealed.append({"key": key, "value": value, "salt": sd_data["salts"][key], "hash": sd_data["hashes"][key]})
+        else:
+            hidden.append(sd_data["hashes"][key])
+    return {"revealed": revealed, "hiddenHashes": hidden, "signature": sd_data["signature"], "issuerDID": full_vc["issuer"]}
+
+# --- VERIFIER ---
+def is_sd_presentation(token):
+    return isinstance(token, dict) and "revealed" in token and "hiddenHashes" in token
+
+def verify_presentation(vp, required=()):
+    """
+    Tahap off-chain. Return dict {signer, signature_valid, revealed {key: value},
+    hidden, missing, errors, anchor_hash}. Hash field yang dibuka dihitung
+    ulang; hiddenHashes dipakai sebagai set (cek duplikat & tumpang tindih
+    dengan field yang dibuka); recover signer memakai cache utils.
+    """
+    errors = []
+    revealed, revealed_hashes = {}, []
+    for item in vp["revealed"]:
+        value = field_value(item["value"])
+        if field_hash(item["key"], value, item["salt"]) != item["hash"]:
+            errors.append(f"Hash field '{item['key']}' tidak cocok")
+        revealed[item["key"]] = value
+        revealed_hashes.append(item["hash"])
+
+    hidden = set(vp["hiddenHashes"])
+    all_hashes = revealed_hashes + list(vp["hiddenHashes"])
+    if len(hidden) != len(vp["hiddenHashes"]) or not hidden.isdisjoint(revealed_hashes) \
+            or len(set(revealed_hashes)) != len(revealed_hashes):
+        errors.append("Daftar hash mengandung duplikat")
+
+    signer = None
+    try:
+        signer = utils.recover_message(signed_payload(all_hashes), vp["signature"])
+    except Exception:
+        errors.append("Signature tidak bisa di-recover")
+    signature_valid = not errors and f"did:ethr:{signer}".lower() == str(vp.get("issuerDID", "")).lower()
+
+    return {
+        "signer": signer,
+        "issuer_did": vp.get("issuerDID"),
+        "signature_valid": signature_valid,
+        "revealed": revealed,
+        "hidden": len(hidden),
+        "missing": [key for key in required if key not in revealed],
+        "errors": errors,
+        "anchor_hash": anchor_hash(vp["signature"]),
+    }
+
+def status_keys(report):
+    """Issuer & hash anchor yang perlu di-resolve on-chain (pasangan verification.status_keys)."""
+    return ([report["signer"]] if report["signer"] else []), [report["anchor_hash"]]
+
+def apply_status(report, issuer_status, credential_status, block_number):
+    """Lengkapi hasil verify_presentation dengan status issuer & anchor; hitung `passed`."""
+    is_active, is_verified, org_name = issuer_status.get(report["signer"], (False, False, ""))
+    exists, is_revoked, is_validated, _ = credential_status[bytes(report["anchor_hash"])]
+    report.update({
+        "block": block_number,
+        "issuer": {"active": is_active, "verified": is_verified, "name": org_name},
+        "status": "revoked" if is_revoked else ("anchored" if exists else "unregistered"),
+        "validated": is_validated,
+        "anchor_hash": "0x" + bytes(report["anchor_hash"]).hex(),
+    })
+    report["passed"] = bool(
+        report["signature_valid"] and is_active and is_verified
+        and report["status"] != "revoked" and not report["missing"]
+    )
+    return report
+
+def verify_sd_token(vp, status_source, required=()):
+    """
+    Verifikasi sync: off-chain + status issuer & anchor lewat
+    `status_source.resolve_batch` (utils.StatusCache / status_history).
+    """
+    report = verify_presentation(vp, required)
+    return apply_status(report, *status_source.resolve_batch(*status_keys(report)))
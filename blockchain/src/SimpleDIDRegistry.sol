@@ -13,14 +13,30 @@ contract SimpleDIDRegistry {
         uint256 registeredAt;
     }
 
+    // Dikemas dalam SATU slot storage: 20 (issuer) + 8 (issuedAt) + 3 flag = 31 byte,
+    // jadi anchor satu ijazah hanya menulis satu slot (sebelumnya tiga).
     struct CredentialStatus {
         address issuer;
-        uint256 issuedAt;
+        uint64 issuedAt;
         bool isRevoked;
         bool exists;
         bool isValidated;
     }
 
+    // Hasil baca massal untuk resolveBatch (satu eth_call per VP)
+    struct IssuerView {
+        bool active;
+        bool isVerified;
+        string name;
+    }
+
+    struct CredentialView {
+        bool exists;
+        bool isRevoked;
+        bool isValidated;
+        address issuer;
+    }
+
     address public kemendikbud; // kemendikbud
     address public pddikti;
 
@@ -79,15 +95,26 @@ contract SimpleDIDRegistry {
     
     // 3. CATAT IJAZAH (Anchoring)
     function issueCredential(bytes32 _vcHash) external onlyVerifiedIssuer {
-        require(!credentials[_vcHash].exists, "Hash ini sudah ada!");
-        credentials[_vcHash] = CredentialStatus({
-            issuer: msg.sender,
-            issuedAt: block.timestamp,
-            isRevoked: false,
-            exists: true,
-            isValidated: false
-        });
+        require(_anchor(_vcHash), "Hash ini sudah ada!");
+    }
+
+    // 3a. CATAT IJAZAH MASSAL - satu transaksi untuk banyak hash (hari wisuda).
+    // Hash yang sudah ada dilewati (bukan revert) agar satu duplikat tidak
+    // menggagalkan batch; hash yang benar-benar tercatat ditandai event CredentialAnchored.
+    function issueCredentials(bytes32[] calldata _vcHashes) external onlyVerifiedIssuer returns (uint256 anchored) {
+        for (uint256 i = 0; i < _vcHashes.length; i++) {
+            if (_anchor(_vcHashes[i])) anchored++;
+        }
+    }
+
+    function _anchor(bytes32 _vcHash) internal returns (bool) {
+        CredentialStatus storage c = credentials[_vcHash];
+        if (c.exists) return false;
+        c.issuer = msg.sender;
+        c.issuedAt = uint64(block.timestamp);
+        c.exists = true;
         emit CredentialAnchored(_vcHash, msg.sender);
+        return true;
     }
 
     function validateCredential(bytes32 _vcHash) external onlyPDDikti {
@@ -98,6 +125,20 @@ contract SimpleDIDRegistry {
         emit CredentialValidated(_vcHash);
     }
 
+    // 3b. VALIDASI MASSAL (PDDikti) - satu transaksi untuk banyak laporan.
+    // Hash yang belum di-anchor, sudah dicabut, atau sudah divalidasi dilewati
+    // (bukan revert) agar satu laporan bermasalah tidak menggagalkan batch;
+    // hash yang benar-benar divalidasi ditandai event CredentialValidated.
+    function validateCredentials(bytes32[] calldata _vcHashes) external onlyPDDikti returns (uint256 validated) {
+        for (uint256 i = 0; i < _vcHashes.length; i++) {
+            CredentialStatus storage c = credentials[_vcHashes[i]];
+            if (!c.exists || c.isRevoked || c.isValidated) continue;
+            c.isValidated = true;
+            emit CredentialValidated(_vcHashes[i]);
+            validated++;
+        }
+    }
+
     // 4. CABUT IJAZAH (Revocation)
     function revokeCredential(bytes32 _vcHash, string memory _reason) external {
         require(credentials[_vcHash].issuer == msg.sender, "Bukan penerbit asli!");
@@ -105,6 +146,48 @@ contract SimpleDIDRegistry {
         emit CredentialRevoked(_vcHash, _reason);
     }
 
+    // 4b. CABUT IJAZAH DARI BATCH MERKLE
+    // Root batch di-anchor lewat issueCredential; ijazah di dalamnya dicabut satu per satu
+    // dengan menyertakan bukti inklusi Merkle terhadap root tersebut. Status pencabutan
+    // disimpan per root (batchRevocationKey), bukan di hash VC: penerbit lain yang membuat
+    // root sendiri berisi hash yang sama tidak bisa mencabut / menduduki ijazah ini.
+    function revokeBatchedCredential(bytes32 _root, bytes32 _vcHash, bytes32[] calldata _proof, string memory _reason)
+        external
+    {
+        CredentialStatus storage root = credentials[_root];
+        require(root.issuer == msg.sender, "Bukan penerbit asli!");
+        require(_processProof(_proof, keccak256(abi.encodePacked(_vcHash))) == _root, "Bukti Merkle tidak valid!");
+
+        bytes32 key = batchRevocationKey(_root, _vcHash);
+        CredentialStatus storage c = credentials[key];
+        // Kunci ini hanya sah milik penerbit root; anchor langsung oleh pihak lain ditimpa
+        if (!c.exists || c.issuer != msg.sender) {
+            c.issuer = msg.sender;
+            c.issuedAt = root.issuedAt;
+            c.exists = true;
+            c.isValidated = false;
+            emit CredentialAnchored(key, msg.sender);
+        }
+        c.isRevoked = true;
+        emit CredentialRevoked(key, _reason);
+    }
+
+    // Kunci status pencabutan ijazah `_vcHash` di dalam batch `_root` (sama dengan merkle.revocation_key)
+    function batchRevocationKey(bytes32 _root, bytes32 _vcHash) public pure returns (bytes32) {
+        return keccak256(abi.encodePacked(_root, _vcHash));
+    }
+
+    // leaf = keccak256(vcHash), parent = keccak256(sorted(a, b)) - sama dengan merkle.py
+    function _processProof(bytes32[] calldata _proof, bytes32 _leaf) internal pure returns (bytes32 computed) {
+        computed = _leaf;
+        for (uint256 i = 0; i < _proof.length; i++) {
+            bytes32 sibling = _proof[i];
+            computed = computed < sibling
+                ? keccak256(abi.encodePacked(computed, sibling))
+                : keccak256(abi.encodePacked(sibling, computed));
+        }
+    }
+
     // 5. CEK STATUS (View)
     function resolveDID(address _issuer) external view returns (bool, bool, string memory, string memory, string memory) {
         DIDDocument memory doc = dids[_issuer];
@@ -120,4 +203,23 @@ contract SimpleDIDRegistry {
         CredentialStatus memory c = credentials[_vcHash];
         return (c.exists, c.isRevoked, c.isValidated, c.issuer);
     }
-}
\ No newline at end of file
+
+    // 6. CEK STATUS MASSAL (View) - Semua issuer & hash dalam satu VP sekaligus
+    function resolveBatch(address[] calldata _issuers, bytes32[] calldata _vcHashes)
+        external
+        view
+        returns (IssuerView[] memory issuers, CredentialView[] memory creds)
+    {
+        issuers = new IssuerView[](_issuers.length);
+        for (uint256 i = 0; i < _issuers.length; i++) {
+            DIDDocument storage doc = dids[_issuers[i]];
+            issuers[i] = IssuerView(doc.active, doc.isVerified, doc.metadata);
+        }
+
+        creds = new CredentialView[](_vcHashes.length);
+        for (uint256 i = 0; i < _vcHashes.length; i++) {
+            CredentialStatus storage c = credentials[_vcHashes[i]];
+            creds[i] = CredentialView(c.exists, c.isRevoked, c.isValidated, c.issuer);
+        }
+    }
+}
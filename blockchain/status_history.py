@@ -0,0 +1,315 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import utils
+
+DB_PATH = "data/status_history.db"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# Setiap baris = state LENGKAP sebuah kredensial / issuer sesudah satu event,
+# jadi "status per blok T" cukup satu seek index: baris terakhir dengan
+# (block_number, log_index) <= T.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS credential_states (
+    vc_hash      TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index    INTEGER NOT NULL,
+    timestamp    INTEGER NOT NULL,
+    event        TEXT NOT NULL,
+    is_revoked   INTEGER NOT NULL,
+    is_validated INTEGER NOT NULL,
+    issuer       TEXT,
+    PRIMARY KEY (vc_hash, block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS issuer_states (
+    address      TEXT NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index    INTEGER NOT NULL,
+    timestamp    INTEGER NOT NULL,
+    event        TEXT NOT NULL,
+    is_verified  INTEGER NOT NULL,
+    name         TEXT NOT NULL,
+    PRIMARY KEY (address, block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    id         INTEGER PRIMARY KEY CHECK (id = 0),
+    cursor     INTEGER NOT NULL,
+    block_hash TEXT
+);
+"""
+
+class HistoryNotSynced(RuntimeError):
+    """Blok yang diminta belum terindeks (sync background masih mengejar head)."""
+
+# --- RIWAYAT STATUS (Point-in-time) ---
+class StatusHistory:
+    """
+    Index riwayat status kredensial & issuer dari event registry.
+
+    Menjawab "bagaimana status ijazah / kampus ini per blok atau waktu T"
+    tanpa replay log: setiap transisi (CredentialAnchored / Validated /
+    Revoked, DIDRegistered / IssuerVerified) disimpan sebagai state lengkap
+    dengan nomor blok & timestamp, di-index per kunci + blok (B-tree,
+    logaritmik). Jika hash blok di cursor berubah (reorg), `confirmations`
+    blok terakhir diindeks ulang.
+    """
+
+    WATCHED_EVENTS = (
+        "DIDRegistered", "IssuerVerified",
+        "CredentialAnchored", "CredentialValidated", "CredentialRevoked",
+    )
+
+    def __init__(self, contract, db_path=DB_PATH, confirmations=12, max_log_range=2000, poll_interval=5.0):
+        self.contract = contract
+        self.db_path = db_path
+        self.confirmations = confirmations
+        self.max_log_range = max_log_range
+        self.poll_interval = poll_interval
+        self._events = utils.event_topic_map(contract, self.WATCHED_EVENTS)
+        self._block_times = {}    # nomor blok -> timestamp (cache pencarian waktu)
+        self._write_lock = threading.Lock()
+        self._sync_thread = None
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _db(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # --- Cursor ---
+    def cursor(self, conn=None):
+        """Blok terakhir yang sudah diindeks (-1 jika belum ada)."""
+        if conn is None:
+            with self._db() as conn:
+                return self.cursor(conn)
+        row = conn.execute("SELECT cursor FROM sync_state WHERE id = 0").fetchone()
+        return -1 if row is None else row["cursor"]
+
+    def _check_reorg(self, conn):
+        row = conn.execute("SELECT cursor, block_hash FROM sync_state WHERE id = 0").fetchone()
+        if row is None or row["block_hash"] is None:
+            return
+        if "0x" + bytes(utils.w3.eth.get_block(row["cursor"])["hash"]).hex() == row["block_hash"]:
+            return
+        # Chain di cursor berubah: buang jendela konfirmasi lalu indeks ulang
+        self._block_times.clear()
+        rollback_to = max(-1, row["cursor"] - self.confirmations - 1)
+        conn.execute("DELETE FROM credential_states WHERE block_number > ?", (rollback_to,))
+        conn.execute("DELETE FROM issuer_states WHERE block_number > ?", (rollback_to,))
+        conn.execute("UPDATE sync_state SET cursor = ?, block_hash = NULL WHERE id = 0", (rollback_to,))
+
+    # --- Indexing ---
+    def _timestamp(self, number):
+        if number not in self._block_times:
+            self._block_times[number] = utils.w3.eth.get_block(number)["timestamp"]
+        return self._block_times[number]
+
+    def _latest_credential(self, conn, vc_hash):
+        return conn.execute(
+            """SELECT is_revoked, is_validated, issuer FROM credential_states WHERE vc_hash = ?
+               ORDER BY block_number DESC, log_index DESC LIMIT 1""", (vc_hash,)
+        ).fetchone()
+
+    def _latest_issuer(self, conn, address):
+        return conn.execute(
+            """SELECT is_verified, name FROM issuer_states WHERE address = ?
+               ORDER BY block_number DESC, log_index DESC LIMIT 1""", (address,)
+        ).fetchone()
+
+    def _apply(self, conn, log):
+        decoded = utils.decode_log(self._events, log)
+        if decoded is None:
+            return
+        name, args = decoded
+        number, log_index = log["blockNumber"], log["logIndex"]
+        position = (number, log_index, self._timestamp(number), name)
+
+        if name in ("DIDRegistered", "IssuerVerified"):
+            address = (args.get("owner") or args["issuer"]).lower()
+            previous = self._latest_issuer(conn, address)
+            if name == "DIDRegistered":
+                # registerDID menimpa dokumen & mereset centang biru
+                state = (0, args["name"])
+            else:
+                state = (1, previous["name"] if previous else "")
+            conn.execute("INSERT OR REPLACE INTO issuer_states VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (address,) + position + state)
+            return
+
+        vc_hash = "0x" + bytes(args["vcHash"]).hex()
+        previous = self._latest_credential(conn, vc_hash)
+        revoked, validated, issuer = tuple(previous) if previous else (0, 0, None)
+        if name == "CredentialAnchored":
+            revoked, validated, issuer = 0, 0, args["issuer"]
+        elif name == "CredentialValidated":
+            validated = 1
+        else:
+            revoked = 1
+            if issuer is None:
+                # Pencabutan ijazah batch Merkle: leaf baru tercatat saat dicabut oleh pengirim tx
+                issuer = utils.w3.eth.get_transaction(log["transactionHash"])["from"]
+        conn.execute("INSERT OR REPLACE INTO credential_states VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     (vc_hash,) + position + (revoked, validated, issuer))
+
+    def sync(self):
+        """Indeks event sampai head. Return jumlah event baru."""
+        applied = 0
+        with self._write_lock, self._db() as conn, utils.metrics.span("status_history_sync"):
+            self._check_reorg(conn)
+            latest = utils.w3.eth.block_number
+            cursor = self.cursor(conn)
+            while cursor < latest:
+                to_block = min(latest, cursor + self.max_log_range)
+                logs = utils.w3.eth.get_logs({
+                    "address": self.contract.address,
+                    "fromBlock": cursor + 1,
+                    "toBlock": to_block,
+                    "topics": [list(self._events)],
+                })
+                for log in sorted(logs, key=lambda l: (l["blockNumber"], l["logIndex"])):
+                    self._apply(conn, log)
+                applied += len(logs)
+                cursor = to_block
+                block_hash = "0x" + bytes(utils.w3.eth.get_block(cursor)["hash"]).hex()
+                conn.execute("INSERT OR REPLACE INTO sync_state VALUES (0, ?, ?)", (cursor, block_hash))
+                conn.commit()  # cursor & state selalu tersimpan bersama
+        return applied
+
+    def start_background_sync(self):
+        """Sync di thread daemon setiap `poll_interval` detik (sekali per proses)."""
+        with self._write_lock:
+            if self._sync_thread is None:
+                self._sync_thread = threading.Thread(target=self._sync_loop, daemon=True, name="status-history-sync")
+                self._sync_thread.start()
+
+    def _sync_loop(self):
+        while True:
+            try:
+                self.sync()
+            except Exception:
+                utils.metrics.inc("status_history_sync_errors_total")
+            time.sleep(self.poll_interval)
+
+    # --- Waktu -> blok ---
+    def block_at(self, timestamp):
+        """Blok terakhir dengan timestamp <= `timestamp` (binary search, O(log n) RPC). None jika sebelum genesis."""
+        lo, hi = 0, utils.w3.eth.block_number
+        if self._timestamp(lo) > timestamp:
+            return None
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self._timestamp(mid) <= timestamp:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    # --- Query point-in-time ---
+    def credential_status(self, vc_hash, block, conn=None):
+        """(exists, isRevoked, isValidated, issuer) per blok `block`, sama dengan verifyCredentialStatus."""
+        if conn is None:
+            with self._db() as conn:
+                return self.credential_status(vc_hash, block, conn)
+        row = conn.execute(
+            """SELECT is_revoked, is_validated, issuer FROM credential_states
+               WHERE vc_hash = ? AND block_number <= ?
+               ORDER BY block_number DESC, log_index DESC LIMIT 1""",
+            ("0x" + bytes(vc_hash).hex(), block),
+        ).fetchone()
+        if row is None:
+            return (False, False, False, ZERO_ADDRESS)
+        return (True, bool(row["is_revoked"]), bool(row["is_validated"]), row["issuer"])
+
+    def issuer_status(self, address, block, conn=None):
+        """(isActive, isVerified, name) per blok `block`, sama dengan resolveDID[0:3]."""
+        if conn is None:
+            with self._db() as conn:
+                return self.issuer_status(address, block, conn)
+        # verifyIssuer tidak mensyaratkan DID terdaftar: IssuerVerified saja tidak
+        # membuat issuer aktif, hanya DIDRegistered (sama dengan dids[..].active)
+        row = conn.execute(
+            """SELECT is_verified, name, EXISTS(
+                   SELECT 1 FROM issuer_states
+                   WHERE address = :address AND block_number <= :block AND event = 'DIDRegistered'
+               ) AS is_active
+               FROM issuer_states
+               WHERE address = :address AND block_number <= :block
+               ORDER BY block_number DESC, log_index DESC LIMIT 1""",
+            {"address": address.lower(), "block": block},
+        ).fetchone()
+        if row is None:
+            return (False, False, "")
+        return (bool(row["is_active"]), bool(row["is_verified"]), row["name"])
+
+    def history(self, vc_hash=None, address=None):
+        """Seluruh transisi sebuah kredensial atau issuer (urut waktu)."""
+        with self._db() as conn:
+            if vc_hash is not None:
+                rows = conn.execute(
+                    "SELECT * FROM credential_states WHERE vc_hash = ? ORDER BY block_number, log_index",
+                    ("0x" + bytes(vc_hash).hex(),),
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT * FROM issuer_states WHERE address = ? ORDER BY block_number, log_index",
+                    (address.lower(),),
+                ).fetchall()
+        return [dict(r) for r in rows]
+
+    def at(self, block=None, timestamp=None):
+        """Sumber status untuk verification.verify_token per blok / waktu tertentu."""
+        if block is None:
+            block = self.block_at(timestamp) if timestamp is not None else self.cursor()
+        return AsOfStatus(self, block)
+
+class AsOfStatus:
+    """Antarmuka `resolve_batch` (seperti utils.StatusCache), dibaca dari riwayat pada satu blok."""
+
+    def __init__(self, history, block):
+        self.history = history
+        self.block = block
+
+    def resolve_batch(self, issuer_addrs, vc_hashes):
+        if self.block is None:
+            # Waktu yang diminta sebelum genesis: belum ada apa pun
+            return ({addr: (False, False, "") for addr in issuer_addrs},
+                    {bytes(h): (False, False, False, ZERO_ADDRESS) for h in vc_hashes}, None)
+        with self.history._db() as conn:
+            # Di atas cursor riwayat belum lengkap: jawaban "belum ada" bisa keliru
+            cursor = self.history.cursor(conn)
+            if self.block > cursor:
+                raise HistoryNotSynced(f"Index riwayat baru sampai Blok #{cursor}, belum mencapai Blok #{self.block}.")
+            issuer_status = {addr: self.history.issuer_status(addr, self.block, conn) for addr in issuer_addrs}
+            credential_status = {bytes(h): self.history.credential_status(h, self.block, conn) for h in vc_hashes}
+        return issuer_status, credential_status, self.block
+
+_history = None
+_history_lock = threading.Lock()
+
+def get_status_history(contract):
+    """
+    Satu StatusHistory per proses server, disinkronkan di background
+    (query as-of tidak pernah menunggu scan get_logs; lihat cursor()).
+    """
+    global _history
+    with _history_lock:
+        if _history is None or _history.contract is not contract:
+            _history = StatusHistory(contract)
+            _history.start_background_sync()
+        return _history
+
+if __name__ == "__main__":
+    history = StatusHistory(utils.get_contract())
+    print(f"📜 {history.sync()} event baru, terindeks sampai blok #{history.cursor()}")
@@ -0,0 +1,247 @@
+import codecs
+import json
+from collections import deque
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+
+import selective_disclosure
+import token_codec
+import verification
+
+try:
+    import ijson
+except ImportError:  # opsional: fallback parser inkremental murni Python di bawah
+    ijson = None
+
+CREDENTIALS_PATH = ["presentation", "verifiableCredential", "item"]   # prefix ijson elemen array VC
+READ_SIZE = 64 * 1024
+MAX_ELEMENT_SIZE = 32 * 1024 * 1024   # batas satu nilai JSON utuh di parser fallback (karakter)
+
+# --- PARSER INKREMENTAL ---
+# Keduanya menghasilkan event yang sama:
+#   ("credential", vc_wrapper)  untuk setiap VC di presentation.verifiableCredential
+#   ("token", kerangka)          sekali di akhir: token tanpa isi array VC
+#                                (holder, proof, atau VC mentah jika bukan VP)
+
+def _iter_ijson(stream):
+    token = ijson.ObjectBuilder()
+    item, depth = None, 0
+    # basic_parse + prefix dirakit sendiri: ijson.parse (yajl2_c) merakit string
+    # prefix setiap event sekaligus per chunk, kuadratik pada JSON yang sangat dalam
+    path = []   # per tingkat terbuka: key terakhir (objek) / "item" (array)
+    for event, value in ijson.basic_parse(stream):
+        # Angka default ijson: int presisi penuh (use_float=True overflow di atas 2^63),
+        # pecahan sebagai Decimal -> float, hasilnya sama persis dengan json.loads
+        if type(value) is Decimal:
+            value = float(value)
+        if event == "map_key":
+            path[-1] = value
+        elif event in ("start_map", "start_array"):
+            if item is None and path == CREDENTIALS_PATH:
+                item, depth = ijson.ObjectBuilder(), 0
+            path.append("item" if event == "start_array" else None)
+            if len(path) > token_codec.MAX_DEPTH:
+                raise RecursionError(f"Struktur token bersarang lebih dari {token_codec.MAX_DEPTH} tingkat")
+        elif event in ("end_map", "end_array"):
+            path.pop()
+
+        if item is None:
+            token.event(event, value)
+            continue
+
+        item.event(event, value)
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            yield "credential", item.value
+            item = None
+    yield "token", token.value
+
+class _Reader:
+    """Buffer teks di atas stream; hanya bagian yang belum dikonsumsi yang disimpan."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.checked = False   # kedalaman buffer sekarang sudah dicek (token_codec.check_depth)
+        self._json = json.JSONDecoder()
+
+    def _fill(self, size=READ_SIZE):
+        chunk = self.stream.read(size)
+        if isinstance(chunk, bytes):
+            chunk = self.decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+        # Buang bagian yang sudah dikonsumsi agar memori tetap terbatas
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.checked = False
+
+    def peek(self):
+        """Karakter non-spasi berikutnya (tidak dikonsumsi), '' jika habis."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Diharapkan '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """
+        Decode satu nilai JSON utuh; tambah buffer selama nilainya belum
+        lengkap. Setiap kali gagal, bacaan berikutnya sebesar isi buffer
+        (berlipat dua) sehingga total scan ulang raw_decode tetap linear;
+        nilai yang lebih besar dari MAX_ELEMENT_SIZE ditolak.
+        """
+        self.peek()
+        while True:
+            if not self.checked:
+                # Sekali per isi buffer, sebelum parser C (lihat token_codec.check_depth)
+                token_codec.check_depth(self.buf[self.pos:])
+                self.checked = True
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+                # Angka di ujung buffer bisa saja masih berlanjut di chunk berikutnya
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            pending = len(self.buf) - self.pos
+            if pending > MAX_ELEMENT_SIZE:
+                raise verification.TokenFormatError(
+                    f"Satu elemen JSON melebihi {MAX_ELEMENT_SIZE // (1024 * 1024)} MB; token ditolak."
+                )
+            self._fill(max(READ_SIZE, pending))
+
+def _iter_members(reader):
+    """Pasangan key objek (nilai belum dibaca) untuk objek yang '{'-nya sudah dikonsumsi."""
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        yield key
+        if reader.peek() == ",":
+            reader.pos += 1
+            continue
+        reader.expect("}")
+        return
+
+def _iter_fallback(reader):
+    token = {}
+    reader.expect("{")
+    for key in _iter_members(reader):
+        if key != "presentation" or reader.peek() != "{":
+            token[key] = reader.value()
+            continue
+
+        presentation = token[key] = {}
+        reader.expect("{")
+        for inner in _iter_members(reader):
+            if inner != "verifiableCredential" or reader.peek() != "[":
+                presentation[inner] = reader.value()
+                continue
+            presentation[inner] = []
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+                continue
+            while True:
+                yield "credential", reader.value()
+                if reader.peek() == ",":
+                    reader.pos += 1
+                    continue
+                reader.expect("]")
+                break
+    yield "token", token
+
+def iter_token(stream):
+    """Baca token VP/VC dari file-like (teks atau bytes) secara inkremental."""
+    if ijson is not None:
+        return _iter_ijson(stream)
+    return _iter_fallback(_Reader(stream))
+
+# --- VERIFIKASI STREAMING ---
+def _verify_batch(batch, status_source, revocations, digests=None):
+    documents = verification.prepare_documents(batch, digests)
+    return (documents,) + verification.resolve_status(documents, status_source, revocations)
+
+def verify_stream(stream, status_source, revocations=None, batch_size=16, max_inflight=4, bundle=None,
+                  audience=None, nonce=None):
+    """
+    Generator verifikasi untuk VP besar / file upload.
+
+    VC diverifikasi per batch segera setelah ter-parse. Batch dikerjakan di
+    thread terpisah (recover signature memakai process pool utils), jadi
+    parsing batch berikutnya, recovery, dan panggilan RPC saling tumpang
+    tindih. Paling banyak `batch_size * max_inflight` VC ditahan di memori.
+
+    Yield ("document", verdict) berurutan, lalu satu ("summary", ringkasan).
+    Presentasi Selective Disclosure (dikenali dari strukturnya, tanpa array
+    VC) tidak diverifikasi di sini: yield satu ("sd_presentation", token).
+    `bundle` = bundle VC terpisah untuk VP ringkas (opsional);
+    `audience` & `nonce` = tantangan verifier (wajib untuk VP ringkas).
+    """
+    summary = {"type": "presentation", "holder": None, "holder_valid": None, "challenge_valid": None,
+               "block": None, "count": 0, "passed": 0, "failed": 0, "revoked_offline": 0, "all_passed": True}
+    inflight = deque()
+    holder = None   # VP ringkas: VC-nya baru dikerjakan sesudah amplop (holder) ter-parse
+
+    def finish(future):
+        documents, issuer_status, credential_status, block_number, revoked_offline = future.result()
+        summary["block"] = block_number
+        summary["revoked_offline"] += revoked_offline
+        for doc in documents:
+            summary["count"] += 1
+            verdict = verification.evaluate_document(summary["count"], doc, issuer_status, credential_status, holder)
+            summary["passed" if verdict["passed"] else "failed"] += 1
+            summary["all_passed"] = summary["all_passed"] and verdict["passed"]
+            yield "document", verdict
+
+    with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+        batch, token = [], None
+        for kind, value in iter_token(stream):
+            if kind == "token":
+                token = value
+                break
+            batch.append(value)
+            if len(batch) >= batch_size:
+                inflight.append(pool.submit(_verify_batch, batch, status_source, revocations))
+                batch = []
+            while len(inflight) >= max_inflight:
+                yield from finish(inflight.popleft())
+
+        # Kerangka token baru lengkap di akhir stream (holder biasanya sesudah array VC)
+        if selective_disclosure.is_sd_presentation(token):
+            yield "sd_presentation", token
+            return
+        info = verification.parse_token(token, bundle, audience, nonce)
+        digests = info.get("digests")
+        if info["type"] == "credential" or digests is not None:
+            # VC mentah / VP ringkas: semua VC ada di kerangka (bundle), tidak ter-stream
+            batch = info["credentials"]
+        holder = verification.bound_holder(info)
+        summary["type"], summary["holder"] = info["type"], info["holder"]
+        summary["holder_valid"] = info.get("holder_valid")
+        summary["challenge_valid"] = info.get("challenge_valid")
+        if batch:
+            inflight.append(pool.submit(_verify_batch, batch, status_source, revocations, digests))
+        while inflight:
+            yield from finish(inflight.popleft())
+        summary["all_passed"] = (summary["all_passed"] and summary["holder_valid"] is not False
+                                 and summary["challenge_valid"] is not False)
+
+    yield "summary", summary
@@ -0,0 +1,351 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.20;
+
+import {Test, Vm} from "forge-std/Test.sol";
+import {SimpleDIDRegistry} from "../src/SimpleDIDRegistry.sol";
+
+contract SimpleDIDRegistryTest is Test {
+    SimpleDIDRegistry registry;
+
+    address kampus = makeAddr("kampus");
+    address kampusLain = makeAddr("kampusLain");
+    address pddikti = makeAddr("pddikti");
+    address orangLain = makeAddr("orangLain");
+
+    // Slot mapping `credentials` (kemendikbud, pddikti, dids, credentials)
+    uint256 constant CREDENTIALS_SLOT = 3;
+
+    function setUp() public {
+        registry = new SimpleDIDRegistry(); // kontrak test = Kemendikbud
+        registry.setPDDiktiAddress(pddikti);
+        _registerVerified(kampus, "Kampus");
+        _registerVerified(kampusLain, "Kampus Lain");
+        vm.warp(1_700_000_000);
+    }
+
+    function _registerVerified(address issuer, string memory name) internal {
+        vm.prank(issuer);
+        registry.registerDID("did:ethr:kampus", name, "-");
+        registry.verifyIssuer(issuer);
+    }
+
+    function _issue(address issuer, bytes32 vcHash) internal {
+        vm.prank(issuer);
+        registry.issueCredential(vcHash);
+    }
+
+    function _status(bytes32 vcHash) internal view returns (bool exists, bool revoked, bool validated, address issuer) {
+        return registry.verifyCredentialStatus(vcHash);
+    }
+
+    // --- Status terkemas (satu slot) ---
+    function test_PackedStatusFitsOneSlot() public {
+        bytes32 vcHash = keccak256("ijazah");
+        _issue(kampus, vcHash);
+
+        bytes32 slot = keccak256(abi.encode(vcHash, CREDENTIALS_SLOT));
+        uint256 word = uint256(vm.load(address(registry), slot));
+        assertEq(address(uint160(word)), kampus);
+        assertEq(uint64(word >> 160), block.timestamp);
+        assertEq(uint8(word >> 232), 1, "exists di byte ke-29");
+        assertEq(vm.load(address(registry), bytes32(uint256(slot) + 1)), bytes32(0));
+    }
+
+    function test_PackedStatusPreservesViews() public {
+        bytes32 vcHash = keccak256("ijazah");
+        _issue(kampus, vcHash);
+
+        (bool exists, bool revoked, bool validated, address issuer) = _status(vcHash);
+        assertTrue(exists);
+        assertFalse(revoked);
+        assertFalse(validated);
+        assertEq(issuer, kampus);
+
+        vm.prank(pddikti);
+        registry.validateCredential(vcHash);
+        vm.prank(kampus);
+        registry.revokeCredential(vcHash, "salah cetak");
+
+        (exists, revoked, validated, issuer) = _status(vcHash);
+        assertTrue(exists);
+        assertTrue(revoked);
+        assertTrue(validated);
+        assertEq(issuer, kampus);
+
+        (address getterIssuer, uint64 issuedAt, bool isRevoked, bool getterExists, bool isValidated) =
+            registry.credentials(vcHash);
+        assertEq(getterIssuer, kampus);
+        assertEq(issuedAt, block.timestamp);
+        assertTrue(isRevoked && getterExists && isValidated);
+    }
+
+    function test_UnknownHashIsEmpty() public view {
+        (bool exists, bool revoked, bool validated, address issuer) = _status(keccak256("tidak ada"));
+        assertFalse(exists || revoked || validated);
+        assertEq(issuer, address(0));
+    }
+
+    // --- Anchor massal ---
+    function test_IssueCredentialsSkipsDuplicates() public {
+        bytes32 a = keccak256("a");
+        bytes32 b = keccak256("b");
+        bytes32 c = keccak256("c");
+        _issue(kampusLain, a);
+
+        bytes32[] memory hashes = new bytes32[](4);
+        hashes[0] = a; // sudah di-anchor kampus lain
+        hashes[1] = b;
+        hashes[2] = c;
+        hashes[3] = b; // duplikat di dalam batch
+
+        vm.recordLogs();
+        vm.prank(kampus);
+        uint256 anchored = registry.issueCredentials(hashes);
+        Vm.Log[] memory logs = vm.getRecordedLogs();
+
+        assertEq(anchored, 2);
+        assertEq(logs.length, 2);
+        assertEq(logs[0].topics[0], keccak256("CredentialAnchored(bytes32,address)"));
+        assertEq(logs[0].topics[1], b);
+        assertEq(logs[1].topics[1], c);
+        assertEq(logs[1].topics[2], bytes32(uint256(uint160(kampus))));
+
+        (,,, address issuerA) = _status(a);
+        (bool existsB,,, address issuerB) = _status(b);
+        assertEq(issuerA, kampusLain, "hash yang sudah ada tidak ditimpa");
+        assertTrue(existsB);
+        assertEq(issuerB, kampus);
+    }
+
+    function test_IssueCredentialsOnlyVerifiedIssuer() public {
+        bytes32[] memory hashes = new bytes32[](1);
+        hashes[0] = keccak256("a");
+
+        vm.prank(orangLain);
+        vm.expectRevert(bytes("Hanya Kampus Terverifikasi yang boleh!"));
+        registry.issueCredentials(hashes);
+    }
+
+    function test_IssueCredentialRevertsOnDuplicate() public {
+        bytes32 vcHash = keccak256("a");
+        _issue(kampus, vcHash);
+
+        vm.prank(kampus);
+        vm.expectRevert(bytes("Hash ini sudah ada!"));
+        registry.issueCredential(vcHash);
+    }
+
+    // --- Pencabutan ijazah batch Merkle (leaf = keccak256(vcHash), pasangan diurutkan) ---
+    function _hashPair(bytes32 a, bytes32 b) internal pure returns (bytes32) {
+        return a < b ? keccak256(abi.encodePacked(a, b)) : keccak256(abi.encodePacked(b, a));
+    }
+
+    function _tree() internal pure returns (bytes32[4] memory vcHashes, bytes32 root, bytes32[][4] memory proofs) {
+        bytes32[4] memory leaves;
+        for (uint256 i = 0; i < 4; i++) {
+            vcHashes[i] = keccak256(abi.encodePacked("ijazah", i));
+            leaves[i] = keccak256(abi.encodePacked(vcHashes[i]));
+        }
+        bytes32 left = _hashPair(leaves[0], leaves[1]);
+        bytes32 right = _hashPair(leaves[2], leaves[3]);
+        root = _hashPair(left, right);
+        for (uint256 i = 0; i < 4; i++) {
+            proofs[i] = new bytes32[](2);
+            proofs[i][0] = leaves[i ^ 1];
+            proofs[i][1] = i < 2 ? right : left;
+        }
+    }
+
+    function test_RevokeBatchedCredentialWithValidProof() public {
+        (bytes32[4] memory vcHashes, bytes32 root, bytes32[][4] memory proofs) = _tree();
+        _issue(kampus, root);
+        vm.warp(block.timestamp + 1 days);
+
+        vm.prank(kampus);
+        registry.revokeBatchedCredential(root, vcHashes[2], proofs[2], "dicabut");
+
+        bytes32 key = registry.batchRevocationKey(root, vcHashes[2]);
+        assertEq(key, keccak256(abi.encodePacked(root, vcHashes[2])));
+        (bool exists, bool revoked, bool validated, address issuer) = _status(key);
+        assertTrue(exists);
+        assertTrue(revoked);
+        assertFalse(validated);
+        assertEq(issuer, kampus);
+        (, uint64 leafIssuedAt,,,) = registry.credentials(key);
+        (, uint64 rootIssuedAt,,,) = registry.credentials(root);
+        assertEq(leafIssuedAt, rootIssuedAt, "waktu terbit leaf = waktu anchor root");
+
+        // Hash VC sendiri tidak disentuh; ijazah lain di batch yang sama tidak ikut dicabut
+        (bool hashExists,,,) = _status(vcHashes[2]);
+        assertFalse(hashExists);
+        (bool otherExists,,,) = _status(registry.batchRevocationKey(root, vcHashes[3]));
+        assertFalse(otherExists);
+    }
+
+    function test_RevokeBatchedCredentialRejectsBadProof() public {
+        (bytes32[4] memory vcHashes, bytes32 root, bytes32[][4] memory proofs) = _tree();
+        _issue(kampus, root);
+
+        vm.prank(kampus);
+        vm.expectRevert(bytes("Bukti Merkle tidak valid!"));
+        registry.revokeBatchedCredential(root, vcHashes[0], proofs[1], "bukti salah");
+
+        vm.prank(kampus);
+        vm.expectRevert(bytes("Bukti Merkle tidak valid!"));
+        registry.revokeBatchedCredential(root, keccak256("bukan anggota"), proofs[0], "bukan anggota");
+    }
+
+    function test_RevokeBatchedCredentialRejectsForeignIssuer() public {
+        (bytes32[4] memory vcHashes, bytes32 root, bytes32[][4] memory proofs) = _tree();
+        _issue(kampus, root);
+
+        vm.prank(kampusLain);
+        vm.expectRevert(bytes("Bukan penerbit asli!"));
+        registry.revokeBatchedCredential(root, vcHashes[0], proofs[0], "bukan milik");
+    }
+
+    // Serangan: kampus lain membuat root sendiri berisi hash ijazah kampus, lalu mencabutnya
+    function test_ForeignRootCannotRevokeOrSquatCredential() public {
+        (bytes32[4] memory vcHashes, bytes32 root, bytes32[][4] memory proofs) = _tree();
+        _issue(kampus, root);
+
+        bytes32 victim = vcHashes[1];
+        bytes32 fakeRoot = _hashPair(keccak256(abi.encodePacked(victim)), keccak256("isian"));
+        bytes32[] memory fakeProof = new bytes32[](1);
+        fakeProof[0] = keccak256("isian");
+        _issue(kampusLain, fakeRoot);
+        vm.prank(kampusLain);
+        registry.revokeBatchedCredential(fakeRoot, victim, fakeProof, "serangan");
+
+        // Tercatat hanya di kunci root milik penyerang
+        (,,, address fakeIssuer) = _status(registry.batchRevocationKey(fakeRoot, victim));
+        assertEq(fakeIssuer, kampusLain);
+        (bool victimKeyExists, bool victimKeyRevoked,,) = _status(registry.batchRevocationKey(root, victim));
+        assertFalse(victimKeyExists || victimKeyRevoked);
+        (bool hashExists,,,) = _status(victim);
+        assertFalse(hashExists, "hash VC tidak diduduki");
+
+        // Kampus tetap bisa mencabut lewat root-nya sendiri & meng-anchor hash itu langsung
+        vm.prank(kampus);
+        registry.revokeBatchedCredential(root, victim, proofs[1], "dicabut kampus");
+        (, bool revoked,, address issuer) = _status(registry.batchRevocationKey(root, victim));
+        assertTrue(revoked);
+        assertEq(issuer, kampus);
+        _issue(kampus, victim);
+    }
+
+    function test_RevokeBatchedCredentialTakesOverSquattedKey() public {
+        (bytes32[4] memory vcHashes, bytes32 root, bytes32[][4] memory proofs) = _tree();
+        _issue(kampus, root);
+        bytes32 key = registry.batchRevocationKey(root, vcHashes[0]);
+
+        // Kampus lain meng-anchor kunci pencabutan langsung lalu mencabutnya sendiri
+        _issue(kampusLain, key);
+        vm.prank(kampusLain);
+        registry.revokeCredential(key, "duduki");
+
+        vm.recordLogs();
+        vm.prank(kampus);
+        registry.revokeBatchedCredential(root, vcHashes[0], proofs[0], "dicabut kampus");
+        Vm.Log[] memory logs = vm.getRecordedLogs();
+
+        (bool exists, bool revoked,, address issuer) = _status(key);
+        assertTrue(exists && revoked);
+        assertEq(issuer, kampus, "kunci per root kembali ke penerbit root");
+        assertEq(logs.length, 2);
+        assertEq(logs[0].topics[0], keccak256("CredentialAnchored(bytes32,address)"));
+        assertEq(logs[0].topics[2], bytes32(uint256(uint160(kampus))));
+        assertEq(logs[1].topics[0], keccak256("CredentialRevoked(bytes32,string)"));
+    }
+
+    function test_RevokeBatchedCredentialTwiceEmitsOnlyRevoked() public {
+        (bytes32[4] memory vcHashes, bytes32 root, bytes32[][4] memory proofs) = _tree();
+        _issue(kampus, root);
+        vm.prank(kampus);
+        registry.revokeBatchedCredential(root, vcHashes[0], proofs[0], "pertama");
+
+        vm.recordLogs();
+        vm.prank(kampus);
+        registry.revokeBatchedCredential(root, vcHashes[0], proofs[0], "kedua");
+        Vm.Log[] memory logs = vm.getRecordedLogs();
+        assertEq(logs.length, 1);
+        assertEq(logs[0].topics[1], registry.batchRevocationKey(root, vcHashes[0]));
+    }
+
+    // --- Validasi massal (PDDikti) ---
+    function test_ValidateCredentialsSkipsInvalid() public {
+        bytes32 anchored = keccak256("anchored");
+        bytes32 revoked = keccak256("revoked");
+        bytes32 missing = keccak256("missing");
+        _issue(kampus, anchored);
+        _issue(kampus, revoked);
+        vm.prank(kampus);
+        registry.revokeCredential(revoked, "dicabut");
+
+        bytes32[] memory hashes = new bytes32[](4);
+        hashes[0] = anchored;
+        hashes[1] = missing;
+        hashes[2] = revoked;
+        hashes[3] = anchored; // sudah divalidasi di elemen pertama
+
+        vm.prank(pddikti);
+        assertEq(registry.validateCredentials(hashes), 1);
+
+        (,, bool validated,) = _status(anchored);
+        assertTrue(validated);
+        (,, bool revokedValidated,) = _status(revoked);
+        assertFalse(revokedValidated);
+        (bool missingExists,,,) = _status(missing);
+        assertFalse(missingExists);
+    }
+
+    function test_ValidateCredentialsOnlyPDDikti() public {
+        bytes32[] memory hashes = new bytes32[](1);
+        hashes[0] = keccak256("a");
+
+        vm.prank(kampus);
+        vm.expectRevert(bytes("Hanya PDDikti!"));
+        registry.validateCredentials(hashes);
+    }
+
+    // --- Baca massal ---
+    function test_ResolveBatchMatchesSingleViews() public {
+        bytes32 vcHash = keccak256("ijazah");
+        _issue(kampus, vcHash);
+        vm.prank(orangLain);
+        registry.registerDID("did:ethr:orang", "Belum Terverifikasi", "-");
+
+        address[] memory issuers = new address[](3);
+        issuers[0] = kampus;
+        issuers[1] = orangLain;
+        issuers[2] = makeAddr("tidakTerdaftar");
+        bytes32[] memory hashes = new bytes32[](2);
+        hashes[0] = vcHash;
+        hashes[1] = keccak256("tidak ada");
+
+        (SimpleDIDRegistry.IssuerView[] memory issuerViews, SimpleDIDRegistry.CredentialView[] memory creds) =
+            registry.resolveBatch(issuers, hashes);
+
+        assertEq(issuerViews.length, 3);
+        assertEq(creds.length, 2);
+        for (uint256 i = 0; i < issuers.length; i++) {
+            (bool active, bool verified, string memory name,,) = registry.resolveDID(issuers[i]);
+            assertEq(issuerViews[i].active, active);
+            assertEq(issuerViews[i].isVerified, verified);
+            assertEq(issuerViews[i].name, name);
+        }
+        assertTrue(issuerViews[0].active && issuerViews[0].isVerified);
+        assertTrue(issuerViews[1].active && !issuerViews[1].isVerified);
+        assertFalse(issuerViews[2].active);
+
+        for (uint256 i = 0; i < hashes.length; i++) {
+            (bool exists, bool revoked, bool validated, address issuer) = _status(hashes[i]);
+            assertEq(creds[i].exists, exists);
+            assertEq(creds[i].isRevoked, revoked);
+            assertEq(creds[i].isValidated, validated);
+            assertEq(creds[i].issuer, issuer);
+        }
+        assertEq(creds[0].issuer, kampus);
+        assertFalse(creds[1].exists);
+    }
+}
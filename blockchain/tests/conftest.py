@@ -0,0 +1,113 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Modul aplikasi berupa file datar di folder blockchain/ (bukan paket)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import issuance  # noqa: E402
+import utils  # noqa: E402
+
+# Artifact registry yang di-commit untuk portal React (bytecode asli, tanpa forge)
+REGISTRY_ARTIFACT = os.path.join(ROOT, "..", "apps", "issuer-portal", "src", "utils", "SimpleDIDRegistry.json")
+
+# Kunci uji anvil #0-#2 (publik, hanya untuk test)
+ISSUER_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+HOLDER_KEY = "0x59c6995e998f97a5a0044966f0945389dc9e86dae88c7a8412f4603b6b78690d"
+OTHER_KEY = "0x5de4111afa1a4b94908f83103eb1f1706367c2e68ca870fc3fb9971804af02ab"
+
+class StaticStatus:
+    """
+    Pengganti utils.StatusCache tanpa node: semua issuer aktif & terverifikasi,
+    semua hash tercatat milik `owner` kecuali yang ada di `revoked` / `missing`;
+    `entries` {hash: (exists, revoked, validated, issuer)} menimpa keduanya.
+    """
+
+    def __init__(self, owner, block=7):
+        self.owner = owner
+        self.block = block
+        self.revoked = set()
+        self.missing = set()
+        self.entries = {}
+        self.calls = []
+
+    def resolve_batch(self, issuer_addrs, vc_hashes):
+        self.calls.append((list(issuer_addrs), [bytes(h) for h in vc_hashes]))
+        issuers = {addr: (True, True, "Universitas Uji") for addr in issuer_addrs}
+        credentials = {}
+        for vc_hash in vc_hashes:
+            key = bytes(vc_hash)
+            if key in self.entries:
+                credentials[key] = self.entries[key]
+            elif key in self.missing:
+                credentials[key] = (False, False, False, "0x" + "00" * 20)
+            else:
+                credentials[key] = (True, key in self.revoked, False, self.owner)
+        return issuers, credentials, self.block
+
+@pytest.fixture(scope="session")
+def issuer():
+    return utils.get_signer(ISSUER_KEY)
+
+@pytest.fixture(scope="session")
+def holder():
+    return utils.get_signer(HOLDER_KEY)
+
+@pytest.fixture(scope="session")
+def other():
+    return utils.get_signer(OTHER_KEY)
+
+@pytest.fixture(scope="session")
+def credentials(issuer, holder):
+    """Tiga VC ijazah bertanda tangan issuer untuk holder."""
+    wrappers = []
+    for i in range(3):
+        payload = issuance.build_credential_payload(issuer.did, holder.did, f"Mahasiswa {i}", "Sarjana Komputer (S.Kom)")
+        wrappers.append(issuance.wrap_credential(payload, issuer.sign(payload), issuer.did))
+    return wrappers
+
+@pytest.fixture
+def status(issuer):
+    return StaticStatus(issuer.address)
+
+class Chain:
+    """Registry di eth-tester: `w3`, `contract`, `accounts` (#0 = kemendikbud), `tester`."""
+
+    def __init__(self, w3, contract):
+        self.w3, self.contract = w3, contract
+        self.accounts = w3.eth.accounts
+        self.tester = w3.provider.ethereum_tester
+
+    def transact(self, fn, sender):
+        return self.w3.eth.wait_for_transaction_receipt(fn.transact({"from": sender}))
+
+    def register_issuer(self, account, name="Universitas Uji"):
+        """registerDID + verifyIssuer (oleh kemendikbud) untuk `account`."""
+        self.transact(self.contract.functions.registerDID(f"did:ethr:{account}", name, "https://kampus"), account)
+        self.transact(self.contract.functions.verifyIssuer(account), self.accounts[0])
+
+    def travel(self, seconds):
+        """Majukan waktu blok berikutnya."""
+        self.tester.time_travel(self.w3.eth.get_block("latest")["timestamp"] + seconds)
+
+@pytest.fixture
+def chain(monkeypatch):
+    """
+    Node eth-tester + registry dari artifact apps/ (ABI & event sama dengan
+    src/SimpleDIDRegistry.sol); utils.w3 diarahkan ke node ini.
+    """
+    pytest.importorskip("eth_tester")
+    from web3 import EthereumTesterProvider, Web3
+
+    with open(REGISTRY_ARTIFACT) as f:
+        artifact = json.load(f)
+    w3 = Web3(EthereumTesterProvider())
+    factory = w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"]["object"])
+    receipt = w3.eth.wait_for_transaction_receipt(factory.constructor().transact({"from": w3.eth.accounts[0]}))
+    monkeypatch.setattr(utils, "w3", w3)
+    # EthereumTesterProvider tidak mendukung batch JSON-RPC (lihat test_rpc_batching)
+    monkeypatch.setattr(utils, "rpc_batch", lambda *calls: [call() for call in calls])
+    return Chain(w3, w3.eth.contract(address=receipt.contractAddress, abi=artifact["abi"]))
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+
+import bulk_verify
+import presentation
+import token_codec
+import utils
+import verification
+
+@pytest.fixture
+def applicants(holder, other, credentials):
+    """Lima pelamar berbagi tiga VC yang sama + satu baris rusak."""
+    vp = presentation.build_presentation(holder, holder.did, credentials)
+    compact, _ = presentation.build_compact_presentation(holder, holder.did, credentials[:2], audience="HR", nonce="n-2025")
+    # VP ringkas dari orang lain yang menyodorkan VC milik holder
+    stolen, _ = presentation.build_compact_presentation(other, other.did, credentials[:1], audience="HR", nonce="n-2025")
+    return [
+        ("ani", vp),
+        ("budi", json.loads(json.dumps(vp))),
+        ("citra", compact),
+        ("dodi", credentials[2]),
+        ("eko", stolen),
+        ("fajar", ValueError("baris rusak")),
+    ]
+
+def _run(entries, status, **kwargs):
+    bulk = bulk_verify.BulkVerifier(status, workers=1, chunk_size=2, audience="HR", nonce="n-2025", **kwargs)
+    return bulk, list(bulk.run(entries))
+
+def test_rows_match_verify_token(applicants, status):
+    status.revoked.add(bytes(utils.hash_json(applicants[0][1]["presentation"]["verifiableCredential"][1]["credential"])))
+    _, results = _run(applicants, status)
+
+    assert [row["applicant"] for row, _ in results] == ["ani", "budi", "citra", "dodi", "eko", "fajar"]
+    for (row, verdicts), (_, token) in zip(results[:5], applicants[:5]):
+        report = verification.verify_token(token, status, None, None, "HR", "n-2025")
+        assert verdicts == report["documents"]
+        assert row["all_passed"] == report["all_passed"]
+        assert (row["passed"], row["failed"]) == (sum(v["passed"] for v in verdicts), sum(not v["passed"] for v in verdicts))
+
+    rows = {row["applicant"]: row for row, _ in results}
+    assert rows["ani"]["issues"] == "#2 dicabut"
+    assert rows["citra"]["issues"] == "#2 dicabut"        # VC yang sama, dari bundle VP ringkas
+    assert rows["dodi"]["all_passed"]
+    assert "credentialSubject.id bukan milik holder" in rows["eko"]["issues"]
+    assert rows["fajar"]["error"].startswith("Format JSON Error") and rows["fajar"]["documents"] == 0
+
+def test_identical_credentials_are_prepared_and_resolved_once(applicants, status):
+    bulk, _ = _run(applicants[:2] + [applicants[3]], status)
+    assert bulk.stats["credentials"] == 7
+    assert bulk.stats["unique_credentials"] == 3
+    resolved = [h for _, hashes in status.calls for h in hashes]
+    assert len(resolved) == len(set(resolved)) == 3
+
+def test_compact_vp_needs_the_batch_challenge(applicants, status):
+    bulk = bulk_verify.BulkVerifier(status, workers=1, audience="HR", nonce="nonce-lain")
+    (row, _), = bulk.run([applicants[2]])
+    assert not row["all_passed"]
+    assert row["issues"].startswith("audience / nonce tidak cocok")
+
+def test_worker_processes_give_the_same_report(applicants, status):
+    _, serial = _run(applicants, status)
+    bulk = bulk_verify.BulkVerifier(status, workers=2, chunk_size=2, audience="HR", nonce="n-2025")
+    parallel = list(bulk.run(applicants))
+    assert parallel == serial
+
+# --- Input & laporan ---
+def test_read_tokens_from_jsonl_and_zip(credentials, tmp_path):
+    lines = [json.dumps(credentials[0]), "", json.dumps({"applicant": "ani", "token": credentials[1]}),
+             token_codec.to_text(credentials[2]), "{rusak"]
+    path = tmp_path / "pelamar.jsonl"
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    entries = list(bulk_verify.read_tokens(str(path)))
+    assert [label for label, _ in entries] == ["pelamar.jsonl:1", "ani", "pelamar.jsonl:4", "pelamar.jsonl:5"]
+    assert [token for _, token in entries[:3]] == credentials
+    assert isinstance(entries[3][1], ValueError)
+
+    archive = tmp_path / "pelamar.zip"
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("a.json", json.dumps(credentials[0]))
+        z.writestr("batch.jsonl", path.read_text(encoding="utf-8"))
+    labels = [label for label, _ in bulk_verify.read_tokens(str(archive))]
+    assert labels == ["a.json", "batch.jsonl:1", "ani", "batch.jsonl:4", "batch.jsonl:5"]
+
+    handle = io.BytesIO(path.read_bytes())
+    assert len(list(bulk_verify.read_tokens(handle))) == 4
+
+def test_write_reports_csv_and_json(applicants, status):
+    _, results = _run(applicants, status)
+    csv_out, json_out = io.StringIO(), io.StringIO()
+    assert bulk_verify.write_reports(iter(results), csv_out, json_out) == len(results)
+
+    rows = list(csv.DictReader(io.StringIO(csv_out.getvalue())))
+    assert list(rows[0]) == bulk_verify.REPORT_FIELDS
+    assert [r["applicant"] for r in rows] == [row["applicant"] for row, _ in results]
+    report = json.loads(json_out.getvalue())
+    assert [len(r["verdicts"]) for r in report] == [3, 3, 2, 1, 1, 0]
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from web3 import Web3
+
+import utils
+from conftest import ISSUER_KEY
+
+# Anchor lama dihitung dari json.dumps(data, sort_keys=True): bentuk kanonik harus identik byte-per-byte
+DOCUMENTS = [
+    {},
+    {"b": 1, "a": [3, 2, 1], "c": {"z": None, "y": True, "x": False}},
+    {"name": "Ærø — 日本語 \U0001F393", "escape": "tab\tquote\"slash\\\n\u0000"},
+    {"float": 0.1 + 0.2, "exp": 1e21, "small": 1e-7, "neg": -0.0, "big": 2 ** 80, "int": -42},
+    {"credential": {"issuer": "did:ethr:0x" + "ab" * 20, "credentialSubject": {"degree": {"name": "S.Kom"}}},
+     "proof": {"type": "EcdsaSecp256k1Signature2019", "jws": "0x" + "cd" * 65}},
+]
+
+@pytest.mark.parametrize("data", DOCUMENTS)
+def test_payload_matches_json_dumps(data):
+    expected = json.dumps(data, sort_keys=True).encode("utf-8")
+    canonical = utils.CanonicalJSON(data)
+    assert canonical.payload == expected
+    assert canonical.digest == Web3.keccak(expected)
+    assert utils.hash_json(data) == Web3.keccak(expected)
+
+@pytest.mark.parametrize("data", [d for d in DOCUMENTS if d])
+def test_compose_matches_full_serialisation(data):
+    parts = {key: utils.CanonicalJSON(value) for key, value in data.items()}
+    assert utils.CanonicalJSON.compose(data, parts).payload == json.dumps(data, sort_keys=True).encode("utf-8")
+
+def test_canonicalize_reuses_canonical_objects_only():
+    data = {"a": 1}
+    canonical = utils.canonicalize(data)
+    assert utils.canonicalize(canonical) is canonical
+    assert utils.canonicalize(data) is not canonical
+
+def test_mutated_dict_is_hashed_again():
+    data = {"a": 1}
+    before = utils.hash_json(data)
+    data["a"] = 2
+    assert utils.hash_json(data) != before
+    assert utils.hash_json(data) == utils.hash_json({"a": 2})
+
+def test_signature_follows_mutation(issuer):
+    data = {"nama": "Siti"}
+    utils.sign_data(data, ISSUER_KEY)
+    data["nama"] = "Budi"
+    signature = utils.sign_data(data, ISSUER_KEY)
+    assert utils.verify_signature({"nama": "Budi"}, signature) == issuer.address
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+
+import pytest
+
+import issuance
+import merkle
+import utils
+
+KAMPUS_KEY = "0x" + "00" * 31 + "02"     # kunci akun eth-tester #1
+
+def _rows(n):
+    return [{"name": f"Mahasiswa {i}", "degree": "Sarjana Komputer (S.Kom)",
+             "did": f"did:ethr:0x{i + 1:040x}"} for i in range(n)]
+
+@pytest.fixture
+def kampus(chain):
+    address = chain.accounts[1]
+    assert utils.get_signer(KAMPUS_KEY).address == address
+    chain.register_issuer(address)
+    return address
+
+def _anchored(chain, vc_hash):
+    exists, revoked, _, issuer = chain.contract.functions.verifyCredentialStatus(vc_hash).call()[:4]
+    return exists, revoked, issuer
+
+def test_read_graduates_csv_with_bom_and_jsonl():
+    raw = "﻿name,degree,did\nAni,S.Kom,did:ethr:0x1\n".encode("utf-8")
+    assert list(issuance.read_graduates(io.BytesIO(raw))) == [{"name": "Ani", "degree": "S.Kom", "did": "did:ethr:0x1"}]
+
+    jsonl = io.StringIO('{"name": "Budi", "degree": "S.T", "did": "x"}\n\n')
+    jsonl.name = "wisuda.jsonl"
+    assert [r["name"] for r in issuance.read_graduates(jsonl)] == ["Budi"]
+
+def test_bulk_issuer_anchors_each_credential(chain, kampus):
+    rows = _rows(6)
+    rows.insert(2, {"name": "Tanpa DID", "degree": "S.Kom"})
+    bulk = issuance.BulkIssuer(chain.contract, kampus, KAMPUS_KEY, window=3)
+    results = list(bulk.run(rows))
+
+    assert sorted(r["row"] for r, _ in results) == list(range(1, 8))
+    failed = [r for r, vc in results if vc is None]
+    assert [(r["row"], r["status"]) for r in failed] == [(3, "failed")]
+    assert failed[0]["error"].startswith("Data tidak valid")
+
+    for result, vc in results:
+        if vc is None:
+            continue
+        assert result["status"] == "issued"
+        assert utils.verify_signature(vc["credential"], vc["proof"]["jws"]) == kampus
+        vc_hash = utils.hash_json(vc["credential"])
+        assert "0x" + result["vc_hash"] == "0x" + vc_hash.hex()
+        assert _anchored(chain, vc_hash) == (True, False, kampus)
+
+def test_unverified_issuer_gets_failed_rows_without_vcs(chain):
+    stranger = chain.accounts[1]        # belum registerDID / verifyIssuer
+    bulk = issuance.BulkIssuer(chain.contract, stranger, KAMPUS_KEY, window=2, max_retries=1)
+    results = list(bulk.run(_rows(2)))
+    assert [(r["status"], vc) for r, vc in results] == [("failed", None), ("failed", None)]
+
+def test_merkle_batch_issuer_anchors_one_root_per_batch(chain, kampus):
+    bulk = issuance.MerkleBatchIssuer(chain.contract, kampus, KAMPUS_KEY, batch_size=4)
+    before = chain.w3.eth.block_number
+    results = list(bulk.run(_rows(10)))
+
+    assert chain.w3.eth.block_number - before == 3
+    roots = {r["root"] for r, _ in results}
+    assert len(roots) == 3
+    for result, vc in results:
+        root, proof = merkle.parse_anchor(vc["proof"])
+        assert "0x" + root.hex() == result["root"]
+        assert merkle.verify_proof(utils.hash_json(vc["credential"]), proof, root)
+        assert _anchored(chain, root)[0]
+
+def test_issue_file_writes_vcs_and_report(chain, kampus, tmp_path):
+    source = tmp_path / "wisuda.csv"
+    with open(source, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["name", "degree", "did"])
+        writer.writeheader()
+        writer.writerows(_rows(3))
+
+    bulk = issuance.BulkIssuer(chain.contract, kampus, KAMPUS_KEY, window=2)
+    summary = issuance.issue_file(bulk, str(source), str(tmp_path / "vcs.jsonl"), str(tmp_path / "report.csv"))
+
+    assert (summary["issued"], summary["failed"]) == (3, 0)
+    assert summary["signatures"] >= 6          # VC + transaksi
+    vcs = [json.loads(line) for line in (tmp_path / "vcs.jsonl").read_text().splitlines()]
+    report = list(csv.DictReader(io.StringIO((tmp_path / "report.csv").read_text(encoding="utf-8"))))
+    assert len(vcs) == 3 and [r["status"] for r in report] == ["issued"] * 3
@@ -0,0 +1,144 @@
+import copy
+
+import pytest
+from Crypto.Hash import keccak
+
+import merkle
+import utils
+import verification
+
+def _keccak(data):
+    return keccak.new(digest_bits=256, data=data).digest()
+
+def _process_proof(proof, leaf):
+    """Salinan `_processProof` SimpleDIDRegistry.sol (pasangan diurutkan, keccak256(abi.encodePacked))."""
+    computed = leaf
+    for sibling in proof:
+        computed = _keccak(computed + sibling) if computed < sibling else _keccak(sibling + computed)
+    return computed
+
+def _contract_accepts(vc_hash, proof, root):
+    # require(_processProof(_proof, keccak256(abi.encodePacked(_vcHash))) == _root)
+    return _process_proof(proof, _keccak(vc_hash)) == root
+
+def _hashes(count):
+    return [_keccak(f"ijazah-{i}".encode()) for i in range(count)]
+
+def test_known_root_vector():
+    hashes = [bytes.fromhex(f"{i:064x}") for i in (1, 2, 3)]
+    root = merkle.root_of(merkle.build_levels(hashes))
+    assert root.hex() == "4cdbcd942bd29b80bbd5eb9929ec8d0ea9c97d2690f9d2f8318390505ec1a769"
+
+@pytest.mark.parametrize("count", [1, 2, 3, 4, 5, 7, 8, 13, 33])
+def test_every_proof_is_accepted_by_contract(count):
+    hashes = _hashes(count)
+    levels = merkle.build_levels(hashes)
+    root = merkle.root_of(levels)
+    for index, vc_hash in enumerate(hashes):
+        proof = merkle.proof_for(levels, index)
+        assert _contract_accepts(vc_hash, proof, root)
+        assert merkle.verify_proof(vc_hash, proof, root)
+
+def test_wrong_proof_is_rejected():
+    hashes = _hashes(8)
+    levels = merkle.build_levels(hashes)
+    root = merkle.root_of(levels)
+    proof = merkle.proof_for(levels, 1)
+    assert not _contract_accepts(hashes[0], proof, root)
+    assert not merkle.verify_proof(hashes[0], proof, root)
+    assert not _contract_accepts(_keccak(b"bukan anggota"), merkle.proof_for(levels, 0), root)
+
+def test_root_is_not_a_valid_leaf():
+    # Leaf = keccak256(vcHash): node internal tidak bisa diajukan sebagai hash ijazah
+    hashes = _hashes(4)
+    levels = merkle.build_levels(hashes)
+    inner = levels[1][0]
+    assert not _contract_accepts(inner, [levels[1][1]], merkle.root_of(levels))
+
+def test_anchor_proof_round_trip():
+    hashes = _hashes(5)
+    levels = merkle.build_levels(hashes)
+    root, path = merkle.root_of(levels), merkle.proof_for(levels, 4)
+    parsed_root, parsed_path = merkle.parse_anchor({"anchor": merkle.anchor_proof(root, path)})
+    assert bytes(parsed_root) == root
+    assert [bytes(p) for p in parsed_path] == path
+
+def test_empty_batch_is_rejected():
+    with pytest.raises(ValueError):
+        merkle.build_levels([])
+
+def test_parse_anchor_ignores_direct_anchor():
+    assert merkle.parse_anchor({"type": "EcdsaSecp256k1Signature2019"}) is None
+
+# --- Pencabutan per root (batchRevocationKey) ---
+def test_revocation_key_matches_contract():
+    root, vc_hash = _keccak(b"root"), _keccak(b"ijazah")
+    # batchRevocationKey: keccak256(abi.encodePacked(_root, _vcHash))
+    assert merkle.revocation_key(root, vc_hash) == _keccak(root + vc_hash)
+    assert merkle.revocation_key(root, vc_hash) != merkle.revocation_key(_keccak(b"root lain"), vc_hash)
+
+@pytest.fixture
+def batch(credentials):
+    """VC fixture yang di-anchor lewat satu root Merkle: (wrappers, root, hash VC)."""
+    wrappers = copy.deepcopy(credentials)
+    hashes = [bytes(utils.hash_json(vc["credential"])) for vc in wrappers]
+    levels = merkle.build_levels(hashes)
+    root = merkle.root_of(levels)
+    for index, vc in enumerate(wrappers):
+        vc["proof"]["anchor"] = merkle.anchor_proof(root, merkle.proof_for(levels, index))
+    return wrappers, root, hashes
+
+ZERO = "0x" + "00" * 20
+
+def _verify(wrappers, status, revocations=None):
+    return verification.verify_token(wrappers[0], status, revocations)
+
+def test_batched_credential_passes(batch, status):
+    wrappers, root, hashes = batch
+    status.missing.add(merkle.revocation_key(root, hashes[0]))
+    report = _verify(wrappers, status)
+    assert report["all_passed"]
+    assert report["documents"][0]["merkle_ok"]
+    assert status.calls[0][1] == [root, merkle.revocation_key(root, hashes[0])]
+
+def test_leaf_revoked_by_root_issuer_fails(batch, status, issuer):
+    wrappers, root, hashes = batch
+    status.entries[merkle.revocation_key(root, hashes[0])] = (True, True, False, issuer.address)
+    report = _verify(wrappers, status)
+    assert report["documents"][0]["status"] == "revoked"
+    assert not report["all_passed"]
+
+def test_leaf_revoked_by_other_issuer_is_ignored(batch, status, other):
+    # Penyerang men-anchor & mencabut kunci pencabutan (atau hash VC) lewat akunnya sendiri
+    wrappers, root, hashes = batch
+    status.entries[merkle.revocation_key(root, hashes[0])] = (True, True, False, other.address)
+    status.entries[hashes[0]] = (True, True, False, other.address)
+    report = _verify(wrappers, status)
+    assert report["documents"][0]["status"] == "anchored"
+    assert report["all_passed"]
+
+class FakeIndex:
+    """RevocationIndex: hash dicabut tanpa info issuer."""
+
+    def __init__(self, revoked):
+        self.revoked = {bytes(h) for h in revoked}
+        self.asked = []
+
+    def known_status(self, vc_hashes):
+        self.asked += [bytes(h) for h in vc_hashes]
+        return {h: (True, True, False, None) for h in vc_hashes if bytes(h) in self.revoked}
+
+def test_revocation_index_is_not_trusted_for_leaf_keys(batch, status):
+    wrappers, root, hashes = batch
+    key = merkle.revocation_key(root, hashes[0])
+    status.missing.add(key)
+    index = FakeIndex([key])
+    report = _verify(wrappers, status, index)
+    assert key not in index.asked
+    assert report["all_passed"]
+
+def test_revoked_root_from_index_fails_batch(batch, status):
+    wrappers, root, _ = batch
+    report = _verify(wrappers, status, FakeIndex([root]))
+    assert report["documents"][0]["status"] == "revoked"
+    assert report["revoked_offline"] == 1
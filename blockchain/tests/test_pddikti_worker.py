@@ -0,0 +1,87 @@
+import json
+
+import pytest
+from web3 import Web3
+
+import pddikti_worker
+import utils
+
+from conftest import OTHER_KEY
+
+def _report(vc, issuer, reported_at, vc_hash=None):
+    vc_hash = vc_hash or "0x" + bytes(utils.hash_json(vc["credential"])).hex()
+    return {"vcHash": vc_hash, "credentialJson": json.dumps(vc), "issuer": issuer, "reportedAt": reported_at}
+
+# --- check_report ---
+def test_check_report_accepts_matching_credential(credentials, issuer):
+    vc_hash, reporter, reason = pddikti_worker.check_report(_report(credentials[0], issuer.did, "t1"))
+    assert reason is None
+    assert vc_hash == bytes(utils.hash_json(credentials[0]["credential"]))
+    assert reporter == issuer.address.lower()
+
+def test_check_report_accepts_sd_anchor():
+    vc = {"issuer": "did:ethr:0xAbC", "credentialSubject": {"sdData": {"signature": "0x1234"}}}
+    report = {"vcHash": Web3.keccak(text="0x1234").hex(), "credential": vc}
+    assert pddikti_worker.check_report(report)[1:] == ("0xabc", None)
+
+@pytest.mark.parametrize("report, reason", [
+    ({"vcHash": "0x1234", "credential": {}}, "vcHash bukan bytes32"),
+    ({"vcHash": "0x" + "11" * 32, "credentialJson": "[1]"}, "credential tidak valid"),
+    ({"vcHash": "0x" + "11" * 32, "credential": {"issuer": "x"}}, "vcHash tidak cocok"),
+])
+def test_check_report_rejects(report, reason):
+    assert pddikti_worker.check_report(report)[2].startswith(reason)
+
+# --- Satu putaran worker ---
+class Inbox:
+    """Inbox cloud agent: /clear per (vcHash, reportedAt) seperti server.js."""
+
+    def __init__(self, reports):
+        self.reports = list(reports)
+
+    def clear(self, report_key):
+        self.reports = [r for r in self.reports if (r["vcHash"], r["reportedAt"]) != report_key]
+
+@pytest.fixture
+def worker(chain, monkeypatch):
+    worker = pddikti_worker.ValidationWorker(chain.contract, OTHER_KEY, clear_workers=1)
+    worker.onchain = {}
+    worker.submitted = []
+    monkeypatch.setattr(worker, "_status", lambda hashes: {h: worker.onchain[h] for h in hashes})
+    monkeypatch.setattr(worker, "_submit", lambda pending: worker.submitted.append(list(pending)) or set(pending))
+    return worker
+
+def _run(worker, inbox):
+    worker.fetch_reports = lambda: list(inbox.reports)
+    worker._clear_one = inbox.clear
+    return worker.run_once()
+
+def test_foreign_report_for_same_hash_stays_in_inbox(worker, credentials, issuer, other):
+    vc = credentials[0]
+    vc_hash = bytes(utils.hash_json(vc["credential"]))
+    worker.onchain[vc_hash] = (True, False, False, issuer.address)
+    genuine = _report(vc, issuer.did, "t1")
+    foreign = _report(vc, other.did, "t2")
+    broken = _report(credentials[1], issuer.did, "t3", vc_hash=genuine["vcHash"])   # hash bukan milik VC-nya
+    inbox = Inbox([genuine, foreign, broken])
+
+    assert _run(worker, inbox) == 1
+    assert worker.submitted == [[vc_hash]]
+    assert inbox.reports == [foreign, broken]
+    assert worker.stats["rejected"] == 2
+
+    # Putaran berikutnya: laporan yang ditolak tidak dicek ulang maupun dihapus
+    assert _run(worker, inbox) == 0
+    assert inbox.reports == [foreign, broken]
+    assert worker.stats["reports"] == 3
+
+def test_revoked_and_unanchored_hashes(worker, credentials, issuer):
+    revoked, waiting = credentials[0], credentials[1]
+    worker.onchain[bytes(utils.hash_json(revoked["credential"]))] = (True, True, False, issuer.address)
+    worker.onchain[bytes(utils.hash_json(waiting["credential"]))] = (False, False, False, "0x" + "00" * 20)
+    inbox = Inbox([_report(revoked, issuer.did, "t1"), _report(waiting, issuer.did, "t2")])
+
+    assert _run(worker, inbox) == 1
+    assert [r["reportedAt"] for r in inbox.reports] == ["t2"]
+    assert worker.submitted == []
+    assert (worker.stats["revoked"], worker.stats["awaiting_anchor"]) == (1, 1)
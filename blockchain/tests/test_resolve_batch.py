@@ -0,0 +1,73 @@
+import presentation
+import utils
+import verification
+
+class FakeCall:
+    def __init__(self, contract, issuers, hashes):
+        self.contract, self.issuers, self.hashes = contract, issuers, hashes
+
+    def call(self, block_identifier=None):
+        self.contract.calls.append((self.issuers, self.hashes, block_identifier))
+        issuers = [(True, True, f"Kampus {addr[-4:]}") for addr in self.issuers]
+        creds = [(True, h[0] % 2 == 1, False, "0x" + "11" * 20) for h in self.hashes]
+        return issuers, creds
+
+class FakeContract:
+    """Kontrak dengan `functions.resolveBatch(...).call(block_identifier=...)` saja."""
+
+    def __init__(self):
+        self.calls = []
+        self.functions = self
+
+    def resolveBatch(self, issuers, hashes):
+        return FakeCall(self, issuers, hashes)
+
+class FakeNode:
+    block_number = 42
+
+    @property
+    def eth(self):
+        return self
+
+def test_batch_keys_drop_duplicates_in_order():
+    a, b = "0x" + "aa" * 20, "0x" + "bb" * 20
+    h1, h2 = b"\x01" * 32, bytearray(b"\x02" * 32)
+    assert utils.batch_keys([a, b, a], [h1, h2, bytes(h2), h1]) == ([a, b], [h1, bytes(h2)])
+
+def test_resolve_batch_is_one_call_at_one_block(monkeypatch):
+    monkeypatch.setattr(utils, "w3", FakeNode())
+    contract = FakeContract()
+    a = "0x" + "aa" * 20
+    hashes = [bytes([i]) * 32 for i in (1, 2, 1)]
+
+    issuer_status, credential_status, block = utils.resolve_batch(contract, [a, a], hashes)
+
+    assert contract.calls == [([a], [bytes([1]) * 32, bytes([2]) * 32], 42)]
+    assert block == 42
+    assert issuer_status == {a: (True, True, "Kampus aaaa")}
+    assert credential_status[bytes([1]) * 32][1] is True
+    assert credential_status[bytes([2]) * 32][1] is False
+
+def test_resolve_batch_keeps_requested_block(monkeypatch):
+    monkeypatch.setattr(utils, "w3", FakeNode())
+    contract = FakeContract()
+    assert utils.resolve_batch(contract, [], [b"\x03" * 32], block_identifier=7)[2] == 7
+    assert contract.calls[0][2] == 7
+
+def test_presentation_resolves_status_in_one_batch(holder, credentials, status):
+    token = presentation.build_presentation(holder, holder.did, credentials)
+    report = verification.verify_token(token, status)
+
+    assert report["all_passed"]
+    assert len(status.calls) == 1
+    issuers, hashes = status.calls[0]
+    assert len(hashes) == len(credentials)
+    assert report["block"] == status.block
+
+def test_revoked_credential_fails_its_document(holder, credentials, status):
+    token = presentation.build_presentation(holder, holder.did, credentials)
+    status.revoked.add(bytes(utils.hash_json(credentials[1]["credential"])))
+    report = verification.verify_token(token, status)
+
+    assert [doc["passed"] for doc in report["documents"]] == [True, False, True]
+    assert not report["all_passed"]
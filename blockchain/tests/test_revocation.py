@@ -0,0 +1,104 @@
+import os
+
+import pytest
+from web3 import Web3
+
+import revocation
+
+def _hashes(n, seed="revoked"):
+    return [bytes(Web3.keccak(text=f"{seed}-{i}")) for i in range(n)]
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "revocations.idx")
+
+@pytest.fixture
+def open_index(index_path):
+    """RevocationIndex(index_path, **kwargs); semua yang dibuka ditutup sesudah test."""
+    opened = []
+
+    def open_index(**kwargs):
+        opened.append(revocation.RevocationIndex(index_path, **kwargs))
+        return opened[-1]
+    yield open_index
+    for index in opened:
+        index.close()
+
+def test_tail_and_records_answer_lookups(open_index):
+    index = open_index()
+    first, second = _hashes(100), _hashes(50, "baru")
+    assert index.add(first + first[:10]) == 100
+    index.rebuild()
+    assert (index.count, len(index.tail)) == (100, 0)
+    index.add(second)
+
+    assert all(h in index for h in first + second)
+    assert not any(h in index for h in _hashes(100, "aktif"))
+    assert index.known_status([first[0], _hashes(1, "aktif")[0]]) == {first[0]: (True, True, False, None)}
+
+def test_rebuild_merges_sorted_without_duplicates(open_index):
+    index = open_index()
+    hashes = _hashes(300)
+    index.add(hashes[:200])
+    index.rebuild()
+    index.add(hashes[100:])
+    index.rebuild()
+    records = list(index._iter_records())
+    assert records == sorted(hashes)
+    assert len(index) == 300
+
+def test_bloom_false_positive_rate(open_index):
+    index = open_index()
+    index.rebuild(_hashes(20000))
+    misses = _hashes(20000, "aktif")
+    false_positives = sum(index._in_bloom(h) for h in misses)
+    assert false_positives / len(misses) < 0.03       # desain ~1% (10 bit/item, k=7)
+    assert not any(h in index for h in misses)
+
+def test_state_survives_reopen_and_torn_tail(open_index, index_path):
+    index = open_index()
+    hashes = _hashes(20)
+    index.add(hashes[:10])
+    index.rebuild()
+    index.add(hashes[10:], cursor=42)
+    index.close()
+    with open(index_path + ".tail", "ab") as f:
+        f.write(b"\x01" * 5)            # record terpotong (crash saat append)
+
+    reopened = open_index()
+    assert reopened.cursor == 42
+    assert len(reopened) == 20
+    assert all(h in reopened for h in hashes)
+
+def test_tail_is_compacted_at_threshold(open_index, index_path):
+    index = open_index(compact_threshold=16)
+    index.add(_hashes(15))
+    assert index.count == 0
+    index.add(_hashes(1, "ke-16"))
+    assert (index.count, len(index.tail)) == (16, 0)
+    assert os.path.getsize(index_path + ".tail") == 0
+
+def test_rejects_foreign_file(open_index, index_path):
+    with open(index_path, "wb") as f:
+        f.write(b"bukan index".ljust(revocation.HEADER_SIZE, b"\0"))
+    with pytest.raises(ValueError):
+        open_index()
+
+def test_sync_reads_revocation_events_in_chunks(chain, open_index):
+    kampus = chain.accounts[1]
+    f = chain.contract.functions
+    chain.register_issuer(kampus)
+    hashes = _hashes(5)
+    for h in hashes:
+        chain.transact(f.issueCredential(h), kampus)
+    for h in hashes[:3]:
+        chain.transact(f.revokeCredential(h, "data salah"), kampus)
+
+    index = open_index(contract=chain.contract, max_log_range=2)
+    assert index.sync(force=True) == 3
+    assert index.cursor == chain.w3.eth.block_number
+    assert index.revoked(hashes) == set(hashes[:3])
+    assert index.sync(force=True) == 0
+
+    assert index.rebuild_from_chain() == 3
+    assert (index.count, len(index.tail)) == (3, 0)
@@ -0,0 +1,114 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from web3 import Web3
+
+import utils
+
+ADDRESSES = [Web3.to_checksum_address(f"0x{i:040x}") for i in range(1, 33)]
+
+class RPCNode:
+    """
+    Node JSON-RPC lokal: eth_getBalance(addr) = int(addr), eth_blockNumber = 7.
+    Setiap request HTTP dicatat (jumlah panggilan di dalamnya); respons batch
+    dibalik urutannya (JSON-RPC tidak menjamin urutan).
+    """
+
+    def __init__(self, delay=0.0, batch_error=False):
+        self.delay, self.batch_error = delay, batch_error
+        self.requests = []
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                node.requests.append(len(body) if isinstance(body, list) else 1)
+                time.sleep(node.delay)
+                if isinstance(body, list):
+                    reply = ({"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "batch ditolak"}}
+                             if node.batch_error else [node.answer(call) for call in reversed(body)])
+                else:
+                    reply = node.answer(body)
+                data = json.dumps(reply).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def answer(self, call):
+        if call["method"] == "eth_getBalance":
+            result = hex(int(call["params"][0], 16))
+        else:
+            result = "0x7"
+        return {"jsonrpc": "2.0", "id": call["id"], "result": result}
+
+@pytest.fixture
+def node():
+    node = RPCNode(delay=0.05)
+    yield node
+    node.server.shutdown()
+    node.server.server_close()
+
+def _web3(node, **kwargs):
+    return Web3(utils.BatchingHTTPProvider(node.url, **kwargs))
+
+def test_single_caller_is_not_delayed_or_batched(node):
+    w3 = _web3(node)
+    assert w3.eth.get_balance(ADDRESSES[4]) == 5
+    assert node.requests == [1]
+
+def test_concurrent_calls_are_coalesced(node):
+    w3 = _web3(node, max_inflight=1)
+    with ThreadPoolExecutor(max_workers=len(ADDRESSES)) as pool:
+        balances = list(pool.map(w3.eth.get_balance, ADDRESSES))
+
+    # Tiap pemanggil menerima hasilnya sendiri walau respons batch teracak
+    assert balances == list(range(1, 33))
+    assert sum(node.requests) == 32
+    assert len(node.requests) < 8
+    assert max(node.requests) > 1
+
+def test_max_batch_splits_large_queues(node):
+    w3 = _web3(node, max_inflight=1, max_batch=5)
+    with ThreadPoolExecutor(max_workers=len(ADDRESSES)) as pool:
+        list(pool.map(w3.eth.get_balance, ADDRESSES))
+    assert max(node.requests) <= 5
+
+def test_batch_level_error_reaches_every_caller():
+    node = RPCNode(delay=0.05, batch_error=True)
+    try:
+        w3 = _web3(node, max_inflight=1)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(w3.eth.get_balance, a) for a in ADDRESSES[:8]]
+            outcomes = []
+            for future in futures:
+                try:
+                    outcomes.append(future.result(timeout=10))
+                except Exception as e:
+                    outcomes.append(e)
+    finally:
+        node.server.shutdown()
+        node.server.server_close()
+    # Request tunggal berhasil; setiap panggilan di batch yang ditolak menerima error (tidak menggantung)
+    failures = [o for o in outcomes if isinstance(o, Exception)]
+    assert len(failures) == sum(n for n in node.requests if n > 1) > 0
+    assert len(outcomes) - len(failures) == node.requests.count(1)
+
+def test_rpc_batch_sends_one_request(node, monkeypatch):
+    w3 = _web3(node)
+    monkeypatch.setattr(utils, "w3", w3)
+    balance, block = utils.rpc_batch(lambda: w3.eth.get_balance(ADDRESSES[2]), lambda: w3.eth.block_number)
+    assert (balance, block) == (3, 7)
+    assert node.requests == [2]
@@ -0,0 +1,96 @@
+import io
+import json
+
+import pytest
+from Crypto.Hash import keccak
+
+import selective_disclosure as sd
+import streaming
+
+# Output String(v) dari Node.js untuk nilai yang sama (node -e 'console.log(String(v))')
+JS_STRING = [
+    (0, "0"), (-0.0, "0"), (5, "5"), (-7, "-7"), (0.1 + 0.2, "0.30000000000000004"),
+    (1e21, "1e+21"), (1e-7, "1e-7"), (123e-20, "1.23e-18"), (1.5, "1.5"), (-2.5e-7, "-2.5e-7"),
+    (100.0, "100"), (1e20, "100000000000000000000"), (1e301, "1e+301"),
+    (123456789012345678901234, "1.2345678901234569e+23"), (2 ** 53 + 1, "9007199254740992"),
+    (2 ** 53, "9007199254740992"), (10 ** 21, "1e+21"),
+    ([1, None, 2, "a", [3, 4]], "1,,2,a,3,4"), ([], ""), ({"a": 1}, "[object Object]"),
+    (True, "true"), (False, "false"), (None, "null"), ("héllo", "héllo"),
+    (float("nan"), "NaN"), (float("inf"), "Infinity"), (float("-inf"), "-Infinity"),
+]
+
+@pytest.mark.parametrize("value, expected", JS_STRING)
+def test_field_value_matches_js_string(value, expected):
+    assert sd.field_value(value) == expected
+
+def test_field_hash_matches_ts_format():
+    # selectiveDisclosure.ts: ethers.keccak256(ethers.toUtf8Bytes(`${key}:${value}|${salt}`))
+    salt = "0x" + "11" * sd.SALT_BYTES
+    expected = "0x" + keccak.new(digest_bits=256, data=f"nama:Siti Ærø|{salt}".encode("utf-8")).hexdigest()
+    assert sd.field_hash("nama", "Siti Ærø", salt) == expected
+
+def test_signed_payload_matches_json_stringify():
+    # JSON.stringify(hashList.sort()): tanpa spasi, urut leksikografis
+    assert sd.signed_payload(["0xb2", "0xa1", "0xa10"]) == '["0xa1","0xa10","0xb2"]'
+    assert json.loads(sd.signed_payload(["0x02", "0x01"])) == ["0x01", "0x02"]
+
+def test_flatten_fields_uses_dotted_paths():
+    fields = sd.flatten_fields({"nama": "Siti", "ipk": 3.5, "nilai": {"rpl": "A", "list": [1, 2]}, "kosong": {}})
+    assert fields == {"nama": "Siti", "ipk": "3.5", "nilai.rpl": "A", "nilai.list.0": "1",
+                      "nilai.list.1": "2", "kosong": "[object Object]"}
+
+@pytest.fixture(scope="module")
+def credential(issuer, holder):
+    sd_data = sd.create_sd_payload(issuer, {"nama": "Siti", "nim": 2100123, "ipk": 3.75, "lulus": True})
+    return sd.build_sd_credential(issuer.did, holder.did, sd_data, "2025-08-17T10:00:00Z")
+
+def test_presentation_round_trip(credential):
+    vp = sd.create_presentation(credential, ["nama", "ipk"])
+    assert sd.is_sd_presentation(vp)
+    report = sd.verify_presentation(vp, required=["nama", "nim"])
+    assert report["signature_valid"] and not report["errors"]
+    assert report["revealed"] == {"nama": "Siti", "ipk": "3.75"}
+    assert report["hidden"] == 2
+    assert report["missing"] == ["nim"]
+
+def test_tampered_value_is_rejected(credential):
+    vp = sd.create_presentation(credential, ["ipk"])
+    vp["revealed"][0]["value"] = "4.0"
+    report = sd.verify_presentation(vp)
+    assert not report["signature_valid"]
+    assert "Hash field 'ipk' tidak cocok" in report["errors"]
+
+def test_duplicate_hidden_hash_is_rejected(credential):
+    vp = sd.create_presentation(credential, ["nama"])
+    vp["hiddenHashes"].append(vp["revealed"][0]["hash"])
+    assert not sd.verify_presentation(vp)["signature_valid"]
+
+def test_unknown_reveal_key_is_rejected(credential):
+    with pytest.raises(KeyError):
+        sd.create_presentation(credential, ["alamat"])
+
+# --- Verifikasi lewat jalur streaming (file upload / mode streaming di verifier_app) ---
+@pytest.mark.parametrize("parser", ["ijson", "fallback"])
+def test_streamed_sd_presentation_is_verified(credential, status, monkeypatch, parser):
+    if parser == "fallback":
+        monkeypatch.setattr(streaming, "ijson", None)
+    vp = sd.create_presentation(credential, ["nama", "ipk"])
+    stream = io.BytesIO(json.dumps(vp).encode("utf-8"))
+
+    events = list(streaming.verify_stream(stream, status))
+    assert [kind for kind, _ in events] == ["sd_presentation"]
+    assert events[0][1] == vp
+
+    report = sd.verify_sd_token(events[0][1], status)
+    assert report["passed"]
+    assert report["status"] == "anchored"
+    assert report["revealed"] == {"nama": "Siti", "ipk": "3.75"}
+    assert status.calls[0][1] == [bytes(sd.anchor_hash(vp["signature"]))]
+
+def test_streamed_revoked_sd_presentation_fails(credential, status):
+    vp = sd.create_presentation(credential, ["nama"])
+    status.revoked.add(bytes(sd.anchor_hash(vp["signature"])))
+    (kind, token), = streaming.verify_stream(io.BytesIO(json.dumps(vp).encode()), status)
+    assert kind == "sd_presentation"
+    report = sd.verify_sd_token(token, status)
+    assert report["status"] == "revoked" and not report["passed"]
@@ -0,0 +1,193 @@
+import threading
+
+import pytest
+from eth_abi import encode
+from eth_utils import event_abi_to_log_topic
+from hexbytes import HexBytes
+from web3 import Web3
+
+import utils
+
+REGISTRY = "0x5FbDB2315678afecb367f032d93F642f64180aa3"
+KAMPUS = "0x70997970C51812dc3A010C7d01b50e0d17dc79C8"
+ZERO = "0x" + "00" * 20
+
+def _event(name, *inputs):
+    return {"type": "event", "name": name, "anonymous": False,
+            "inputs": [{"name": n, "type": t, "indexed": i} for n, t, i in inputs]}
+
+# Event SimpleDIDRegistry yang diamati StatusCache
+EVENTS_ABI = [
+    _event("DIDRegistered", ("owner", "address", True), ("name", "string", False)),
+    _event("IssuerVerified", ("issuer", "address", True)),
+    _event("CredentialAnchored", ("vcHash", "bytes32", True), ("issuer", "address", True)),
+    _event("CredentialValidated", ("vcHash", "bytes32", True)),
+    _event("CredentialRevoked", ("vcHash", "bytes32", True), ("reason", "string", False)),
+]
+_TOPICS = {abi["name"]: event_abi_to_log_topic(abi) for abi in EVENTS_ABI}
+
+def _word(value):
+    return HexBytes(bytes(12) + bytes.fromhex(value[2:])) if isinstance(value, str) else HexBytes(value)
+
+def _log(block, name, *indexed, data=b""):
+    return {
+        "address": REGISTRY, "blockNumber": block, "blockHash": HexBytes(bytes(32)),
+        "transactionHash": HexBytes(bytes(32)), "transactionIndex": 0, "logIndex": 0,
+        "topics": [HexBytes(_TOPICS[name])] + [_word(v) for v in indexed], "data": HexBytes(data),
+    }
+
+class FakeNode:
+    """Pengganti utils.w3 (block_number & get_logs) dan utils.resolve_batch."""
+
+    def __init__(self):
+        self.block_number = 10
+        self.logs = []
+        self.issuers = {}
+        self.credentials = {}
+        self.calls = []
+
+    @property
+    def eth(self):
+        return self
+
+    def get_logs(self, params):
+        return [log for log in self.logs if params["fromBlock"] <= log["blockNumber"] <= params["toBlock"]]
+
+    def resolve_batch(self, contract, issuer_addrs, vc_hashes, block_identifier=None):
+        self.calls.append((list(issuer_addrs), list(vc_hashes), block_identifier))
+        return ({a: self.issuers.get(a, (False, False, "")) for a in issuer_addrs},
+                {bytes(h): self.credentials.get(bytes(h), (False, False, False, ZERO)) for h in vc_hashes},
+                block_identifier)
+
+@pytest.fixture
+def node(monkeypatch):
+    fake = FakeNode()
+    monkeypatch.setattr(utils, "w3", fake)
+    monkeypatch.setattr(utils, "resolve_batch", fake.resolve_batch)
+    return fake
+
+@pytest.fixture
+def cache(node):
+    contract = Web3().eth.contract(address=REGISTRY, abi=EVENTS_ABI)
+    return utils.StatusCache(contract, maxsize=3, poll_interval=0)
+
+def _hash(i):
+    return Web3.keccak(text=f"ijazah-{i}")
+
+def test_second_read_is_served_from_cache(node, cache):
+    node.credentials[bytes(_hash(1))] = (True, False, False, KAMPUS)
+    assert cache.credential_status(_hash(1)) == (True, False, False, KAMPUS)
+    assert cache.credential_status(_hash(1)) == (True, False, False, KAMPUS)
+    assert len(node.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_revoked_event_updates_cached_entry(node, cache):
+    node.credentials[bytes(_hash(1))] = (True, False, False, KAMPUS)
+    cache.credential_status(_hash(1))
+
+    node.block_number = 12
+    node.logs.append(_log(11, "CredentialValidated", bytes(_hash(1))))
+    node.logs.append(_log(12, "CredentialRevoked", bytes(_hash(1)), data=encode(["string"], ["salah cetak"])))
+    assert cache.credential_status(_hash(1)) == (True, True, True, KAMPUS)
+    assert len(node.calls) == 1   # diperbarui dari event, tanpa eth_call baru
+    assert cache.cursor == 12
+
+def test_did_registered_event_drops_issuer(node, cache):
+    node.issuers[KAMPUS] = (True, True, "Kampus")
+    assert cache.resolve_did(KAMPUS) == (True, True, "Kampus")
+
+    # registerDID ulang mereset centang biru: entry dibuang, baca berikutnya ke node
+    node.issuers[KAMPUS] = (True, False, "Kampus Baru")
+    node.block_number = 11
+    node.logs.append(_log(11, "DIDRegistered", KAMPUS, data=encode(["string"], ["Kampus Baru"])))
+    assert cache.resolve_did(KAMPUS) == (True, False, "Kampus Baru")
+    assert len(node.calls) == 2
+
+def test_invalidate_refetches_at_latest_block(node, cache):
+    node.credentials[bytes(_hash(1))] = (True, False, False, KAMPUS)
+    cache.poll_interval = 3600   # tanpa invalidate, cache tidak akan sync lagi
+    cache.credential_status(_hash(1))
+
+    node.block_number = 15
+    node.credentials[bytes(_hash(1))] = (True, True, False, KAMPUS)
+    cache.invalidate(vc_hash=_hash(1))
+    assert cache.credential_status(_hash(1)) == (True, True, False, KAMPUS)
+    assert node.calls[-1][2] == 15
+
+def test_lru_evicts_least_recently_used(node, cache):
+    for i in range(3):
+        cache.credential_status(_hash(i))
+    cache.credential_status(_hash(0))   # hash 0 jadi yang terbaru dipakai
+    cache.credential_status(_hash(3))   # melebihi maxsize=3: hash 1 dibuang
+
+    assert list(cache.credentials) == [bytes(_hash(i)) for i in (2, 0, 3)]
+    calls = len(node.calls)
+    cache.credential_status(_hash(1))
+    assert len(node.calls) == calls + 1
+
+def test_result_from_stale_block_is_not_cached(node, cache, monkeypatch):
+    fetch = node.resolve_batch
+
+    def racing_fetch(*args, **kwargs):
+        cache.invalidate()   # transaksi lain terjadi selama eth_call berlangsung
+        return fetch(*args, **kwargs)
+
+    monkeypatch.setattr(utils, "resolve_batch", racing_fetch)
+    cache.credential_status(_hash(1))
+    assert bytes(_hash(1)) not in cache.credentials
+
+# --- Sync di luar lock ---
+class SlowLogs:
+    """get_logs yang menunggu `release` (node lambat)."""
+
+    def __init__(self, node):
+        self.node = node
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.get_logs = node.get_logs
+
+    def __call__(self, params):
+        self.entered.set()
+        assert self.release.wait(5)
+        return self.get_logs(params)
+
+def test_readers_are_not_blocked_by_slow_get_logs(node, cache):
+    node.credentials[bytes(_hash(1))] = (True, False, False, KAMPUS)
+    cache.credential_status(_hash(1))
+    cache.poll_interval = 3600
+
+    slow = SlowLogs(node)
+    node.get_logs = slow
+    node.block_number = 20
+    syncing = threading.Thread(target=cache.sync, kwargs={"force": True})
+    syncing.start()
+    try:
+        assert slow.entered.wait(5)
+        reader = threading.Thread(target=cache.credential_status, args=(_hash(1),))
+        reader.start()
+        reader.join(2)
+        assert not reader.is_alive(), "pembaca menunggu get_logs"
+    finally:
+        slow.release.set()
+        syncing.join(5)
+    assert cache.cursor == 20
+
+def test_logs_fetched_across_invalidate_are_discarded(node, cache):
+    node.credentials[bytes(_hash(1))] = (True, False, False, KAMPUS)
+    cache.credential_status(_hash(1))
+
+    slow = SlowLogs(node)
+    node.get_logs = slow
+    node.block_number = 12
+    syncing = threading.Thread(target=cache.sync, kwargs={"force": True})
+    syncing.start()
+    assert slow.entered.wait(5)
+    cache.invalidate(issuer=KAMPUS)   # di tengah get_logs
+    slow.release.set()
+    syncing.join(5)
+
+    assert cache.cursor == 10          # log rentang 11..12 tidak diterapkan
+    assert cache._force_sync           # baca berikutnya tetap sync ulang
+    node.get_logs = slow.get_logs
+    cache.credential_status(_hash(1))
+    assert cache.cursor == 12
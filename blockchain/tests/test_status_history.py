@@ -0,0 +1,70 @@
+import time
+
+import pytest
+from web3 import Web3
+
+import status_history
+
+VC = Web3.keccak(text="ijazah-1")
+
+@pytest.fixture
+def timeline(chain):
+    """
+    Kampus (akun #1) mendaftar, diverifikasi, menerbitkan VC, lalu mencabutnya;
+    tiap langkah berjarak 1000 detik. Return {langkah: nomor blok}.
+    """
+    admin, kampus = chain.accounts[0], chain.accounts[1]
+    f = chain.contract.functions
+    blocks = {}
+    for name, fn, sender in [
+        ("registered", f.registerDID("did:ethr:kampus", "Universitas Uji", "https://kampus"), kampus),
+        ("verified", f.verifyIssuer(kampus), admin),
+        ("issued", f.issueCredential(VC), kampus),
+        ("revoked", f.revokeCredential(VC, "data salah"), kampus),
+    ]:
+        chain.travel(1000)
+        blocks[name] = chain.transact(fn, sender).blockNumber
+    return blocks
+
+@pytest.fixture
+def history(chain, tmp_path):
+    return status_history.StatusHistory(chain.contract, db_path=str(tmp_path / "history.db"), poll_interval=0.01)
+
+def test_as_of_block_follows_each_transition(chain, timeline, history):
+    kampus = chain.accounts[1]
+    assert history.sync() == 4
+    assert history.cursor() == chain.w3.eth.block_number
+
+    before, issued, revoked = timeline["verified"], timeline["issued"], timeline["revoked"]
+    assert history.credential_status(VC, before) == (False, False, False, status_history.ZERO_ADDRESS)
+    assert history.credential_status(VC, issued) == (True, False, False, kampus)
+    assert history.credential_status(VC, revoked)[1] is True
+    assert history.issuer_status(kampus, timeline["registered"]) == (True, False, "Universitas Uji")
+    assert history.issuer_status(kampus, timeline["verified"]) == (True, True, "Universitas Uji")
+
+def test_as_of_time_maps_to_last_block_before(chain, timeline, history):
+    history.sync()
+    issued_at = chain.w3.eth.get_block(timeline["issued"])["timestamp"]
+
+    source = history.at(timestamp=issued_at + 500)
+    assert source.block == timeline["issued"]
+    issuer_status, credential_status, block = source.resolve_batch([chain.accounts[1]], [VC])
+    assert credential_status[bytes(VC)][:2] == (True, False)
+    assert history.at(timestamp=0).block is None
+
+def test_block_beyond_cursor_is_refused(chain, timeline, history):
+    history.sync()
+    chain.travel(10)
+    chain.transact(chain.contract.functions.issueCredential(Web3.keccak(text="ijazah-2")), chain.accounts[1])
+
+    with pytest.raises(status_history.HistoryNotSynced):
+        history.at(block=chain.w3.eth.block_number).resolve_batch([], [VC])
+
+def test_background_sync_catches_up(chain, timeline, history):
+    history.start_background_sync()
+    deadline = time.time() + 10
+    while history.cursor() < chain.w3.eth.block_number and time.time() < deadline:
+        time.sleep(0.01)
+    history.poll_interval = 3600    # thread daemon berhenti memanggil node setelah test
+    assert history.cursor() == chain.w3.eth.block_number
+    assert len(history.history(vc_hash=VC)) == 2
@@ -0,0 +1,104 @@
+import io
+import json
+
+import pytest
+
+import issuance
+import presentation
+import streaming
+import utils
+import verification
+
+@pytest.fixture(params=["ijson", "fallback"])
+def parser(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(streaming, "ijson", None)
+    elif streaming.ijson is None:
+        pytest.skip("ijson tidak terpasang")
+    return request.param
+
+@pytest.fixture(scope="module")
+def many(issuer, holder):
+    """40 VC: cukup untuk beberapa batch dengan batch_size kecil."""
+    wrappers = []
+    for i in range(40):
+        payload = issuance.build_credential_payload(issuer.did, holder.did, f"Mahasiswa {i}", "Sarjana Komputer (S.Kom)")
+        wrappers.append(issuance.wrap_credential(payload, issuer.sign(payload), issuer.did))
+    return wrappers
+
+def _stream(token):
+    return io.BytesIO(json.dumps(token).encode("utf-8"))
+
+def _streamed(token, status, **kwargs):
+    events = list(streaming.verify_stream(_stream(token), status, batch_size=4, max_inflight=3, **kwargs))
+    assert events[-1][0] == "summary"
+    assert all(kind == "document" for kind, _ in events[:-1])
+    return [verdict for _, verdict in events[:-1]], events[-1][1]
+
+def _assert_parity(token, status, audience=None, nonce=None, bundle=None):
+    report = verification.verify_token(token, status, None, bundle, audience, nonce)
+    documents, summary = _streamed(token, status, bundle=bundle, audience=audience, nonce=nonce)
+    assert documents == report["documents"]
+    for key in ("type", "holder", "holder_valid", "challenge_valid", "block", "all_passed"):
+        assert summary[key] == report[key], key
+    assert summary["count"] == len(report["documents"])
+    assert summary["passed"] == sum(v["passed"] for v in report["documents"])
+    return report
+
+def test_embedded_vp_matches_verify_token(parser, many, holder, status):
+    report = _assert_parity(presentation.build_presentation(holder, holder.did, many), status)
+    assert report["all_passed"]
+    assert [v["index"] for v in report["documents"]] == list(range(1, 41))
+
+def test_failures_match_verify_token(parser, many, holder, status):
+    token = presentation.build_presentation(holder, holder.did, many)
+    vcs = token["presentation"]["verifiableCredential"]
+    vcs[5] = json.loads(json.dumps(vcs[5]))
+    vcs[5]["credential"]["credentialSubject"]["data"]["degree"] = "Doktor (Dr.)"   # isi diubah sesudah ditandatangani
+    status.revoked.add(bytes(utils.hash_json(vcs[17]["credential"])))
+    status.missing.add(bytes(utils.hash_json(vcs[30]["credential"])))
+
+    report = _assert_parity(token, status)
+    assert not report["all_passed"]
+    verdicts = report["documents"]
+    assert [i for i, v in enumerate(verdicts) if not v["passed"]] == [5, 17]
+    assert (verdicts[17]["status"], verdicts[30]["status"]) == ("revoked", "unregistered")
+
+def test_raw_vc_matches_verify_token(parser, many, status):
+    _assert_parity(many[0], status)
+
+def test_compact_vp_matches_verify_token(parser, many, holder, status):
+    token, bundle = presentation.build_compact_presentation(holder, holder.did, many[:6], audience="Bank", nonce="n-1",
+                                                            include_bundle=False)
+    assert _assert_parity(token, status, "Bank", "n-1", bundle)["all_passed"]
+    assert not _assert_parity(token, status, "Bank", "n-lain", bundle)["all_passed"]
+
+def test_compact_vp_without_challenge_is_rejected(parser, many, holder, status):
+    token, _ = presentation.build_compact_presentation(holder, holder.did, many[:2], audience="Bank", nonce="n-1")
+    with pytest.raises(verification.TokenFormatError):
+        list(streaming.verify_stream(_stream(token), status))
+
+# --- Parser inkremental ---
+@pytest.mark.parametrize("token", [
+    {"presentation": {"holder": "did:ethr:0x1", "verifiableCredential": []}, "proof": {"jws": "0x"}},
+    {"presentation": {"verifiableCredential": [{"a": "é   \\\" 😀", "n": 2 ** 70, "f": 0.1, "e": 1e-7}, [], {}],
+                      "holder": "h"}},
+    {"credential": {"x": [1, 2, {"y": None}]}, "proof": {"jws": "0xab"}},
+])
+def test_iter_token_rebuilds_the_same_json(parser, token):
+    raw = json.dumps(token, ensure_ascii=False).encode("utf-8")
+    events = list(streaming.iter_token(io.BytesIO(raw)))
+    credentials = [value for kind, value in events if kind == "credential"]
+    kind, skeleton = events[-1]
+    assert kind == "token"
+    expected = json.loads(raw)
+    if "presentation" in expected:
+        assert credentials == expected["presentation"]["verifiableCredential"]
+        expected["presentation"]["verifiableCredential"] = []
+        skeleton["presentation"]["verifiableCredential"] = []
+    assert skeleton == expected
+
+def test_deep_nesting_is_rejected(parser):
+    raw = b'{"presentation": {"verifiableCredential": [' + b"[" * 200 + b"]" * 200 + b"]}}"
+    with pytest.raises(RecursionError):
+        list(streaming.iter_token(io.BytesIO(raw)))
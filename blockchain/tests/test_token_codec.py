@@ -0,0 +1,90 @@
+import json
+import zlib
+
+import pytest
+
+import token_codec
+
+ADDRESS = "0x52908400098527886E0F7030069857D2E4169EE7"   # checksum EIP-55
+
+CREDENTIAL = {
+    "@context": ["https://www.w3.org/2018/credentials/v1"],
+    "type": ["VerifiableCredential", "UniversityDegreeCredential"],
+    "issuer": f"did:ethr:{ADDRESS}",
+    "issuanceDate": "2025-08-17T10:00:00Z",
+    "credentialSubject": {
+        "id": f"did:ethr:{ADDRESS}#controller",
+        "degree": {"name": "Sarjana Komputer (S.Kom)", "gpa": 3.75, "credits": 144},
+        "notes": ["Cum laude", "Ærø 日本語", "", None, True, False],
+        "big": 2 ** 70, "negative_big": -(2 ** 70), "small": -1,
+        "mixedHex": "0xAbCd", "shortHex": "deadbeef",
+    },
+    "proof": {"type": "EcdsaSecp256k1Signature2019", "jws": "ab" * 65, "anchor": "0x" + "12" * 32},
+}
+
+def _bomb(size):
+    """Token ringkas ter-deflate yang setelah di-inflate berisi string CBOR `size` byte."""
+    body = b"\x7a" + size.to_bytes(4, "big") + b"a" * size
+    return bytes((token_codec.FORMAT_VERSION << 4 | token_codec.FLAG_DEFLATE,)) + zlib.compress(body, 9)
+
+# --- Round trip ---
+@pytest.mark.parametrize("deflate", [True, False])
+def test_binary_round_trip(deflate):
+    assert token_codec.decode(token_codec.encode(CREDENTIAL, deflate)) == CREDENTIAL
+
+def test_text_round_trip_is_qr_alphanumeric():
+    text = token_codec.to_text(CREDENTIAL)
+    assert text.startswith(token_codec.TEXT_PREFIX)
+    assert set(text[len(token_codec.TEXT_PREFIX):]) <= set(token_codec.BASE45_ALPHABET)
+    assert token_codec.from_text(text) == CREDENTIAL
+
+def test_loads_accepts_every_form():
+    raw_json = json.dumps(CREDENTIAL)
+    text = token_codec.to_text(CREDENTIAL)
+    for raw in (raw_json, raw_json.encode(), text, text.encode(), token_codec.encode(CREDENTIAL)):
+        assert token_codec.loads(raw) == CREDENTIAL
+    assert token_codec.is_compact(text) and not token_codec.is_compact(raw_json)
+
+def test_decoded_floats_match_json_loads():
+    data = json.loads('{"a": 0.30000000000000004, "b": 1e21, "c": -0.0, "d": 5}')
+    decoded = token_codec.decode(token_codec.encode(data))
+    assert decoded == data
+    assert [type(v) for v in decoded.values()] == [type(v) for v in data.values()]
+
+# --- Input berbahaya / rusak ---
+def test_rejects_decompression_bomb():
+    with pytest.raises(token_codec.CodecError, match="melebihi"):
+        token_codec.decode(_bomb(token_codec.MAX_DECODED_SIZE + 1))
+
+def test_accepts_payload_at_size_limit():
+    size = token_codec.MAX_DECODED_SIZE - 5   # 5 byte head CBOR
+    assert len(token_codec.decode(_bomb(size))) == size
+
+def test_rejects_truncated_deflate():
+    blob = token_codec.encode(CREDENTIAL)
+    with pytest.raises(token_codec.CodecError):
+        token_codec.decode(blob[:len(blob) // 2])
+
+def test_rejects_trailing_data():
+    with pytest.raises(token_codec.CodecError, match="tersisa"):
+        token_codec.decode(token_codec.encode(CREDENTIAL, deflate=False) + b"\x00")
+
+@pytest.mark.parametrize("raw", ["[" * 100000 + "]" * 100000, '{"a":' * 1000 + "1" + "}" * 1000, "[" * 100000])
+def test_loads_rejects_deep_json(raw):
+    with pytest.raises(RecursionError):
+        token_codec.loads(raw)
+
+def test_depth_limit_ignores_brackets_inside_strings():
+    raw = json.dumps({"text": "[" * 1000, "nested": [[[]]]})
+    assert token_codec.loads(raw)["text"] == "[" * 1000
+
+def test_decode_rejects_deep_cbor():
+    body = b"\x81" * 1000 + b"\x00"   # array 1 elemen, bersarang 1000 tingkat
+    with pytest.raises(RecursionError):
+        token_codec.decode(bytes((token_codec.FORMAT_VERSION << 4,)) + body)
+
+def test_max_depth_is_allowed():
+    depth = token_codec.MAX_DEPTH
+    assert token_codec.loads("[" * depth + "]" * depth) is not None
+    body = b"\x81" * (depth - 1) + b"\x80"
+    assert token_codec.decode(bytes((token_codec.FORMAT_VERSION << 4,)) + body) is not None
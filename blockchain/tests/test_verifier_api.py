@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from web3.exceptions import ProviderConnectionError, Web3RPCError
+
+import presentation
+import verifier_api
+
+class FakeRegistry:
+    """AsyncRegistry tanpa node: delegasi ke StaticStatus, atau lempar `error`."""
+
+    def __init__(self, status, error=None):
+        self.status, self.error = status, error
+
+    async def resolve_batch(self, issuer_addrs, vc_hashes):
+        if self.error is not None:
+            raise self.error
+        return self.status.resolve_batch(issuer_addrs, vc_hashes)
+
+def _post(registry, path, body):
+    async def run():
+        service = verifier_api.VerifierService(registry, timeout=5)
+        app = web.Application()
+        app.router.add_post("/verify", service.handle_verify)
+        app.router.add_post("/verify/batch", service.handle_verify_batch)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.post(path, data=body)
+            return response.status, await response.json()
+    return asyncio.run(run())
+
+@pytest.fixture
+def vp(holder, credentials):
+    return json.dumps(presentation.build_presentation(holder, holder.did, credentials))
+
+def test_valid_token_passes(status, vp):
+    code, report = _post(FakeRegistry(status), "/verify", vp)
+    assert code == 200
+    assert report["all_passed"]
+
+@pytest.mark.parametrize("body", [
+    "{bukan json",
+    json.dumps({"foo": 1}),
+    json.dumps({"presentation": {"holder": "did:ethr:0x1"}}),         # tanpa verifiableCredential
+    json.dumps({"presentation": {"holder": "x", "verifiableCredential": [{"credential": {}}]}}),
+])
+def test_malformed_token_is_400(status, body):
+    code, report = _post(FakeRegistry(status), "/verify", body)
+    assert code == 400
+    assert report["code"] == 400
+
+@pytest.mark.parametrize("error, code", [
+    (ProviderConnectionError("node mati"), 503),
+    (aiohttp.ServerDisconnectedError(), 503),
+    (ConnectionRefusedError("ditolak"), 503),
+    (Web3RPCError("execution reverted"), 502),
+    (RuntimeError("bug"), 500),
+])
+def test_server_side_errors_are_not_400(status, vp, error, code):
+    got, report = _post(FakeRegistry(status, error), "/verify", vp)
+    assert got == code
+    assert report["code"] == code
+
+def test_batch_items_carry_error_code(status, vp):
+    body = json.dumps({"tokens": [json.loads(vp), {"foo": 1}]})
+    code, body = _post(FakeRegistry(status, ProviderConnectionError("node mati")), "/verify/batch", body)
+    assert code == 200
+    assert [item["code"] for item in body["results"]] == [503, 400]
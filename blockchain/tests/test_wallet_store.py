@@ -0,0 +1,66 @@
+import copy
+
+import pytest
+
+import issuance
+import utils
+import wallet_store
+
+@pytest.fixture
+def store(tmp_path):
+    return wallet_store.WalletStore(str(tmp_path / "wallet.db"))
+
+@pytest.fixture
+def wallet(issuer, holder):
+    """Enam VC: tiga S.Kom & tiga M.Kom, tanggal terbit berurutan."""
+    wrappers = []
+    for i in range(6):
+        degree = "Sarjana Komputer (S.Kom)" if i < 3 else "Magister Komputer (M.Kom)"
+        payload = issuance.build_credential_payload(issuer.did, holder.did, f"Mahasiswa {i}", degree)
+        payload["issuanceDate"] = f"2025-0{i + 1}-01T00:00:00Z"
+        wrappers.append(issuance.wrap_credential(payload, issuer.sign(payload), issuer.did))
+    return wrappers
+
+def test_add_rejects_duplicates(store, wallet):
+    first = store.add(wallet[0])
+    assert first is not None
+    assert store.add(copy.deepcopy(wallet[0])) is None
+    assert store.count() == 1
+    assert store.get_many([first]) == [wallet[0]]
+
+def test_filters_and_paging_use_index_columns(store, wallet, issuer):
+    ids = [store.add(vc) for vc in wallet]
+    assert store.count(degree="Magister Komputer (M.Kom)") == 3
+    assert store.count(issuer=issuer.did, degree="Sarjana Komputer (S.Kom)") == 3
+    assert store.distinct("degree") == ["Magister Komputer (M.Kom)", "Sarjana Komputer (S.Kom)"]
+
+    # Terbaru dulu, halaman tidak tumpang tindih
+    first, second = store.page(4, 0), store.page(4, 4)
+    assert [i for i, _ in first + second] == ids[::-1]
+    assert [s["id"] for s in store.summaries(2, 1)] == ids[4:2:-1]
+
+    vc_hash = "0x" + utils.hash_json(wallet[2]["credential"]).hex()
+    assert store.page(vc_hash=vc_hash) == [(ids[2], wallet[2])]
+
+def test_update_reindexes_and_delete_removes(store, wallet):
+    cred_id = store.add(wallet[0])
+    changed = copy.deepcopy(wallet[0])
+    changed["credential"]["credentialSubject"]["data"]["degree"] = "Doktor (Dr.)"
+    store.update(cred_id, changed)
+    assert store.count(degree="Doktor (Dr.)") == 1
+    assert store.count(degree="Sarjana Komputer (S.Kom)") == 0
+
+    store.delete(cred_id)
+    assert store.count() == 0
+    assert store.get_many([cred_id]) == []
+
+def test_get_many_keeps_requested_order(store, wallet):
+    ids = [store.add(vc) for vc in wallet[:3]]
+    assert store.get_many([ids[2], 999, ids[0]]) == [wallet[2], wallet[0]]
+
+def test_migrate_json_runs_once(store, wallet, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    utils.save_db("holder_wallet.json", {"credentials": wallet[:3] + [wallet[0]]})
+    assert store.migrate_json() == 3
+    assert store.migrate_json() == 0
+    assert store.count() == 3
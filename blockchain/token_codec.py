@@ -0,0 +1,360 @@
+import functools
+import json
+import re
+import struct
+import zlib
+
+from eth_utils import to_checksum_address
+
+# --- FORMAT TOKEN RINGKAS (CBOR + kamus key + deflate + base45) ---
+# Alternatif JSON untuk VC/VP yang dipindah lewat copy-paste / QR:
+#   biner : 1 byte header (versi << 4 | flag deflate) + CBOR (RFC 8949)
+#   teks  : TEXT_PREFIX + base45(biner)  -> hanya karakter mode alfanumerik QR
+# Decode menghasilkan objek Python yang sama persis dengan hasil json.loads,
+# jadi utils.hash_json (JSON kanonik) & signature tetap cocok.
+#
+# Penghematan di atas CBOR biasa:
+#   - key yang sudah dikenal (KEYS) -> integer kecil
+#   - string yang sering muncul (WORDS) -> tag TAG_WORD + indeks
+#   - hex lowercase ("0x.." / jws tanpa 0x) -> byte string (separuh ukuran)
+#   - "did:ethr:<alamat checksum>[#controller]" -> 20 byte alamat
+# KEYS & WORDS hanya boleh DITAMBAH di belakang; mengubah urutan = versi baru.
+
+FORMAT_VERSION = 1
+FLAG_DEFLATE = 0x01
+TEXT_PREFIX = "SSI1:"
+MAX_DECODED_SIZE = 16 * 1024 * 1024   # batas CBOR hasil inflate (cegah decompression bomb)
+MAX_DEPTH = 64                         # kedalaman bersarang objek / array maksimum
+
+KEYS = (
+    "@context", "id", "type", "issuer", "issuanceDate", "credentialSubject",
+    "data", "name", "degree", "university", "credential", "proof",
+    "verificationMethod", "jws", "anchor", "merkleRoot", "merklePath",
+    "presentation", "verifiableCredential", "holder", "credentialDigests",
+    "nonce", "audience", "created", "bundle",
+)
+WORDS = (
+    "https://www.w3.org/2018/credentials/v1",
+    "VerifiableCredential", "UniversityDegreeCredential",
+    "VerifiablePresentation", "CompactVerifiablePresentation",
+    "EcdsaSecp256k1Signature2019", "MerkleBatchAnchor2025",
+    "Universitas Pendidikan Indonesia",
+    "Sarjana Komputer (S.Kom)", "Magister Komputer (M.Kom)",
+)
+_KEY_INDEX = {k: i for i, k in enumerate(KEYS)}
+_WORD_INDEX = {w: i for i, w in enumerate(WORDS)}
+
+# Tag CBOR 7..11 belum terdaftar di IANA; dipakai privat di dalam format ini
+TAG_WORD = 7          # uint  -> WORDS[i]
+TAG_HEX_0X = 8        # bytes -> "0x" + hex
+TAG_HEX = 9           # bytes -> hex (tanpa 0x, mis. jws)
+TAG_DID = 10          # bytes -> "did:ethr:" + alamat checksum
+TAG_DID_CONTROLLER = 11   # bytes -> "did:ethr:" + alamat checksum + "#controller"
+TAG_BIGNUM, TAG_NEG_BIGNUM = 2, 3
+
+_HEX_0X = re.compile(r"0x(?:[0-9a-f]{2})+")
+_HEX = re.compile(r"(?:[0-9a-f]{2}){8,}")
+_DID = re.compile(r"did:ethr:(0x[0-9a-fA-F]{40})(#controller)?")
+
+# Cek kedalaman JSON tanpa parse: buang string, sisakan kurung, lalu kupas pasangan terdalam
+_JSON_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_BRACKET_PAIR = re.compile(rb"\[\]|\{\}")
+_NON_BRACKET = bytes(sorted(set(range(256)) - set(b"[]{}")))
+
+# Alamat yang sama muncul di setiap VC (issuer, holder); checksum = Keccak, jadi di-cache
+_checksum = functools.lru_cache(maxsize=4096)(to_checksum_address)
+
+class CodecError(ValueError):
+    """Data bukan token ringkas yang valid."""
+
+def _too_deep():
+    return RecursionError(f"Struktur token bersarang lebih dari {MAX_DEPTH} tingkat")
+
+def check_depth(raw):
+    """
+    Tolak JSON (str / bytes) yang bersarang lebih dari MAX_DEPTH tingkat
+    dengan RecursionError, SEBELUM json.loads. Batas rekursi proses ini
+    dinaikkan dependensi web3 (py_ecc), sehingga JSON yang sangat dalam
+    bisa membuat parser C crash alih-alih melempar RecursionError.
+    """
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8", "surrogatepass")
+    brackets = _JSON_STRING.sub(b"", raw).translate(None, _NON_BRACKET)
+    depth = 0
+    while depth <= MAX_DEPTH:
+        reduced = _BRACKET_PAIR.sub(b"", brackets)
+        if len(reduced) == len(brackets):
+            break
+        brackets, depth = reduced, depth + 1
+    # Sisa = kurung tanpa pasangan (JSON terpotong / rusak); yang masih terbuka ikut dihitung
+    if depth + brackets.count(b"[") + brackets.count(b"{") > MAX_DEPTH:
+        raise _too_deep()
+
+# --- CBOR: ENCODE ---
+def _head(out, major, value):
+    if value < 24:
+        out.append(major << 5 | value)
+    elif value < 0x100:
+        out += bytes((major << 5 | 24, value))
+    elif value < 0x10000:
+        out.append(major << 5 | 25)
+        out += struct.pack(">H", value)
+    elif value < 0x100000000:
+        out.append(major << 5 | 26)
+        out += struct.pack(">I", value)
+    else:
+        out.append(major << 5 | 27)
+        out += struct.pack(">Q", value)
+
+def _encode_bytes(out, data):
+    _head(out, 2, len(data))
+    out += data
+
+def _encode_str(out, text):
+    if text in _WORD_INDEX:
+        _head(out, 6, TAG_WORD)
+        _head(out, 0, _WORD_INDEX[text])
+    elif _HEX_0X.fullmatch(text):
+        _head(out, 6, TAG_HEX_0X)
+        _encode_bytes(out, bytes.fromhex(text[2:]))
+    elif _HEX.fullmatch(text):
+        _head(out, 6, TAG_HEX)
+        _encode_bytes(out, bytes.fromhex(text))
+    elif (match := _DID.fullmatch(text)) and _checksum(match[1]) == match[1]:
+        _head(out, 6, TAG_DID_CONTROLLER if match[2] else TAG_DID)
+        _encode_bytes(out, bytes.fromhex(match[1][2:]))
+    else:
+        data = text.encode("utf-8")
+        _head(out, 3, len(data))
+        out += data
+
+def _encode(out, value):
+    if value is None:
+        out.append(0xf6)
+    elif value is True:
+        out.append(0xf5)
+    elif value is False:
+        out.append(0xf4)
+    elif isinstance(value, str):
+        _encode_str(out, value)
+    elif isinstance(value, int):
+        major, magnitude = (0, value) if value >= 0 else (1, -1 - value)
+        if magnitude < 1 << 64:
+            _head(out, major, magnitude)
+        else:
+            _head(out, 6, TAG_BIGNUM if major == 0 else TAG_NEG_BIGNUM)
+            _encode_bytes(out, magnitude.to_bytes((magnitude.bit_length() + 7) // 8, "big"))
+    elif isinstance(value, float):
+        out.append(0xfb)
+        out += struct.pack(">d", value)
+    elif isinstance(value, dict):
+        _head(out, 5, len(value))
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise CodecError(f"Key objek harus string (JSON), bukan {type(key).__name__}")
+            if key in _KEY_INDEX:
+                _head(out, 0, _KEY_INDEX[key])
+            else:
+                _encode_str(out, key)
+            _encode(out, item)
+    elif isinstance(value, (list, tuple)):
+        _head(out, 4, len(value))
+        for item in value:
+            _encode(out, item)
+    else:
+        raise CodecError(f"Tipe {type(value).__name__} tidak bisa direpresentasikan sebagai JSON")
+
+# --- CBOR: DECODE ---
+def _lookup(table, index, label):
+    if type(index) is not int or not 0 <= index < len(table):
+        raise CodecError(f"Indeks {label} {index!r} tidak dikenal")
+    return table[index]
+
+class _Decoder:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+        self.depth = 0
+
+    def _take(self, size):
+        end = self.pos + size
+        if end > len(self.data):
+            raise CodecError("Data CBOR terpotong")
+        chunk = self.data[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def _argument(self, info):
+        if info < 24:
+            return info
+        if info == 24:
+            return self._take(1)[0]
+        if info == 25:
+            return struct.unpack(">H", self._take(2))[0]
+        if info == 26:
+            return struct.unpack(">I", self._take(4))[0]
+        if info == 27:
+            return struct.unpack(">Q", self._take(8))[0]
+        raise CodecError("Panjang CBOR tak tentu (indefinite) tidak didukung")
+
+    def value(self):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise _too_deep()
+        value = self._value()
+        self.depth -= 1
+        return value
+
+    def _value(self):
+        initial = self._take(1)[0]
+        major, info = initial >> 5, initial & 0x1f
+        if major == 7:
+            if initial == 0xf6:
+                return None
+            if initial == 0xf5:
+                return True
+            if initial == 0xf4:
+                return False
+            if initial == 0xfb:
+                return struct.unpack(">d", self._take(8))[0]
+            raise CodecError(f"Nilai simple CBOR 0x{initial:02x} tidak didukung")
+
+        arg = self._argument(info)
+        if major == 0:
+            return arg
+        if major == 1:
+            return -1 - arg
+        if major == 2:
+            return bytes(self._take(arg))
+        if major == 3:
+            return str(self._take(arg), "utf-8")
+        if major == 4:
+            return [self.value() for _ in range(arg)]
+        if major == 5:
+            result = {}
+            for _ in range(arg):
+                key = self.value()
+                if not isinstance(key, str):
+                    key = _lookup(KEYS, key, "key")
+                result[key] = self.value()
+            return result
+        return self._tagged(arg, self.value())
+
+    def _tagged(self, tag, content):
+        if tag == TAG_WORD:
+            return _lookup(WORDS, content, "kata")
+        if not isinstance(content, bytes):
+            raise CodecError(f"Isi tag {tag} harus byte string")
+        if tag == TAG_HEX_0X:
+            return "0x" + content.hex()
+        if tag == TAG_HEX:
+            return content.hex()
+        if tag in (TAG_DID, TAG_DID_CONTROLLER):
+            did = "did:ethr:" + _checksum(content)
+            return did + "#controller" if tag == TAG_DID_CONTROLLER else did
+        if tag == TAG_BIGNUM:
+            return int.from_bytes(content, "big")
+        if tag == TAG_NEG_BIGNUM:
+            return -1 - int.from_bytes(content, "big")
+        raise CodecError(f"Tag CBOR {tag} tidak didukung")
+
+# --- API ---
+def encode(data, deflate=True):
+    """Token (dict hasil json.loads) -> bytes format ringkas."""
+    body = bytearray()
+    _encode(body, data)
+    flags = 0
+    if deflate:
+        packed = zlib.compress(bytes(body), 9)
+        # Token kecil bisa membesar setelah deflate; simpan yang lebih kecil
+        if len(packed) < len(body):
+            body, flags = packed, FLAG_DEFLATE
+    return bytes((FORMAT_VERSION << 4 | flags,)) + bytes(body)
+
+def decode(blob):
+    """Kebalikan `encode`: bytes format ringkas -> dict/list seperti json.loads."""
+    if not blob or blob[0] >> 4 != FORMAT_VERSION:
+        raise CodecError("Bukan token ringkas (versi format tidak dikenal)")
+    body = blob[1:]
+    if blob[0] & FLAG_DEFLATE:
+        # Inflate dibatasi MAX_DECODED_SIZE; sisa input yang belum terbaca = token kebesaran
+        inflater = zlib.decompressobj()
+        try:
+            body = inflater.decompress(body, MAX_DECODED_SIZE)
+        except zlib.error as e:
+            raise CodecError(f"Deflate rusak: {e}") from None
+        if inflater.unconsumed_tail:
+            raise CodecError(f"Token melebihi {MAX_DECODED_SIZE // (1024 * 1024)} MB setelah dekompresi")
+        if not inflater.eof:
+            raise CodecError("Deflate rusak: data terpotong")
+    decoder = _Decoder(memoryview(body))
+    value = decoder.value()
+    if decoder.pos != len(body):
+        raise CodecError("Ada data tersisa setelah token")
+    return value
+
+# --- BASE45 (RFC 9285) ---
+BASE45_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+_BASE45_INDEX = {c: i for i, c in enumerate(BASE45_ALPHABET)}
+
+def b45encode(data):
+    chars = []
+    for i in range(0, len(data) - 1, 2):
+        n = data[i] << 8 | data[i + 1]
+        chars += (BASE45_ALPHABET[n % 45], BASE45_ALPHABET[n // 45 % 45], BASE45_ALPHABET[n // 2025])
+    if len(data) % 2:
+        chars += (BASE45_ALPHABET[data[-1] % 45], BASE45_ALPHABET[data[-1] // 45])
+    return "".join(chars)
+
+def b45decode(text):
+    try:
+        values = [_BASE45_INDEX[c] for c in text]
+    except KeyError as e:
+        raise CodecError(f"Karakter base45 tidak valid: {e.args[0]!r}") from None
+    if len(values) % 3 == 1:
+        raise CodecError("Panjang base45 tidak valid")
+    out = bytearray()
+    for i in range(0, len(values) - 2, 3):
+        n = values[i] + values[i + 1] * 45 + values[i + 2] * 2025
+        if n > 0xffff:
+            raise CodecError("Blok base45 di luar rentang")
+        out += bytes((n >> 8, n & 0xff))
+    if len(values) % 3 == 2:
+        n = values[-2] + values[-1] * 45
+        if n > 0xff:
+            raise CodecError("Blok base45 di luar rentang")
+        out.append(n)
+    return bytes(out)
+
+def to_text(data, deflate=True):
+    """Token -> teks ringkas (TEXT_PREFIX + base45), aman untuk QR mode alfanumerik."""
+    return TEXT_PREFIX + b45encode(encode(data, deflate))
+
+def from_text(text):
+    text = text.strip()
+    if not text.startswith(TEXT_PREFIX):
+        raise CodecError(f"Teks token ringkas harus diawali '{TEXT_PREFIX}'")
+    return decode(b45decode(text[len(TEXT_PREFIX):]))
+
+def is_compact(raw):
+    """True jika `raw` (str / bytes) adalah token ringkas, bukan JSON."""
+    if isinstance(raw, str):
+        return raw.lstrip().startswith(TEXT_PREFIX)
+    head = bytes(raw[:len(TEXT_PREFIX) + 8]).lstrip()
+    return head.startswith(TEXT_PREFIX.encode()) or (bool(head) and head[0] >> 4 == FORMAT_VERSION)
+
+def loads(raw):
+    """
+    Baca token dari JSON, teks ringkas, atau biner ringkas (str / bytes).
+    Pengganti json.loads di aplikasi holder & verifier.
+    """
+    if isinstance(raw, (bytes, bytearray, memoryview)):
+        raw = bytes(raw)
+        if raw.lstrip().startswith(TEXT_PREFIX.encode()):
+            return from_text(raw.decode("ascii"))
+        if raw and raw[0] >> 4 == FORMAT_VERSION:
+            return decode(raw)
+    elif raw.lstrip().startswith(TEXT_PREFIX):
+        return from_text(raw)
+    check_depth(raw)
+    return json.loads(raw)
@@ -1,11 +1,333 @@
+import bisect
+import importlib.util
 import json
+import multiprocessing
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from requests.adapters import HTTPAdapter
 from web3 import Web3
-from eth_account.messages import encode_defunct
+from web3.middleware import Web3Middleware
+from eth_account import Account
+from eth_account.messages import defunct_hash_message, encode_defunct
+from eth_keys import keys
+from eth_utils import event_abi_to_log_topic
+
+# --- INSTRUMENTASI (Metrik format Prometheus) ---
+# Bucket latency dalam detik (0.1ms s/d 10s)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # slot terakhir = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Perkiraan kuantil dari bucket (batas atas bucket)."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+class Metrics:
+    """
+    Registry metrik in-process: histogram latency & counter, berlabel.
+    Satu lock + bisect per observasi, cukup murah untuk selalu aktif.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}  # (nama, ((label, nilai), ...)) -> Histogram
+        self.counters = {}    # (nama, ((label, nilai), ...)) -> angka
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = Histogram()
+            hist.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Catat durasi blok `with` ke histogram `<name>_seconds`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{name}_seconds", time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """Ringkasan per histogram (untuk panel diagnostik)."""
+        with self._lock:
+            items = list(self.histograms.items())
+        rows = []
+        for (name, labels), hist in sorted(items):
+            rows.append({
+                "metric": name,
+                "labels": ", ".join(f"{k}={v}" for k, v in labels),
+                "count": hist.count,
+                "total_s": round(hist.sum, 4),
+                "avg_ms": round(hist.sum / hist.count * 1000, 3) if hist.count else 0.0,
+                "p95_ms": round(hist.quantile(0.95) * 1000, 3),
+            })
+        return rows
+
+    def render_prometheus(self, prefix="ssi_"):
+        """Ekspor semua metrik dalam Prometheus text exposition format."""
+        def fmt_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            counters = sorted(self.counters.items())
+
+        lines, typed = [], set()
+        for (name, labels), hist in histograms:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, n in zip(hist.buckets + (float("inf"),), hist.counts):
+                cumulative += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{fmt_labels(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{metric}_sum{fmt_labels(labels)} {hist.sum}")
+            lines.append(f"{metric}_count{fmt_labels(labels)} {hist.count}")
+        for (name, labels), value in counters:
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{fmt_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+
+class RPCMetricsMiddleware(Web3Middleware):
+    """Hitung & ukur durasi setiap JSON-RPC method (rpc_request_seconds{method=...})."""
+
+    def _record(self, method, started, response):
+        metrics.observe("rpc_request_seconds", time.perf_counter() - started, method=method)
+        if isinstance(response, dict) and "error" in response:
+            metrics.inc("rpc_errors_total", method=method)
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = make_request(method, params)
+                return response
+            except Exception:
+                metrics.inc("rpc_errors_total", method=method)
+                raise
+            finally:
+                self._record(method, started, response)
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method, params):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = await make_request(method, params)
+                return response
+            except Exception:
+                metrics.inc("rpc_errors_total", method=method)
+                raise
+            finally:
+                self._record(method, started, response)
+        return middleware
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Endpoint /metrics sederhana (thread daemon) untuk di-scrape Prometheus."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    return server
 
 # --- KONFIGURASI BLOCKCHAIN ---
 RPC_URL = "http://127.0.0.1:8545"
-w3 = Web3(Web3.HTTPProvider(RPC_URL))
+RPC_POOL_SIZE = 32
+RPC_BATCH_WINDOW = 0.0      # detik tambahan menunggu panggilan lain sebelum batch dikirim
+RPC_BATCH_INFLIGHT = 4      # request HTTP paralel; panggilan berikutnya antre & digabung
+RPC_BATCH_MAX = 100         # panggilan per request batch
+
+# Method yang tidak digabung: transaksi (urutan nonce), polling receipt & log besar
+UNBATCHED_METHODS = frozenset({
+    "eth_sendRawTransaction", "eth_sendTransaction", "eth_getLogs",
+    "eth_subscribe", "eth_unsubscribe",
+})
+
+class _PendingCall:
+    __slots__ = ("method", "params", "response", "error", "done")
+
+    def __init__(self, method, params):
+        self.method = method
+        self.params = params
+        self.response = None
+        self.error = None
+        self.done = threading.Event()
+
+class BatchingHTTPProvider(Web3.HTTPProvider):
+    """
+    HTTPProvider yang menggabungkan panggilan JSON-RPC independen dari
+    banyak thread (sesi Streamlit, pool verifikasi, indexer) menjadi satu
+    request batch, lalu membagikan respons ke masing-masing pemanggil.
+
+    Paling banyak `max_inflight` request HTTP berjalan bersamaan; panggilan
+    yang datang selama itu antre dan dikirim sekaligus oleh thread yang
+    request-nya selesai (natural batching, tanpa delay untuk pemanggil
+    tunggal). `window` > 0 menambah jeda agar lebih banyak panggilan ikut.
+    Untuk batch eksplisit dari satu thread, lihat `rpc_batch`.
+    """
+
+    def __init__(self, *args, window=RPC_BATCH_WINDOW, max_inflight=RPC_BATCH_INFLIGHT,
+                 max_batch=RPC_BATCH_MAX, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.window = window
+        self.max_inflight = max_inflight
+        self.max_batch = max_batch
+        self._queue = []
+        self._inflight = 0
+        self._queue_lock = threading.Lock()
+
+    def make_request(self, method, params):
+        if method in UNBATCHED_METHODS:
+            metrics.inc("rpc_http_requests_total", kind="single")
+            return super().make_request(method, params)
+
+        call = _PendingCall(method, params)
+        with self._queue_lock:
+            self._queue.append(call)
+            leader = self._inflight < self.max_inflight
+            if leader:
+                self._inflight += 1
+        if leader:
+            if self.window:
+                time.sleep(self.window)
+            self._pump()
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.response
+
+    def make_batch_request(self, batch_requests):
+        metrics.inc("rpc_http_requests_total", kind="batch")
+        metrics.inc("rpc_batched_calls_total", len(batch_requests))
+        return super().make_batch_request(batch_requests)
+
+    def _pump(self):
+        """Kirim antrean sampai kosong, lalu lepas slot in-flight."""
+        while True:
+            with self._queue_lock:
+                if not self._queue:
+                    self._inflight -= 1
+                    return
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+            self._send(batch)
+
+    def _send(self, batch):
+        try:
+            if len(batch) == 1:
+                metrics.inc("rpc_http_requests_total", kind="single")
+                responses = [super().make_request(batch[0].method, batch[0].params)]
+            else:
+                responses = self.make_batch_request([(c.method, c.params) for c in batch])
+                if not isinstance(responses, list):
+                    # Error di level batch: satu objek error untuk semua panggilan
+                    responses = [responses] * len(batch)
+            for call, response in zip(batch, responses):
+                call.response = response
+        except Exception as e:
+            for call in batch:
+                call.error = e
+        finally:
+            for call in batch:
+                call.done.set()
+
+def _build_provider(rpc_url):
+    """
+    BatchingHTTPProvider dengan satu requests.Session (keep-alive + connection
+    pool). Modul ini hanya di-import sekali per proses server Streamlit, jadi
+    provider, pool & antrean batch-nya dipakai bersama oleh semua rerun dan sesi.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=RPC_POOL_SIZE, pool_maxsize=RPC_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return BatchingHTTPProvider(rpc_url, session=session, request_kwargs={"timeout": 30})
+
+w3 = Web3(_build_provider(RPC_URL))
+w3.middleware_onion.add(RPCMetricsMiddleware, name="rpc_metrics")
+
+def rpc_batch(*calls):
+    """
+    Jalankan beberapa panggilan w3 yang saling independen dalam SATU request
+    JSON-RPC batch, mis.
+
+        tx, receipt = utils.rpc_batch(
+            lambda: utils.w3.eth.get_transaction(h),
+            lambda: utils.w3.eth.get_transaction_receipt(h),
+        )
+
+    Setiap `call` adalah fungsi tanpa argumen; hasil dikembalikan sesuai
+    urutan. Lebih dari RPC_BATCH_MAX panggilan dipecah ke beberapa batch.
+    """
+    if len(calls) <= 1:
+        return [call() for call in calls]
+    results = []
+    for i in range(0, len(calls), RPC_BATCH_MAX):
+        with w3.batch_requests() as batch:
+            for call in calls[i:i + RPC_BATCH_MAX]:
+                batch.add(call())
+            results.extend(batch.execute())
+    return results
 
 # (Alamat ini biasanya SAMA TERUS selama pakai Anvil & Key yang sama)
 REGISTRY_CONTRACT_ADDRESS = "0x700b6A60ce7EaaEA56F065753d8dcB9653dbAD35"
@@ -13,49 +335,719 @@ REGISTRY_CONTRACT_ADDRESS = "0x700b6A60ce7EaaEA56F065753d8dcB9653dbAD35"
 # Path ke file JSON hasil compile Foundry
 ARTIFACT_PATH = './out/SimpleDIDRegistry.sol/SimpleDIDRegistry.json'
 
+# Cache contract per proses: (mtime artifact, ukuran artifact, address) -> instance
+_contract_cache = {"key": None, "contract": None}
+_contract_lock = threading.Lock()
+
 def get_contract():
     """
     Langsung mengembalikan instance contract yang sudah dideploy.
     Tidak perlu input address lagi karena sudah di-hardcode di atas.
+
+    ABI hanya di-parse ulang jika file artifact berubah (forge build ulang)
+    atau REGISTRY_CONTRACT_ADDRESS diganti; selain itu instance yang sama
+    dipakai ulang di setiap rerun.
     """
     if not os.path.exists(ARTIFACT_PATH):
         print("❌ Error: File artifact tidak ditemukan. Jalankan 'forge build'!")
         return None
 
-    with open(ARTIFACT_PATH) as f:
-        artifact = json.load(f)
-        abi = artifact['abi']
-    
-    return w3.eth.contract(address=REGISTRY_CONTRACT_ADDRESS, abi=abi)
+    stat = os.stat(ARTIFACT_PATH)
+    key = (stat.st_mtime_ns, stat.st_size, REGISTRY_CONTRACT_ADDRESS)
+    with _contract_lock:
+        if _contract_cache["key"] != key:
+            with open(ARTIFACT_PATH) as f:
+                artifact = json.load(f)
+                abi = artifact['abi']
+            factory = w3.eth.contract(abi=abi)
+            _contract_cache["contract"] = factory(address=REGISTRY_CONTRACT_ADDRESS)
+            _contract_cache["key"] = key
+        return _contract_cache["contract"]
+
+# --- CEK STATUS MASSAL (Satu eth_call untuk seluruh VP) ---
+def batch_keys(issuer_addrs, vc_hashes):
+    """Buang duplikat (satu kampus biasanya menerbitkan banyak dokumen di VP)."""
+    return list(dict.fromkeys(issuer_addrs)), list(dict.fromkeys(bytes(h) for h in vc_hashes))
+
+def batch_results(issuer_keys, hash_keys, issuers, creds):
+    """Petakan hasil `resolveBatch` kembali ke alamat / hash masing-masing."""
+    issuer_status = {addr: tuple(res) for addr, res in zip(issuer_keys, issuers)}
+    credential_status = {h: tuple(res) for h, res in zip(hash_keys, creds)}
+    return issuer_status, credential_status
+
+def resolve_batch(contract, issuer_addrs, vc_hashes, block_identifier=None):
+    """
+    Resolve status banyak issuer & hash VC sekaligus lewat `resolveBatch`.
+    Semua hasil dibaca dari satu nomor blok yang sama, jadi konsisten
+    walaupun ada transaksi baru di tengah proses verifikasi.
+
+    Return: (issuer_status, credential_status, block_number)
+      issuer_status     -> {address: (is_active, is_verified, org_name)}
+      credential_status -> {vc_hash: (exists, is_revoked, is_validated, issuer)}
+    """
+    issuer_keys, hash_keys = batch_keys(issuer_addrs, vc_hashes)
+
+    if block_identifier is None:
+        block_identifier = w3.eth.block_number
+
+    issuers, creds = contract.functions.resolveBatch(issuer_keys, hash_keys).call(
+        block_identifier=block_identifier
+    )
+    return batch_results(issuer_keys, hash_keys, issuers, creds) + (block_identifier,)
+
+# --- EVENT LOG REGISTRY ---
+def event_topic_map(contract, names=None):
+    """{topic0: ContractEvent} untuk event registry (semua, atau hanya `names`)."""
+    return {
+        event_abi_to_log_topic(abi): getattr(contract.events, abi["name"])
+        for abi in contract.abi
+        if abi.get("type") == "event" and (names is None or abi["name"] in names)
+    }
+
+def decode_log(topic_map, log):
+    """Decode satu log mentah. Return (nama_event, args) atau None jika bukan event registry."""
+    if not log["topics"]:
+        return None
+    event = topic_map.get(bytes(log["topics"][0]))
+    if event is None:
+        return None
+    decoded = event().process_log(log)
+    return decoded["event"], decoded["args"]
+
+# --- CACHE STATUS ISSUER & KREDENSIAL (Event-Driven) ---
+class StatusCache:
+    """
+    Cache in-memory untuk hasil `resolveDID` dan `verifyCredentialStatus`.
+
+    Isi cache selalu merepresentasikan state pada blok `cursor`. Setiap
+    `poll_interval` detik cache membaca event registry sejak `cursor` lalu
+    memperbarui / membuang entry yang terdampak, sehingga pencabutan ijazah
+    tetap terlihat paling lambat satu interval polling.
+    """
+
+    # Event yang mengubah hasil resolveDID / verifyCredentialStatus
+    WATCHED_EVENTS = (
+        "DIDRegistered", "IssuerVerified",
+        "CredentialAnchored", "CredentialValidated", "CredentialRevoked",
+    )
+
+    def __init__(self, contract, maxsize=4096, poll_interval=5.0, max_log_range=2000):
+        self.contract = contract
+        self.maxsize = maxsize
+        self.poll_interval = poll_interval
+        self.max_log_range = max_log_range
+
+        self.issuers = OrderedDict()      # address -> (is_active, is_verified, org_name)
+        self.credentials = OrderedDict()  # vc_hash (bytes) -> (exists, is_revoked, is_validated, issuer)
+        self.cursor = None                # blok terakhir yang sudah diproses
+        self.hits = 0
+        self.misses = 0
+
+        self._last_sync = 0.0
+        self._force_sync = False          # di-set invalidate(): baca berikutnya sync ke blok terbaru
+        self._epoch = 0                   # naik setiap cursor maju / invalidate
+        self._lock = threading.RLock()
+        self._events = event_topic_map(contract, self.WATCHED_EVENTS)
+
+    # --- Sinkronisasi dengan event log ---
+    def sync(self, force=False):
+        """
+        Proses event baru sejak cursor. Dipanggil otomatis sebelum setiap baca.
+        RPC (block_number & get_logs) berjalan di luar lock agar pembaca lain
+        tidak ikut menunggu node yang lambat; log hanya diterapkan jika cache
+        tidak berubah selama RPC berlangsung (epoch masih sama).
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not (force or self._force_sync) and self.cursor is not None \
+                    and now - self._last_sync < self.poll_interval:
+                return self.cursor
+            cursor, epoch = self.cursor, self._epoch
+
+        latest = w3.eth.block_number
+        if cursor is None:
+            # Cache masih kosong: tidak ada yang perlu di-invalidate
+            with self._lock:
+                if self.cursor is None:
+                    self.cursor = latest
+                    self._epoch += 1
+                cursor, epoch = self.cursor, self._epoch
+        while cursor < latest:
+            to_block = min(latest, cursor + self.max_log_range)
+            logs = w3.eth.get_logs({
+                "address": self.contract.address,
+                "fromBlock": cursor + 1,
+                "toBlock": to_block,
+                "topics": [list(self._events)],
+            })
+            with self._lock:
+                if self._epoch != epoch:
+                    # Thread lain sudah memajukan cursor / ada invalidate: log ini dibuang
+                    return self.cursor
+                for log in logs:
+                    self._apply(log)
+                self.cursor = cursor = to_block
+                self._epoch += 1
+                epoch = self._epoch
+
+        with self._lock:
+            if self._epoch == epoch:
+                self._last_sync = now
+                self._force_sync = False
+            return self.cursor
+
+    def _apply(self, log):
+        decoded = decode_log(self._events, log)
+        if decoded is None:
+            return
+        name, args = decoded
+
+        if name == "DIDRegistered":
+            # registerDID menimpa dokumen & mereset centang biru
+            self.issuers.pop(args["owner"], None)
+        elif name == "IssuerVerified":
+            if args["issuer"] in self.issuers:
+                is_active, _, org_name = self.issuers[args["issuer"]]
+                self.issuers[args["issuer"]] = (is_active, True, org_name)
+        elif name == "CredentialAnchored":
+            if bytes(args["vcHash"]) in self.credentials:
+                self.credentials[bytes(args["vcHash"])] = (True, False, False, args["issuer"])
+        elif name == "CredentialValidated":
+            self._update_credential(args["vcHash"], is_validated=True)
+        elif name == "CredentialRevoked":
+            self._update_credential(args["vcHash"], is_revoked=True)
 
-# --- FUNGSI KRIPTOGRAFI OFF-CHAIN (Tetap Sama) ---
+    def _update_credential(self, vc_hash, is_revoked=None, is_validated=None):
+        key = bytes(vc_hash)
+        if key not in self.credentials:
+            return
+        exists, revoked, validated, issuer = self.credentials[key]
+        self.credentials[key] = (
+            exists,
+            revoked if is_revoked is None else is_revoked,
+            validated if is_validated is None else is_validated,
+            issuer,
+        )
+
+    def invalidate(self, issuer=None, vc_hash=None):
+        """
+        Buang entry secara manual, mis. setelah aplikasi mengirim transaksi
+        sendiri. Baca berikutnya memaksa sync ke blok terbaru dulu, jadi
+        entry tidak diisi ulang dari state di cursor lama (sebelum transaksi).
+        """
+        with self._lock:
+            if issuer is not None:
+                self.issuers.pop(issuer, None)
+            if vc_hash is not None:
+                self.credentials.pop(bytes(vc_hash), None)
+            self._force_sync = True
+            self._epoch += 1
+
+    # --- LRU ---
+    def _remember(self, store, key, value):
+        store[key] = value
+        store.move_to_end(key)
+        while len(store) > self.maxsize:
+            store.popitem(last=False)
+
+    # --- API Baca (bentuk hasil sama dengan contract call / resolve_batch) ---
+    def resolve_batch(self, issuer_addrs, vc_hashes):
+        """
+        Pengganti `resolve_batch` yang hanya menanyakan node untuk entry yang
+        belum ada di cache. Lock dilepas selama eth_call agar sesi / thread
+        lain tetap bisa membaca cache.
+        """
+        self.sync()
+        with self._lock:
+            # Cursor dibaca ulang di bawah lock: bisa sudah dimajukan thread lain sejak sync
+            block_number = self.cursor
+            epoch = self._epoch
+
+            issuer_status, credential_status = {}, {}
+            missing_issuers, missing_hashes = [], []
+            for addr in issuer_addrs:
+                if addr in self.issuers:
+                    self.issuers.move_to_end(addr)
+                    issuer_status[addr] = self.issuers[addr]
+                else:
+                    missing_issuers.append(addr)
+            for vc_hash in vc_hashes:
+                key = bytes(vc_hash)
+                if key in self.credentials:
+                    self.credentials.move_to_end(key)
+                    credential_status[key] = self.credentials[key]
+                else:
+                    missing_hashes.append(key)
+            self.hits += len(issuer_status) + len(credential_status)
+
+        if missing_issuers or missing_hashes:
+            # Baca di blok cursor agar konsisten dengan isi cache
+            fresh_issuers, fresh_creds, _ = resolve_batch(
+                self.contract, missing_issuers, missing_hashes, block_identifier=block_number
+            )
+            with self._lock:
+                self.misses += len(fresh_issuers) + len(fresh_creds)
+                # Cursor maju / ada invalidate selama eth_call: hasil blok lama tidak disimpan
+                if self._epoch == epoch:
+                    for addr, status in fresh_issuers.items():
+                        self._remember(self.issuers, addr, status)
+                    for key, status in fresh_creds.items():
+                        self._remember(self.credentials, key, status)
+            issuer_status.update(fresh_issuers)
+            credential_status.update(fresh_creds)
+
+        return issuer_status, credential_status, block_number
+
+    def resolve_did(self, issuer_addr):
+        issuer_status, _, _ = self.resolve_batch([issuer_addr], [])
+        return issuer_status[issuer_addr]
+
+    def credential_status(self, vc_hash):
+        _, credential_status, _ = self.resolve_batch([], [vc_hash])
+        return credential_status[bytes(vc_hash)]
+
+_status_cache = None
+_status_cache_lock = threading.Lock()
+
+def get_status_cache(contract):
+    """
+    Satu StatusCache per proses server (modul ini tidak ikut di-reload saat
+    Streamlit rerun), dipakai bersama oleh semua sesi.
+    """
+    global _status_cache
+    with _status_cache_lock:
+        if _status_cache is None or _status_cache.contract is not contract:
+            _status_cache = StatusCache(contract)
+        return _status_cache
+
+# --- BENTUK KANONIK (Satu kali serialisasi untuk hash, sign & verify) ---
+# Encoder dibuat sekali: output identik byte-per-byte dengan
+# json.dumps(data, sort_keys=True) sehingga anchor lama tetap cocok.
+# (orjson/ujson tidak dipakai karena separator & escaping-nya berbeda.)
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, check_circular=False)
+
+class CanonicalJSON:
+    """
+    Hasil serialisasi kanonik sebuah credential/presentation.
+    Buffer `payload` dibuat sekali; digest Keccak dan pesan EIP-191
+    diturunkan dari buffer yang sama dan di-memo pada objek ini.
+    """
+    __slots__ = ("data", "payload", "_digest", "_message")
+
+    def __init__(self, data_dict):
+        self.data = data_dict
+        with metrics.span("canonicalize"):
+            self.payload = _CANONICAL_ENCODER.encode(data_dict).encode('utf-8')
+        self._digest = None
+        self._message = None
+
+    @classmethod
+    def compose(cls, data_dict, parts):
+        """
+        Bentuk kanonik dict yang nilai-nilainya sudah kanonik (`parts`:
+        {key: CanonicalJSON} untuk SETIAP key), disambung tanpa serialisasi
+        ulang. Payload identik dengan CanonicalJSON(data_dict), mis. wrapper
+        {credential, proof} dari isi VC yang sudah diserialisasi.
+        """
+        self = cls.__new__(cls)
+        self.data = data_dict
+        self.payload = b"{" + b", ".join(
+            _CANONICAL_ENCODER.encode(key).encode('utf-8') + b": " + parts[key].payload
+            for key in sorted(data_dict)
+        ) + b"}"
+        self._digest = None
+        self._message = None
+        return self
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            with metrics.span("hash"):
+                self._digest = Web3.keccak(self.payload)
+        return self._digest
+
+    @property
+    def message(self):
+        if self._message is None:
+            self._message = encode_defunct(primitive=self.payload)
+        return self._message
+
+def canonicalize(data):
+    """
+    Terima dict atau CanonicalJSON. Objek CanonicalJSON dipakai ulang apa
+    adanya (payload & digest-nya tetap); dict selalu diserialisasi ulang
+    karena isinya bisa saja berubah sejak terakhir di-hash / ditandatangani.
+    Pemanggil yang meng-hash & menandatangani data yang sama cukup membuat
+    satu CanonicalJSON lalu meneruskannya.
+    """
+    if isinstance(data, CanonicalJSON):
+        return data
+    return CanonicalJSON(data)
+
+# --- SIGNER (Private key di-load sekali) ---
+# sign_message(message, private_key=hex) mem-parse ulang key setiap panggilan.
+# Signer menyimpan objek key yang sudah di-parse dan men-sign hash EIP-191
+# langsung; output identik byte-per-byte dengan Account.sign_message.
+PARALLEL_SIGN_MIN = 64     # minimal payload sebelum signing disebar ke process pool
+SIGN_CHUNK = 32            # payload per task worker (mengurangi overhead IPC)
+
+_worker_key = None
+
+def _init_sign_worker(key_bytes):
+    global _worker_key
+    _worker_key = keys.PrivateKey(key_bytes)
+
+def _sign_payload(key, payload):
+    signature = key.sign_msg_hash(defunct_hash_message(primitive=payload))
+    return signature.to_bytes()[:64] + bytes([signature.v + 27])
+
+def _sign_chunk(payloads):
+    """Dijalankan di worker process (key sudah di-load oleh initializer)."""
+    return [_sign_payload(_worker_key, payload).hex() for payload in payloads]
+
+class Signer:
+    """
+    Signer issuer/holder dengan key yang di-load sekali.
+
+    `sign` / `sign_transaction` untuk satu item, `sign_many` /
+    `sign_transactions` untuk batch. `sign_many` menyebar payload ke
+    beberapa core (process pool, key di-load sekali per worker) jika
+    batch-nya besar. Throughput tersedia lewat `stats()`.
+    """
+
+    def __init__(self, private_key, workers=None):
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.did = f"did:ethr:{self.address}"
+        self.workers = workers or os.cpu_count() or 2
+        self._key = self.account._key_obj
+        self._pool = None
+        self._lock = threading.Lock()
+        self._signed = 0
+        self._seconds = 0.0
+
+    def _record(self, count, started, kind):
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._signed += count
+            self._seconds += elapsed
+        metrics.inc("signatures_total", count, kind=kind)
+
+    def stats(self):
+        """{"signatures", "seconds", "per_sec"} sejak Signer dibuat / reset_stats()."""
+        with self._lock:
+            per_sec = self._signed / self._seconds if self._seconds else 0.0
+            return {"signatures": self._signed, "seconds": round(self._seconds, 4), "per_sec": round(per_sec, 1)}
+
+    def reset_stats(self):
+        with self._lock:
+            self._signed, self._seconds = 0, 0.0
+
+    # --- Credential / Presentation (EIP-191) ---
+    def sign(self, data):
+        """Sama dengan sign_data(data, private_key): hex signature tanpa prefix 0x."""
+        payload = canonicalize(data).payload
+        started = time.perf_counter()
+        with metrics.span("sign"):
+            signature = _sign_payload(self._key, payload).hex()
+        self._record(1, started, "message")
+        return signature
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_sign_worker, initargs=(self._key.to_bytes(),),
+            )
+        return self._pool
+
+    def sign_many(self, items, parallel=None):
+        """
+        Sign banyak dict/CanonicalJSON. Return list signature (urutan sama).
+        `parallel=None` otomatis: process pool jika batch >= PARALLEL_SIGN_MIN.
+        """
+        return self._sign_payloads([canonicalize(item).payload for item in items], parallel)
+
+    def sign_messages(self, texts, parallel=None):
+        """
+        Sign teks apa adanya (EIP-191 atas UTF-8, sama dengan signer.signMessage
+        di ethers), tanpa kanonikalisasi. Return list signature hex tanpa 0x.
+        """
+        return self._sign_payloads([text.encode('utf-8') for text in texts], parallel)
+
+    def _sign_payloads(self, payloads, parallel):
+        if parallel is None:
+            parallel = len(payloads) >= PARALLEL_SIGN_MIN and self.workers > 1
+        started = time.perf_counter()
+        with metrics.span("sign_batch", mode="parallel" if parallel else "serial"):
+            if parallel:
+                chunks = [payloads[i:i + SIGN_CHUNK] for i in range(0, len(payloads), SIGN_CHUNK)]
+                signatures = [sig for chunk in self._get_pool().map(_sign_chunk, chunks) for sig in chunk]
+            else:
+                signatures = [_sign_payload(self._key, payload).hex() for payload in payloads]
+        self._record(len(payloads), started, "message")
+        return signatures
+
+    # --- Transaksi ---
+    def sign_transaction(self, tx):
+        started = time.perf_counter()
+        with metrics.span("sign_tx"):
+            signed = self.account.sign_transaction(tx)
+        self._record(1, started, "tx")
+        return signed
+
+    def sign_transactions(self, txs):
+        """Sign banyak transaksi (nonce sudah terisi). Return list SignedTransaction."""
+        return [self.sign_transaction(tx) for tx in txs]
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+_signers = {}
+_signers_lock = threading.Lock()
+
+def get_signer(private_key):
+    """Satu Signer per private key per proses (bertahan antar rerun Streamlit)."""
+    with _signers_lock:
+        signer = _signers.get(private_key)
+        if signer is None:
+            signer = _signers[private_key] = Signer(private_key)
+        return signer
+
+# --- KIRIM TRANSAKSI (Nonce lokal + retry) ---
+# Klasifikasi error eth_sendRawTransaction (pesan node: geth / anvil / hardhat)
+SEND_BACKOFF = 0.5          # detik, dua kali lipat setiap percobaan
+_KNOWN_TX_ERRORS = ("already known", "known transaction", "already imported")
+_NONCE_ERRORS = ("nonce too low", "nonce too high", "invalid nonce", "replacement transaction underpriced")
+_FATAL_TX_ERRORS = (
+    "revert", "insufficient funds", "intrinsic gas", "gas too low", "exceeds block gas limit",
+    "invalid sender", "invalid chain id",
+)
+
+def send_error_kind(error):
+    """'known' (tx sudah di mempool), 'nonce', 'fatal' (pasti ditolak lagi) atau 'transient'."""
+    text = str(error).lower()
+    if any(s in text for s in _KNOWN_TX_ERRORS):
+        return "known"
+    if any(s in text for s in _NONCE_ERRORS):
+        return "nonce"
+    if any(s in text for s in _FATAL_TX_ERRORS):
+        return "fatal"
+    return "transient"
+
+class TxSender:
+    """
+    Pengirim transaksi beruntun dari satu akun dengan nonce lokal.
+
+    Nonce hanya maju jika node menerima transaksinya. Error sementara
+    (timeout, koneksi) dicoba ulang dengan backoff; sebelum nonce dipakai
+    lagi, dicek dulu apakah transaksi sebenarnya sudah diterima (hash
+    dihitung lokal), lalu nonce disinkronkan ulang dari
+    `get_transaction_count(alamat, 'pending')`. Error pasti (revert, saldo
+    kurang, dll.) tidak diulang.
+    """
+
+    def __init__(self, signer, nonce=None, max_retries=3, backoff=SEND_BACKOFF):
+        self.signer = signer
+        self.nonce = nonce
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def resync(self):
+        self.nonce = w3.eth.get_transaction_count(self.signer.address, 'pending')
+        return self.nonce
+
+    def _landed(self, tx_hash):
+        try:
+            w3.eth.get_transaction(tx_hash)
+            return True
+        except Exception:
+            return False
+
+    def send(self, build_tx):
+        """
+        `build_tx(nonce)` -> dict transaksi (dipanggil ulang jika nonce
+        berubah). Return (tx_hash, None) atau (None, error_terakhir).
+        """
+        last_error = None
+        for attempt in range(self.max_retries):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                if self.nonce is None:
+                    self.resync()
+            except Exception as e:
+                last_error = e
+                continue
+
+            signed_tx = self.signer.sign_transaction(build_tx(self.nonce))
+            try:
+                tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+            except Exception as e:
+                last_error = e
+                kind = send_error_kind(e)
+                if kind == "known" or (kind != "fatal" and self._landed(signed_tx.hash)):
+                    # Diterima node walau panggilannya gagal: nonce sudah terpakai
+                    tx_hash = signed_tx.hash
+                else:
+                    self.nonce = None   # sinkron ulang dari node sebelum nonce dipakai lagi
+                    metrics.inc("tx_send_errors_total", kind=kind)
+                    if kind == "fatal":
+                        break
+                    continue
+            self.nonce += 1
+            return tx_hash, None
+        return None, last_error
+
+# --- FUNGSI KRIPTOGRAFI OFF-CHAIN ---
+# Semua menerima dict biasa atau CanonicalJSON (hasil utils.canonicalize)
 def sign_data(data_dict, private_key):
-    json_str = json.dumps(data_dict, sort_keys=True)
-    message = encode_defunct(text=json_str)
-    signed_message = w3.eth.account.sign_message(message, private_key=private_key)
-    return signed_message.signature.hex()
+    return get_signer(private_key).sign(data_dict)
+
+def sign_transaction(tx, private_key):
+    """Sign transaksi (dipisah dari pengiriman agar waktunya terukur sendiri)."""
+    return get_signer(private_key).sign_transaction(tx)
+
+# --- RECOVERY SIGNER: CACHE + PARALEL ---
+# eth_keys otomatis memakai backend native (coincurve/libsecp256k1) jika
+# terpasang; tanpa itu recovery murni Python (~10ms) sehingga layak
+# disebar ke beberapa proses untuk presentasi besar.
+NATIVE_SECP256K1 = importlib.util.find_spec("coincurve") is not None
+RECOVERY_CACHE_SIZE = 65536
+PARALLEL_RECOVERY_MIN = 8   # minimal signature belum-ter-cache sebelum pakai process pool
+
+_recovery_cache = OrderedDict()   # (digest kanonik, signature) -> address
+_recovery_lock = threading.Lock()
+_recovery_pool = None
+_recovery_pool_lock = threading.Lock()
+
+def _signature_bytes(signature):
+    return Web3.to_bytes(hexstr=signature) if isinstance(signature, str) else bytes(signature)
+
+def _recover_payload(payload, signature):
+    """Dijalankan di worker process: sama persis dengan recover_message di verify_signature."""
+    return Account.recover_message(encode_defunct(primitive=payload), signature=signature)
+
+def _get_recovery_pool():
+    global _recovery_pool
+    # Lock: sesi Streamlit / thread streaming yang bersamaan tidak membuat pool ganda
+    with _recovery_pool_lock:
+        if _recovery_pool is None:
+            # spawn: aman dipakai dari proses multi-thread (Streamlit / aiohttp)
+            _recovery_pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 2, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _recovery_pool
+
+def _reset_recovery_pool():
+    global _recovery_pool
+    with _recovery_pool_lock:
+        if _recovery_pool is not None:
+            _recovery_pool.shutdown(wait=False, cancel_futures=True)
+            _recovery_pool = None
+
+def _cached_signer(key):
+    with _recovery_lock:
+        signer = _recovery_cache.get(key)
+        if signer is not None:
+            _recovery_cache.move_to_end(key)
+    if signer is not None:
+        metrics.inc("recover_cache_hits_total")
+    return signer
+
+def _remember_signer(key, signer):
+    with _recovery_lock:
+        _recovery_cache[key] = signer
+        while len(_recovery_cache) > RECOVERY_CACHE_SIZE:
+            _recovery_cache.popitem(last=False)
 
 def verify_signature(data_dict, signature):
-    json_str = json.dumps(data_dict, sort_keys=True)
-    message = encode_defunct(text=json_str)
-    return w3.eth.account.recover_message(message, signature=signature)
+    canonical = canonicalize(data_dict)
+    key = (bytes(canonical.digest), _signature_bytes(signature))
+    signer = _cached_signer(key)
+    if signer is None:
+        with metrics.span("recover"):
+            signer = w3.eth.account.recover_message(canonical.message, signature=signature)
+        _remember_signer(key, signer)
+    return signer
+
+def recover_message(text, signature):
+    """Recover signer teks biasa (pasangan Signer.sign_messages), memakai cache yang sama."""
+    payload = text.encode('utf-8')
+    key = (bytes(Web3.keccak(payload)), _signature_bytes(signature))
+    signer = _cached_signer(key)
+    if signer is None:
+        with metrics.span("recover"):
+            signer = _recover_payload(payload, signature)
+        _remember_signer(key, signer)
+    return signer
+
+def recover_many(pairs):
+    """
+    Recover banyak signer sekaligus. `pairs` = [(data/CanonicalJSON, signature), ...].
+    Return list address (None untuk signature yang tidak bisa di-recover),
+    urutan sama dengan input. Signature yang belum ter-cache disebar ke
+    process pool jika jumlahnya banyak dan backend native tidak tersedia.
+    """
+    results = [None] * len(pairs)
+    pending = []  # (index, key, payload, signature)
+    for i, (data, signature) in enumerate(pairs):
+        try:
+            canonical = canonicalize(data)
+            key = (bytes(canonical.digest), _signature_bytes(signature))
+        except Exception:
+            continue
+        signer = _cached_signer(key)
+        if signer is not None:
+            results[i] = signer
+        else:
+            pending.append((i, key, canonical.payload, signature))
+
+    futures = [None] * len(pending)
+    if len(pending) >= PARALLEL_RECOVERY_MIN and not NATIVE_SECP256K1:
+        try:
+            pool = _get_recovery_pool()
+            futures = [pool.submit(_recover_payload, payload, sig) for _, _, payload, sig in pending]
+        except Exception:
+            _reset_recovery_pool()
+
+    recovered = []
+    with metrics.span("recover_parallel" if any(futures) else "recover"):
+        for (_, _, payload, sig), future in zip(pending, futures):
+            try:
+                recovered.append(future.result() if future else _recover_payload(payload, sig))
+                continue
+            except Exception:
+                pass
+            # Worker gagal (pool rusak) atau signature tidak valid: ulangi lokal
+            try:
+                recovered.append(_recover_payload(payload, sig))
+            except Exception:
+                recovered.append(None)
+
+    for (i, key, _, _), signer in zip(pending, recovered):
+        results[i] = signer
+        if signer is not None:
+            _remember_signer(key, signer)
+    return results
 
 def hash_json(data_dict):
     """Menghitung Keccak256 Hash dari data JSON (Untuk Anchoring)"""
-    json_bytes = json.dumps(data_dict, sort_keys=True).encode('utf-8')
-    return Web3.keccak(json_bytes)
+    return canonicalize(data_dict).digest
 
 # --- FUNGSI DB (Tetap Sama untuk Simpan Wallet Mahasiswa) ---
 def load_db(filename):
     path = f"data/{filename}"
     if not os.path.exists(path):
         return {}
-    with open(path, 'r') as f:
+    with metrics.span("wallet_io", op="load"), open(path, 'r') as f:
         return json.load(f)
 
 def save_db(filename, data):
     if not os.path.exists("data"):
         os.makedirs("data")
     path = f"data/{filename}"
-    with open(path, 'w') as f:
+    with metrics.span("wallet_io", op="save"), open(path, 'w') as f:
         json.dump(data, f, indent=4)
\ No newline at end of file
@@ -0,0 +1,302 @@
+import threading
+from collections import OrderedDict
+
+import merkle
+import presentation
+import utils
+
+# --- ENGINE VERIFIKASI (Dipakai bersama verifier_app & verifier_api) ---
+# Alur: parse VP/VC -> recover signer & hitung hash (off-chain)
+#       -> resolve issuer & status hash (on-chain, satu batch)
+#       -> verdict per dokumen.
+# Tahap on-chain sengaja dipisah agar bisa dijalankan sync (StatusCache)
+# maupun async (verifier_api) dengan logika verdict yang sama persis.
+
+class TokenFormatError(ValueError):
+    """Token bukan format VC ({credential, proof}) maupun VP ({presentation, proof})."""
+
+def _holder_valid(envelope, proof, holder):
+    try:
+        return f"did:ethr:{utils.verify_signature(envelope, proof['jws'])}" == holder
+    except Exception:
+        return False
+
+def parse_token(token_data, bundle=None, audience=None, nonce=None):
+    """
+    Return dict {type, holder, credentials, digests, holder_valid} dari token
+    yang sudah di-json.loads. Untuk VP ringkas (presentation.COMPACT_TYPE),
+    `credentials` diambil dari `bundle` (atau token["bundle"]) per digest;
+    VC yang tidak ada di bundle bernilai None (ditolak prepare_documents).
+    Signature holder hanya dicek untuk VP ringkas.
+
+    VP ringkas wajib diverifikasi dengan `audience` & `nonce` yang diharapkan
+    verifier (tantangan yang diberikan ke holder); amplop yang nilainya beda
+    -> info["challenge_valid"] False, sehingga token curian tidak bisa diputar ulang.
+    """
+    if not isinstance(token_data, dict):
+        raise TokenFormatError("Format JSON tidak dikenali. Harus format VC atau VP.")
+    if "presentation" in token_data:
+        vp = token_data['presentation']
+        if "credentialDigests" in vp:
+            if audience is None or nonce is None:
+                raise TokenFormatError("VP ringkas hanya bisa diverifikasi dengan audience & nonce yang diharapkan verifier.")
+            if bundle is None:
+                bundle = token_data.get("bundle") or {}
+            return {
+                "type": "presentation",
+                "holder": vp['holder'],
+                "credentials": [bundle.get(d) for d in vp['credentialDigests']],
+                "digests": vp['credentialDigests'],
+                "holder_valid": _holder_valid(vp, token_data.get('proof') or {}, vp['holder']),
+                "challenge_valid": vp.get("audience") == audience and vp.get("nonce") == nonce,
+                "nonce": vp.get("nonce"),
+                "audience": vp.get("audience"),
+            }
+        return {
+            "type": "presentation",
+            "holder": vp['holder'],
+            "credentials": vp['verifiableCredential'],
+        }
+    if "credential" in token_data:
+        # Fallback jika user copas VC langsung dari Issuer
+        return {"type": "credential", "holder": None, "credentials": [token_data]}
+    raise TokenFormatError("Format JSON tidak dikenali. Harus format VC atau VP.")
+
+def split_credential(vc_wrapper):
+    """Pisahkan isi VC dan proof-nya. Return (vc_content, vc_proof)."""
+    if "credential" in vc_wrapper:
+        return vc_wrapper['credential'], vc_wrapper['proof']
+    # Jika format raw W3C
+    vc_content = vc_wrapper.copy()
+    if "proof" in vc_content:
+        del vc_content["proof"] # Proof harus dipisah saat verify signature
+    return vc_content, vc_wrapper["proof"]
+
+_RECOVER = object()
+
+# Dokumen hasil prepare per digest bundle (VP ringkas): digest mencakup isi +
+# proof, jadi hasil off-chain-nya tetap; status on-chain tetap dicek ulang.
+# Cache hanya melewati recover signature: VC-nya tetap harus ada di bundle
+# dan cocok dengan digest (holder harus benar-benar memegang dokumennya).
+DOCUMENT_CACHE_SIZE = 4096
+_document_cache = OrderedDict()
+_document_lock = threading.Lock()
+
+def prepare_document(vc_wrapper, signer=_RECOVER, digest=None, canonical=None):
+    """
+    Tahap off-chain untuk satu VC: hash anchor & bukti Merkle. Signer
+    di-recover di sini kecuali sudah diberikan (lihat prepare_token).
+    `canonical` = CanonicalJSON isi VC dari tahap recover (dipakai ulang).
+    `digest` (VC dari bundle) dicocokkan dengan isi VC -> doc["digest_ok"].
+    """
+    vc_content, vc_proof = split_credential(vc_wrapper)
+
+    # Serialisasi sekali, dipakai untuk recover signature, hash anchor & digest bundle
+    if canonical is None:
+        canonical = utils.canonicalize(vc_content)
+    vc_hash = canonical.digest
+    if signer is _RECOVER:
+        signer = utils.recover_many([(canonical, vc_proof['jws'])])[0]  # None = signature rusak
+
+    # Ijazah hasil batch Merkle: cek jalur inklusi secara lokal
+    anchor = merkle.parse_anchor(vc_proof)
+    return {
+        "content": vc_content,
+        "signer": signer,
+        "hash": vc_hash,
+        "root": anchor[0] if anchor else None,
+        "revocation_key": merkle.revocation_key(anchor[0], vc_hash) if anchor else None,
+        "merkle_ok": merkle.verify_proof(vc_hash, anchor[1], anchor[0]) if anchor else None,
+        "digest_ok": presentation.credential_digest(vc_wrapper, canonical) == digest if digest else None,
+    }
+
+def _recover_documents(vc_wrappers, digests, canonicals=None):
+    """Serialisasi isi VC sekali, recover semua signer sekaligus, lalu prepare_document."""
+    parts = [split_credential(vc) for vc in vc_wrappers]
+    if canonicals is None:
+        canonicals = [utils.canonicalize(content) for content, _ in parts]
+    signers = utils.recover_many([(canonical, proof['jws']) for canonical, (_, proof) in zip(canonicals, parts)])
+    return [
+        prepare_document(vc, signer, digest, canonical)
+        for vc, signer, digest, canonical in zip(vc_wrappers, signers, digests, canonicals)
+    ]
+
+def prepare_documents(vc_wrappers, digests=None, canonicals=None):
+    """
+    prepare_document untuk banyak VC; semua signer di-recover sekaligus
+    (cache + paralel). `canonicals` (opsional) = CanonicalJSON isi tiap VC
+    yang sudah dibuat pemanggil (mis. bulk_verify saat dedupe). Dengan
+    `digests` (VP ringkas; None untuk VC tanpa digest), setiap VC tetap
+    harus ada di bundle; jika digest-nya cocok dan sudah pernah lolos dicek,
+    dokumen diambil dari cache tanpa recover ulang.
+    """
+    if digests is None:
+        return _recover_documents(vc_wrappers, [None] * len(vc_wrappers), canonicals)
+
+    missing = [d for d, vc in zip(digests, vc_wrappers) if vc is None]
+    if missing:
+        raise TokenFormatError(f"Bundle tidak lengkap: VC untuk digest {', '.join(missing)} tidak ada.")
+
+    documents = [None] * len(digests)
+    pending = []
+    with _document_lock:
+        cached = [_document_cache.get(digest) if digest is not None else None for digest in digests]
+    for i, (vc, digest) in enumerate(zip(vc_wrappers, digests)):
+        canonical = canonicals[i] if canonicals is not None else None
+        if cached[i] is not None and presentation.credential_digest(vc, canonical) == digest:
+            documents[i] = cached[i]
+        else:
+            pending.append(i)
+    if len(digests) > len(pending):
+        utils.metrics.inc("document_cache_hits_total", len(digests) - len(pending))
+
+    prepared = _recover_documents(
+        [vc_wrappers[i] for i in pending], [digests[i] for i in pending],
+        [canonicals[i] for i in pending] if canonicals is not None else None,
+    )
+    for i, document in zip(pending, prepared):
+        documents[i] = document
+
+    with _document_lock:
+        for i in pending:
+            if documents[i]["digest_ok"]:
+                _document_cache[digests[i]] = documents[i]
+        for i, digest in enumerate(digests):
+            if documents[i] is cached[i] and digest in _document_cache:
+                _document_cache.move_to_end(digest)
+        while len(_document_cache) > DOCUMENT_CACHE_SIZE:
+            _document_cache.popitem(last=False)
+    return documents
+
+def prepare_token(token_data, bundle=None, audience=None, nonce=None):
+    """Return (info, documents) untuk seluruh VC di dalam token."""
+    info = parse_token(token_data, bundle, audience, nonce)
+    return info, prepare_documents(info["credentials"], info.get("digests"))
+
+def bound_holder(info):
+    """
+    DID yang wajib sama dengan credentialSubject.id setiap VC: holder VP
+    ringkas (amplopnya ditandatangani holder). None = tidak dicek.
+    """
+    return info["holder"] if info.get("digests") is not None else None
+
+def status_keys(documents):
+    """
+    Alamat issuer & hash yang perlu di-resolve on-chain: hash VC (anchor
+    langsung), atau root + kunci pencabutan per root (batch Merkle).
+    """
+    issuers = [doc["signer"] for doc in documents if doc["signer"]]
+    hashes = []
+    for doc in documents:
+        hashes += [doc["root"], doc["revocation_key"]] if doc["root"] else [doc["hash"]]
+    return issuers, hashes
+
+def revocation_keys(documents):
+    """
+    Kunci pencabutan batch Merkle. Issuer-nya harus dicocokkan dengan issuer
+    root, jadi statusnya selalu dibaca on-chain, tidak dari index pencabutan
+    lokal (yang tidak menyimpan issuer).
+    """
+    return {doc["revocation_key"] for doc in documents if doc["root"]}
+
+def evaluate_document(index, doc, issuer_status, credential_status, holder=None):
+    """
+    Verdict terstruktur (JSON-serializable) untuk satu dokumen. Dengan
+    `holder` (lihat bound_holder), VC milik orang lain ditolak.
+    """
+    vc_content = doc["content"]
+    recovered_did = f"did:ethr:{doc['signer']}" if doc["signer"] else None
+    verdict = {
+        "index": index,
+        "degree": vc_content['credentialSubject']['data'].get('degree', 'Dokumen Tanpa Judul'),
+        "issuer_claim": vc_content['issuer'],
+        "recovered_did": recovered_did,
+        "signature_valid": recovered_did == vc_content['issuer'],
+        "vc_hash": "0x" + bytes(doc["hash"]).hex(),
+        "merkle_root": "0x" + doc["root"].hex() if doc["root"] else None,
+        "merkle_ok": doc["merkle_ok"],
+        "digest_ok": doc.get("digest_ok"),
+        "holder_bound": vc_content['credentialSubject'].get('id') == holder if holder else None,
+        "issuer": None,
+        "status": None,
+        "validated": None,
+    }
+
+    is_active, is_verified, org_name = issuer_status.get(doc["signer"], (False, False, ""))
+    verdict["issuer"] = {"active": is_active, "verified": is_verified, "name": org_name}
+    issuer_ok = bool(is_active and is_verified)
+
+    if issuer_ok:
+        # Status dokumen hanya relevan jika penerbitnya resmi
+        if doc["root"]:
+            # Batch Merkle: status anchor dari root; pencabutan per dokumen hanya sah
+            # jika dicatat penerbit root itu sendiri (kunci per root, lihat merkle.revocation_key)
+            exists, root_revoked, is_validated, root_issuer = credential_status[doc["root"]]
+            _, leaf_revoked, _, leaf_issuer = credential_status[doc["revocation_key"]]
+            exists = exists and doc["merkle_ok"]
+            is_revoked = root_revoked or (leaf_revoked and leaf_issuer == root_issuer)
+        else:
+            exists, is_revoked, is_validated, _ = credential_status[bytes(doc["hash"])]
+        verdict["status"] = "revoked" if is_revoked else ("anchored" if exists else "unregistered")
+        verdict["validated"] = is_validated
+
+    verdict["passed"] = (
+        verdict["signature_valid"]
+        and issuer_ok
+        and verdict["status"] != "revoked"
+        and doc["merkle_ok"] is not False
+        and doc.get("digest_ok") is not False
+        and verdict["holder_bound"] is not False
+    )
+    return verdict
+
+def build_report(info, documents, issuer_status, credential_status, block_number):
+    holder = bound_holder(info)
+    verdicts = [
+        evaluate_document(i, doc, issuer_status, credential_status, holder)
+        for i, doc in enumerate(documents, start=1)
+    ]
+    holder_valid, challenge_valid = info.get("holder_valid"), info.get("challenge_valid")
+    return {
+        "type": info["type"],
+        "holder": info["holder"],
+        "holder_valid": holder_valid,
+        "challenge_valid": challenge_valid,
+        "nonce": info.get("nonce"),
+        "audience": info.get("audience"),
+        "block": block_number,
+        "documents": verdicts,
+        "all_passed": (all(v["passed"] for v in verdicts) and holder_valid is not False
+                       and challenge_valid is not False),
+    }
+
+def resolve_status(documents, status_source, revocations=None):
+    """
+    Tahap on-chain (sync) untuk sekumpulan dokumen. `revocations` (opsional,
+    revocation.RevocationIndex) dicek lebih dulu: hash yang sudah tercatat
+    dicabut tidak ditanyakan lagi ke node.
+    Return (issuer_status, credential_status, block_number, jumlah_dicabut_offline).
+    """
+    issuers, hashes = status_keys(documents)
+    leaf_keys = revocation_keys(documents)
+    known = revocations.known_status([h for h in hashes if h not in leaf_keys]) if revocations is not None else {}
+    issuer_status, credential_status, block_number = status_source.resolve_batch(
+        issuers, [h for h in hashes if bytes(h) not in known]
+    )
+    credential_status.update(known)
+    return issuer_status, credential_status, block_number, len(known)
+
+def verify_token(token_data, status_source, revocations=None, bundle=None, audience=None, nonce=None):
+    """
+    Verifikasi sync. `status_source` adalah objek dengan
+    `resolve_batch(issuer_addrs, vc_hashes)` (mis. utils.StatusCache).
+    `bundle` = bundle VC terpisah untuk VP ringkas (opsional);
+    `audience` & `nonce` = tantangan verifier (wajib untuk VP ringkas).
+    """
+    info, documents = prepare_token(token_data, bundle, audience, nonce)
+    issuer_status, credential_status, block_number, revoked_offline = resolve_status(
+        documents, status_source, revocations
+    )
+    report = build_report(info, documents, issuer_status, credential_status, block_number)
+    report["revoked_offline"] = revoked_offline
+    return report
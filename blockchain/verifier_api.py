@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import json
+
+import aiohttp
+from aiohttp import web
+from web3 import AsyncWeb3
+from web3.exceptions import ProviderConnectionError, Web3Exception
+
+import selective_disclosure
+import token_codec
+import utils
+import verification
+
+# --- REGISTRY ASYNC ---
+class AsyncRegistry:
+    """Versi async dari utils.resolve_batch (AsyncWeb3 + AsyncHTTPProvider)."""
+
+    def __init__(self, rpc_url, address, abi):
+        self.w3 = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url))
+        self.w3.middleware_onion.add(utils.RPCMetricsMiddleware, name="rpc_metrics")
+        self.contract = self.w3.eth.contract(address=address, abi=abi)
+
+    async def resolve_batch(self, issuer_addrs, vc_hashes):
+        issuer_keys, hash_keys = utils.batch_keys(issuer_addrs, vc_hashes)
+        block_number = await self.w3.eth.block_number
+        issuers, creds = await self.contract.functions.resolveBatch(issuer_keys, hash_keys).call(
+            block_identifier=block_number
+        )
+        return utils.batch_results(issuer_keys, hash_keys, issuers, creds) + (block_number,)
+
+class _async_span:
+    """utils.metrics.span untuk blok `async with`."""
+
+    def __init__(self, name, **labels):
+        self._span = utils.metrics.span(name, **labels)
+
+    async def __aenter__(self):
+        self._span.__enter__()
+
+    async def __aexit__(self, *exc):
+        self._span.__exit__(*exc)
+
+# --- KODE ERROR ---
+# 400 = token rusak (milik klien), 502/503 = node RPC bermasalah, 504 = timeout,
+# 500 = bug server. Item /verify/batch membawa kode yang sama di field "code".
+NODE_UNAVAILABLE = (ProviderConnectionError, aiohttp.ClientConnectionError, ConnectionError)
+NODE_ERRORS = (Web3Exception, aiohttp.ClientError)
+MALFORMED = (KeyError, IndexError, TypeError, AttributeError, ValueError)
+
+def _error(code, message):
+    return {"error": message, "code": code}
+
+async def _offchain(func, *args):
+    """Tahap off-chain di thread pool; token berstruktur rusak -> TokenFormatError."""
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    except verification.TokenFormatError:
+        raise
+    except MALFORMED as e:
+        raise verification.TokenFormatError(f"Struktur token tidak valid: {e!r}") from e
+
+# --- SERVICE VERIFIKASI (HTTP) ---
+class VerifierService:
+    """
+    Verifikasi VP/VC untuk sistem HR via HTTP.
+
+    Memakai engine yang sama dengan halaman Streamlit (verification.py):
+    tahap off-chain (recover signature, hash) dijalankan di thread pool,
+    tahap on-chain lewat satu `resolveBatch` async. Jumlah verifikasi
+    paralel dibatasi semaphore; timeout per token dihitung sejak token
+    mendapat slot (bukan sejak masuk antrean).
+    """
+
+    def __init__(self, registry, max_concurrency=32, timeout=15.0):
+        self.registry = registry
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def verify(self, token_data, audience=None, nonce=None):
+        """
+        Verifikasi satu token tanpa slot & timeout (lihat _verify_with_timeout).
+        `audience` & `nonce` = tantangan verifier (wajib untuk VP ringkas).
+        """
+        async with _async_span("verify_request"):
+            if selective_disclosure.is_sd_presentation(token_data):
+                report = await _offchain(selective_disclosure.verify_presentation, token_data)
+                status = await self.registry.resolve_batch(*selective_disclosure.status_keys(report))
+                return selective_disclosure.apply_status(report, *status)
+            info, documents = await _offchain(verification.prepare_token, token_data, None, audience, nonce)
+            issuer_status, credential_status, block_number = await self.registry.resolve_batch(
+                *verification.status_keys(documents)
+            )
+            return verification.build_report(info, documents, issuer_status, credential_status, block_number)
+
+    async def _verify_with_timeout(self, token_data, audience=None, nonce=None):
+        # Slot diambil di luar wait_for: waktu antre tidak ikut dihitung timeout
+        try:
+            async with self._slots:
+                return await asyncio.wait_for(self.verify(token_data, audience, nonce), self.timeout)
+        except verification.TokenFormatError as e:
+            return _error(400, str(e))
+        except RecursionError:
+            return _error(400, "Token tidak valid: struktur bersarang terlalu dalam.")
+        except asyncio.TimeoutError:
+            return _error(504, f"Timeout setelah {self.timeout} detik")
+        except NODE_UNAVAILABLE as e:
+            return _error(503, f"Node blockchain tidak bisa dihubungi: {e}")
+        except NODE_ERRORS as e:
+            return _error(502, f"Node blockchain mengembalikan error: {e}")
+        except Exception as e:
+            return _error(500, f"Terjadi kesalahan teknis: {e}")
+
+    # --- Handler HTTP ---
+    async def handle_verify(self, request):
+        """
+        POST /verify?audience=..&nonce=..  body: token VP/VC (JSON, atau token
+        ringkas SSI1 / biner CBOR). Query = tantangan yang diberikan ke holder.
+        """
+        try:
+            token_data = token_codec.loads(await request.read())
+        except json.JSONDecodeError:
+            return web.json_response(_error(400, "Format JSON Error."), status=400)
+        except token_codec.CodecError as e:
+            return web.json_response(_error(400, f"Token ringkas tidak valid: {e}"), status=400)
+        except RecursionError:
+            return web.json_response(_error(400, "Token tidak valid: struktur bersarang terlalu dalam."), status=400)
+        except UnicodeDecodeError:
+            return web.json_response(_error(400, "Token tidak valid: bukan teks UTF-8."), status=400)
+
+        report = await self._verify_with_timeout(
+            token_data, request.query.get("audience"), request.query.get("nonce")
+        )
+        if "error" in report:
+            return web.json_response(report, status=report["code"])
+        return web.json_response(report)
+
+    async def handle_verify_batch(self, request):
+        """
+        POST /verify/batch  body: {"tokens": [token, ...], "audience": .., "nonce": ..}
+        -> {"results": [...]} (urutan sama).
+        """
+        try:
+            body = token_codec.loads(await request.read())
+            tokens = body["tokens"]
+        except (ValueError, RecursionError, KeyError, TypeError):   # termasuk JSON / UTF-8 rusak
+            return web.json_response(_error(400, "Body harus {\"tokens\": [...]}"), status=400)
+
+        audience, nonce = body.get("audience"), body.get("nonce")
+        results = await asyncio.gather(*(self._verify_with_timeout(t, audience, nonce) for t in tokens))
+        return web.json_response({"results": results})
+
+    async def handle_metrics(self, request):
+        """GET /metrics  format teks Prometheus."""
+        return web.Response(text=utils.metrics.render_prometheus(), content_type="text/plain")
+
+    async def handle_health(self, request):
+        return web.json_response({"status": "ok", "connected": await self.registry.w3.is_connected()})
+
+def create_app(rpc_url=utils.RPC_URL, max_concurrency=32, timeout=15.0):
+    contract = utils.get_contract()
+    if contract is None:
+        raise RuntimeError("Artifact contract tidak ditemukan. Jalankan 'forge build'!")
+
+    registry = AsyncRegistry(rpc_url, contract.address, contract.abi)
+    service = VerifierService(registry, max_concurrency=max_concurrency, timeout=timeout)
+
+    app = web.Application(client_max_size=16 * 1024 * 1024)
+    app.router.add_post("/verify", service.handle_verify)
+    app.router.add_post("/verify/batch", service.handle_verify_batch)
+    app.router.add_get("/health", service.handle_health)
+    app.router.add_get("/metrics", service.handle_metrics)
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API verifikasi ijazah (headless).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--max-concurrency", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=15.0, help="Timeout per verifikasi (detik)")
+    args = parser.parse_args()
+
+    web.run_app(
+        create_app(max_concurrency=args.max_concurrency, timeout=args.timeout),
+        host=args.host, port=args.port,
+    )
@@ -1,12 +1,31 @@
 import streamlit as st
 import utils
+import diagnostics
+import verification
+import revocation
+import streaming
+import bulk_verify
+import status_history
+import selective_disclosure
+import token_codec
+import datetime
+import io
 import json
+import os
+import secrets
+import tempfile
 
 # --- KONFIGURASI HALAMAN ---
 st.set_page_config(page_title="Verifier Portal", page_icon="🏦", layout="wide")
+diagnostics.render_panel()
+
+BULK_PREVIEW_ROWS = 1000   # baris hasil massal yang ditampilkan di tabel (laporan lengkap lewat unduhan)
 
 # Load Contract
 contract = utils.get_contract()
+status_cache = utils.get_status_cache(contract) if contract else None
+# Cek pertama: index pencabutan lokal (mmap + Bloom filter), sebelum ke node
+revocations = revocation.get_revocation_index(contract) if contract else None
 
 # --- UI HEADER ---
 st.title("🏦 Portal Verifikasi (HR)")
@@ -21,110 +40,288 @@ if not contract:
 
 st.info(f"🔍 Terhubung ke Registry Blockchain: `{utils.REGISTRY_CONTRACT_ADDRESS}`")
 
-# --- FORM VERIFIKASI ---
-st.divider()
-col_input, col_result = st.columns([1, 1])
-
-with col_input:
-    st.subheader("Input Dokumen")
-    st.write("Tempelkan (Paste) JSON 'Verifiable Presentation' atau 'Credential' dari Mahasiswa:")
-    json_input = st.text_area("JSON Token", height=400)
-    verify_btn = st.button("🔍 Verifikasi Keaslian")
+# --- TAMPILAN VERDICT PER DOKUMEN ---
+def render_verdict(verdict, expanded=True):
+    with st.expander(f"Dokumen #{verdict['index']}: {verdict['degree']}", expanded=expanded):
+        
+        # LANGKAH 1: Verify Signature (Off-Chain Math)
+        st.write(f"**Issuer Diklaim:** `{verdict['issuer_claim']}`")
+        st.write(f"**Penanda Tangan Asli (Recovered):** `{verdict['recovered_did']}`")
+        
+        if verdict["signature_valid"]:
+            st.success("✅ **Integritas:** Signature Valid (Dokumen tidak diedit).")
+        else:
+            st.error("❌ **Integritas:** Signature INVALID! Dokumen korup/palsu.")
+        if verdict["digest_ok"] is False:
+            st.error("❌ **Integritas:** Isi VC di bundle TIDAK cocok dengan digest yang ditandatangani holder.")
+        if verdict.get("holder_bound") is False:
+            st.error("❌ **Kepemilikan:** credentialSubject.id VC ini BUKAN holder yang menandatangani presentasi.")
 
-with col_result:
-    st.subheader("Hasil Analisis")
-    
-    if verify_btn and json_input:
-        try:
-            # Parsing JSON
-            token_data = json.loads(json_input)
+        # LANGKAH 2: Verify Registry (On-Chain Blockchain)
+        issuer = verdict["issuer"]
+        if issuer["active"] and issuer["verified"]:
+            st.success(f"🔹 **Penerbit:** Terverifikasi Resmi sebagai '{issuer['name']}'")
             
-            if "presentation" in token_data:
-                credentials = token_data['presentation']['verifiableCredential']
-                holder_did = token_data['presentation']['holder']
-                st.caption(f"📦 Tipe: Verifiable Presentation (Milik: {holder_did})")
-            elif "credential" in token_data:
-                # Fallback jika user copas VC langsung dari Issuer
-                credentials = [token_data]
-                st.caption("📄 Tipe: Raw Verifiable Credential")
+            # B. Cek Status Dokumen (Anchoring Check)
+            st.code(f"VC Hash: {verdict['vc_hash']}", language="text")
+            if verdict["merkle_root"]:
+                st.code(f"Merkle Root: {verdict['merkle_root']}", language="text")
+                if not verdict["merkle_ok"]:
+                    st.error("❌ **Integritas:** Bukti inklusi Merkle TIDAK cocok dengan root.")
+            
+            if verdict["status"] == "revoked":
+                st.error("🛑 **STATUS: DICABUT (REVOKED)!**")
+                st.error("Dokumen ini sudah dinyatakan TIDAK BERLAKU oleh penerbit.")
+            elif verdict["status"] == "unregistered":
+                st.warning("🔸 **Status: Unregistered (Off-Chain Only)**")
+                st.write("Dokumen ini valid secara kriptografi, tapi hash-nya tidak ditemukan di Blockchain.")
             else:
-                st.error("Format JSON tidak dikenali. Harus format VC atau VP.")
-                st.stop()
+                st.success("✅ **Status: TERDAFTAR AKTIF (Anchored)**")
+                st.write("Dokumen asli dan tercatat di buku besar Blockchain.")
+                
+        else:
+            st.error("❌ **Penerbit:** TIDAK TERDAFTAR / ILEGAL.")
 
-            # --- LOOP VERIFIKASI SETIAP DOKUMEN ---
-            all_passed = True
-            
-            for i, vc_wrapper in enumerate(credentials):
-                if "credential" in vc_wrapper:
-                    vc_content = vc_wrapper['credential']
-                    vc_proof = vc_wrapper['proof']
+def render_conclusion(all_passed):
+    st.divider()
+    if all_passed:
+        st.balloons()
+        st.success("🎉 KESIMPULAN AKHIR: SEMUA DOKUMEN VALID & SAH.")
+    else:
+        st.error("🛑 KESIMPULAN AKHIR: DOKUMEN DITOLAK / BERMASALAH.")
+
+# Mode streaming: hanya sejumlah ini dokumen yang dirender detail, sisanya dihitung
+MAX_RENDERED = 200
+
+def render_holder(holder_valid, nonce=None, audience=None, challenge_valid=None):
+    """Hasil cek signature holder & tantangan audience/nonce (hanya VP ringkas)."""
+    if holder_valid is None:
+        return
+    if holder_valid:
+        st.success("✅ **Holder:** Signature amplop presentasi valid.")
+    else:
+        st.error("❌ **Holder:** Signature amplop presentasi INVALID!")
+    if challenge_valid is False:
+        st.error("❌ **Tantangan:** Audience / nonce tidak sesuai (token dibuat untuk verifier atau sesi lain).")
+    if nonce or audience:
+        st.caption(f"🔖 Nonce: `{nonce}` • Audience: {audience or '-'}")
+
+def challenge_inputs(key):
+    """Input audience & nonce yang diharapkan; nonce acak baru per sesi, diberikan ke holder."""
+    if f"{key}_nonce" not in st.session_state:
+        st.session_state[f"{key}_nonce"] = secrets.token_hex(16)
+    c1, c2 = st.columns(2)
+    audience = c1.text_input("Audience (nama verifier)", key=f"{key}_audience",
+                             help="Wajib untuk VP ringkas: harus sama dengan audience di amplop token")
+    nonce = c2.text_input("Nonce tantangan", key=f"{key}_nonce", help="Berikan ke holder sebelum ia membuat token")
+    return audience or None, nonce or None
+
+def verify_streaming(source, status_source, revocation_index, bundle=None, audience=None, nonce=None):
+    """VP besar / file upload: hasil per dokumen tampil segera setelah diverifikasi."""
+    progress = st.empty()
+    rendered = 0
+    for kind, value in streaming.verify_stream(source, status_source, revocation_index, bundle=bundle,
+                                               audience=audience, nonce=nonce):
+        if kind == "sd_presentation":
+            # Presentasi Selective Disclosure: tidak ada dokumen per VC maupun ringkasan stream
+            progress.empty()
+            render_sd_report(selective_disclosure.verify_sd_token(value, status_source))
+            return
+        if kind == "document":
+            # Dokumen yang lolos dilipat agar yang bermasalah mudah terlihat
+            if rendered < MAX_RENDERED:
+                render_verdict(value, expanded=not value["passed"])
+                rendered += 1
+            progress.info(f"⏳ Diverifikasi: {value['index']} dokumen")
+            continue
+
+        summary = value
+        holder = f" (Milik: {summary['holder']})" if summary["holder"] else ""
+        progress.caption(
+            f"📦 {summary['count']} dokumen{holder} • ✅ {summary['passed']} lolos • ❌ {summary['failed']} gagal "
+            f"• ⛓️ Blok #{summary['block']}"
+        )
+        if summary["count"] > rendered:
+            st.caption(f"ℹ️ Hanya {rendered} dokumen pertama yang ditampilkan detail.")
+        if summary["revoked_offline"]:
+            st.caption(f"⚡ {summary['revoked_offline']} hash terdeteksi dicabut dari index lokal")
+        render_holder(summary["holder_valid"], challenge_valid=summary["challenge_valid"])
+        render_conclusion(summary["all_passed"])
+
+def render_sd_report(report):
+    """Hasil verifikasi presentasi Selective Disclosure (format portal React)."""
+    st.caption(f"🔒 Tipe: Selective Disclosure • {len(report['revealed'])} field dibuka, "
+               f"{report['hidden']} disembunyikan • ⛓️ Blok #{report['block']}")
+    st.write(f"**Issuer Diklaim:** `{report['issuer_did']}`")
+    st.write(f"**Penanda Tangan Asli (Recovered):** `did:ethr:{report['signer']}`")
+    if report["signature_valid"]:
+        st.success("✅ **Integritas:** Hash field & signature daftar hash valid.")
+    else:
+        st.error("❌ **Integritas:** " + ("; ".join(report["errors"]) or "Signature bukan milik issuer yang diklaim."))
+
+    issuer = report["issuer"]
+    if issuer["active"] and issuer["verified"]:
+        st.success(f"🔹 **Penerbit:** Terverifikasi Resmi sebagai '{issuer['name']}'")
+    else:
+        st.error("❌ **Penerbit:** TIDAK TERDAFTAR / ILEGAL.")
+    st.code(f"VC Hash: {report['anchor_hash']}", language="text")
+    if report["status"] == "revoked":
+        st.error("🛑 **STATUS: DICABUT (REVOKED)!**")
+    elif report["status"] == "unregistered":
+        st.warning("🔸 **Status: Unregistered (Off-Chain Only)**")
+    else:
+        st.success("✅ **Status: TERDAFTAR AKTIF (Anchored)**" + (" • Tervalidasi PDDikti" if report["validated"] else ""))
+
+    st.dataframe([{"field": key, "nilai": value} for key, value in report["revealed"].items()],
+                 hide_index=True, use_container_width=True)
+    render_conclusion(report["passed"])
+
+tab_single, tab_bulk = st.tabs(["🔍 Verifikasi Tunggal", "📥 Verifikasi Massal"])
+
+# --- FORM VERIFIKASI ---
+with tab_single:
+    st.divider()
+    col_input, col_result = st.columns([1, 1])
+
+    with col_input:
+        st.subheader("Input Dokumen")
+        st.write("Tempelkan (Paste) JSON 'Verifiable Presentation' atau 'Credential' dari Mahasiswa (atau teks ringkas SSI1:...):")
+        json_input = st.text_area("JSON Token", height=400)
+        uploaded = st.file_uploader("Atau unggah file VP/VC (JSON / SSI1)", type=["json", "txt", "ssi"])
+        bundle_file = st.file_uploader("Bundle VC (opsional, untuk VP ringkas dengan bundle terpisah)", type=["json", "txt", "ssi"])
+        stream_mode = st.toggle("⚡ Mode streaming (VP besar)", help="Parse & verifikasi per dokumen, hasil tampil bertahap")
+        expected_audience, expected_nonce = challenge_inputs("single")
+
+        # Status per waktu tertentu (mis. tanggal kandidat diterima kerja)
+        as_of_mode = st.radio("📅 Status per", ["Saat ini", "Tanggal & jam", "Nomor blok"], horizontal=True)
+        as_of_time, as_of_block = None, None
+        if as_of_mode == "Tanggal & jam":
+            c1, c2 = st.columns(2)
+            as_of_date = c1.date_input("Tanggal")
+            as_of_clock = c2.time_input("Jam", value=datetime.time(23, 59))
+            as_of_time = int(datetime.datetime.combine(as_of_date, as_of_clock).timestamp())
+        elif as_of_mode == "Nomor blok":
+            as_of_block = int(st.number_input("Blok", min_value=0, value=0, step=1))
+        if as_of_mode != "Saat ini":
+            # Riwayat disinkronkan di background (status_history.get_status_history)
+            history = status_history.get_status_history(contract)
+            st.caption(f"📜 Index riwayat: sampai Blok #{history.cursor()} (head #{utils.w3.eth.block_number})")
+        verify_btn = st.button("🔍 Verifikasi Keaslian")
+
+    with col_result:
+        st.subheader("Hasil Analisis")
+    
+        if verify_btn and (json_input or uploaded):
+            try:
+                if as_of_mode == "Saat ini":
+                    # Index pencabutan disinkronkan di background (revocation.get_revocation_index)
+                    status_source, revocation_index = status_cache, revocations
                 else:
-                    # Jika format raw W3C
-                    vc_content = vc_wrapper.copy()
-                    if "proof" in vc_content:
-                        del vc_content["proof"] # Proof harus dipisah saat verify signature
-                    vc_proof = vc_wrapper["proof"]
-
-                # Ambil Data Kunci
-                issuer_did_claim = vc_content['issuer']
-                degree_name = vc_content['credentialSubject']['data'].get('degree', 'Dokumen Tanpa Judul')
-                
-                with st.expander(f"Dokumen #{i+1}: {degree_name}", expanded=True):
-                    
-                    # LANGKAH 1: Verify Signature (Off-Chain Math)
-                    signature = vc_proof['jws']
-                    recovered_signer_addr = utils.verify_signature(vc_content, signature)
-                    recovered_did = f"did:ethr:{recovered_signer_addr}"
-                    
-                    st.write(f"**Issuer Diklaim:** `{issuer_did_claim}`")
-                    st.write(f"**Penanda Tangan Asli (Recovered):** `{recovered_did}`")
-                    
-                    check_1 = (recovered_did == issuer_did_claim)
-                    if check_1:
-                        st.success("✅ **Integritas:** Signature Valid (Dokumen tidak diedit).")
+                    # Riwayat event: index pencabutan (state terkini) tidak dipakai
+                    status_source, revocation_index = history.at(block=as_of_block, timestamp=as_of_time), None
+                    if status_source.block is None:
+                        st.warning("📅 Waktu yang dipilih sebelum blok pertama: belum ada data apa pun.")
                     else:
-                        st.error("❌ **Integritas:** Signature INVALID! Dokumen korup/palsu.")
-                        all_passed = False
+                        st.caption(f"📅 Status historis per Blok #{status_source.block}")
 
-                    # LANGKAH 2: Verify Registry (On-Chain Blockchain)
-                    # Panggil Smart Contract resolveDID
-                    is_active, is_verified, org_name, _ = contract.functions.resolveDID(recovered_signer_addr).call()
-    
-                    if is_active and is_verified:
-                        st.success(f"🔹 **Penerbit:** Terverifikasi Resmi sebagai '{org_name}'")
-                        
-                        # B. Cek Status Dokumen (Anchoring Check)
-                        # Hitung ulang hash dari data yang kita terima
-                        vc_hash_check = utils.hash_json(vc_content)
-                        st.code(f"VC Hash: {vc_hash_check.hex()}", language="text")
-                        
-                        # Panggil Smart Contract
-                        exists, is_revoked, real_issuer = contract.functions.verifyCredentialStatus(vc_hash_check).call()
-                        
-                        if is_revoked:
-                            st.error("🛑 **STATUS: DICABUT (REVOKED)!**")
-                            st.error("Dokumen ini sudah dinyatakan TIDAK BERLAKU oleh penerbit.")
-                            all_passed = False
-                        elif not exists:
-                            st.warning("🔸 **Status: Unregistered (Off-Chain Only)**")
-                            st.write("Dokumen ini valid secara kriptografi, tapi hash-nya tidak ditemukan di Blockchain.")
-                        else:
-                            st.success("✅ **Status: TERDAFTAR AKTIF (Anchored)**")
-                            st.write("Dokumen asli dan tercatat di buku besar Blockchain.")
-                            
+                bundle = token_codec.loads(bundle_file.getvalue()) if bundle_file is not None else None
+                raw = uploaded.getvalue() if uploaded is not None else json_input
+                # File upload JSON / mode streaming di-parse inkremental (tidak di-json.loads utuh),
+                # selain itu (token ringkas / teks tempelan) di-parse utuh sekali. Keduanya dipilah
+                # menurut struktur token: presentasi Selective Disclosure punya key hiddenHashes.
+                streamed = not token_codec.is_compact(raw) and (uploaded is not None or stream_mode)
+                token_data = None if streamed else token_codec.loads(raw)
+                if streamed:
+                    verify_streaming(uploaded if uploaded is not None else io.BytesIO(json_input.encode("utf-8")),
+                                     status_source, revocation_index, bundle, expected_audience, expected_nonce)
+                elif selective_disclosure.is_sd_presentation(token_data):
+                    render_sd_report(selective_disclosure.verify_sd_token(token_data, status_source))
+                else:
+                    report = verification.verify_token(token_data, status_source, revocation_index, bundle,
+                                                       expected_audience, expected_nonce)
+
+                    if report["type"] == "presentation":
+                        st.caption(f"📦 Tipe: Verifiable Presentation (Milik: {report['holder']})")
                     else:
-                        st.error("❌ **Penerbit:** TIDAK TERDAFTAR / ILEGAL.")
-                        all_passed = False
+                        st.caption("📄 Tipe: Raw Verifiable Credential")
+                    st.caption(f"⛓️ Status dibaca dari Blok #{report['block']}")
+                    if report["revoked_offline"]:
+                        st.caption(f"⚡ {report['revoked_offline']} hash terdeteksi dicabut dari index lokal "
+                                   f"({len(revocation_index):,} pencabutan tercatat)")
 
+                    render_holder(report["holder_valid"], report["nonce"], report["audience"], report["challenge_valid"])
 
-            st.divider()
-            if all_passed:
-                st.balloons()
-                st.success("🎉 KESIMPULAN AKHIR: SEMUA DOKUMEN VALID & SAH.")
-            else:
-                st.error("🛑 KESIMPULAN AKHIR: DOKUMEN DITOLAK / BERMASALAH.")
+                    # --- LAPORAN SETIAP DOKUMEN ---
+                    for verdict in report["documents"]:
+                        render_verdict(verdict)
+                    render_conclusion(report["all_passed"])
+
+            except json.JSONDecodeError:
+                st.error("Format JSON Error.")
+            except token_codec.CodecError as e:
+                st.error(f"Token ringkas tidak valid: {e}")
+            except verification.TokenFormatError as e:
+                st.error(str(e))
+            except RecursionError as e:
+                st.error(f"Token tidak valid: {e}")
+            except status_history.HistoryNotSynced as e:
+                st.warning(f"⏳ {e} Coba lagi setelah sinkronisasi selesai.")
+            except Exception as e:
+                st.error(f"Terjadi kesalahan teknis: {str(e)}")
+
+# --- VERIFIKASI MASSAL (Satu angkatan pelamar) ---
+with tab_bulk:
+    st.subheader("📥 Verifikasi Massal")
+    st.write("Unggah **JSONL** (satu token VP/VC per baris, boleh `{\"applicant\": ..., \"token\": ...}`) "
+             "atau **ZIP** berisi file `.json` / `.jsonl`.")
+    tokens_file = st.file_uploader("File token pelamar", type=["jsonl", "ndjson", "zip"], key="bulk_file")
+    c1, c2 = st.columns(2)
+    workers = c1.number_input("Worker process", min_value=1, max_value=64, value=os.cpu_count() or 1)
+    chunk_size = c2.number_input("Token per chunk", min_value=16, max_value=4096, value=256, step=16)
+    # Satu tantangan untuk seluruh angkatan (diumumkan ke semua pelamar)
+    bulk_audience, bulk_nonce = challenge_inputs("bulk")
+
+    if st.button("🚀 Verifikasi Semua", disabled=tokens_file is None):
+        bulk = bulk_verify.BulkVerifier(status_cache, revocations, workers=int(workers), chunk_size=int(chunk_size),
+                                        audience=bulk_audience, nonce=bulk_nonce)
+        progress = st.empty()
+
+        def on_progress(stats):
+            progress.info(
+                f"⏳ {stats['tokens']:,} token • {stats['tokens_per_sec']:,.1f} token/detik • "
+                f"{stats['unique_credentials']:,} VC unik dari {stats['credentials']:,} • "
+                f"{stats['resolved_issuers']} issuer & {stats['resolved_hashes']:,} hash di-resolve"
+            )
+
+        try:
+            # Laporan ditulis bertahap ke file sementara di disk; yang ditahan di memori
+            # hanya penghitung dan pratinjau BULK_PREVIEW_ROWS baris pertama
+            with tempfile.TemporaryFile("w+", newline="", encoding="utf-8") as csv_out, \
+                    tempfile.TemporaryFile("w+", encoding="utf-8") as json_out:
+                preview, counts = [], {"total": 0, "passed": 0}
+
+                def collect(rows):
+                    for result, verdicts in rows:
+                        counts["total"] += 1
+                        counts["passed"] += bool(result["all_passed"])
+                        if len(preview) < BULK_PREVIEW_ROWS:
+                            preview.append(result)
+                        yield result, verdicts
 
-        except json.JSONDecodeError:
-            st.error("Format JSON Error.")
+                bulk_verify.write_reports(collect(bulk.run(bulk_verify.read_tokens(tokens_file), on_progress)),
+                                          csv_out, json_out)
+                total, passed = counts["total"], counts["passed"]
+                progress.success(f"✅ {total:,} pelamar selesai dalam {bulk.stats['seconds']:.1f} detik "
+                                 f"({bulk.stats['tokens_per_sec']:,.1f} token/detik) • {passed:,} lolos, "
+                                 f"{total - passed:,} bermasalah")
+                if total > len(preview):
+                    st.caption(f"Menampilkan {len(preview):,} dari {total:,} pelamar; unduh laporan untuk data lengkap.")
+                st.dataframe(preview, hide_index=True, use_container_width=True)
+                csv_out.seek(0)
+                json_out.seek(0)
+                d1, d2 = st.columns(2)
+                d1.download_button("⬇️ Laporan CSV", csv_out, file_name="verifikasi_pelamar.csv", mime="text/csv")
+                d2.download_button("⬇️ Laporan JSON", json_out, file_name="verifikasi_pelamar.json",
+                                   mime="application/json")
         except Exception as e:
-            st.error(f"Terjadi kesalahan teknis: {str(e)}")
\ No newline at end of file
+            st.error(f"Terjadi kesalahan teknis: {str(e)}")
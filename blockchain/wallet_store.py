@@ -0,0 +1,172 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import utils
+
+DB_PATH = "data/holder_wallet.db"
+LEGACY_JSON = "holder_wallet.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS credentials (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    vc_hash        TEXT NOT NULL UNIQUE,
+    issuer         TEXT,
+    degree         TEXT,
+    issuance_date  TEXT,
+    added_at       REAL NOT NULL,
+    body           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cred_issuer ON credentials (issuer);
+CREATE INDEX IF NOT EXISTS idx_cred_degree ON credentials (degree);
+CREATE INDEX IF NOT EXISTS idx_cred_issued ON credentials (issuance_date);
+CREATE TABLE IF NOT EXISTS migrations (
+    source      TEXT PRIMARY KEY,
+    migrated_at REAL NOT NULL
+);
+"""
+
+def _index_fields(vc):
+    """Kolom index yang diambil dari VC (format {credential, proof})."""
+    credential = vc["credential"]
+    data = credential.get("credentialSubject", {}).get("data", {})
+    return (
+        "0x" + utils.hash_json(credential).hex(),
+        credential.get("issuer"),
+        data.get("degree"),
+        credential.get("issuanceDate"),
+    )
+
+# --- PENYIMPANAN WALLET MAHASISWA ---
+class WalletStore:
+    """
+    Penyimpanan wallet berbasis SQLite (pengganti holder_wallet.json).
+
+    Setiap simpan/ubah adalah satu transaksi atomik per kredensial, jadi
+    wallet tidak pernah ditulis ulang utuh dan tetap konsisten walau
+    proses mati di tengah jalan. Index sekunder: issuer DID, gelar,
+    tanggal terbit, dan VC hash (unik, sekaligus mencegah duplikat).
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with self._db() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        return conn
+
+    @contextmanager
+    def _db(self, op="query"):
+        conn = self._connect()
+        try:
+            with utils.metrics.span("wallet_io", op=op), conn:  # commit jika sukses, rollback jika error
+                yield conn
+        finally:
+            conn.close()
+
+    # --- Tulis ---
+    def add(self, vc):
+        """Simpan satu VC. Return id baru, atau None jika VC yang sama sudah ada."""
+        vc_hash, issuer, degree, issued = _index_fields(vc)
+        with self._db("add") as conn:
+            cur = conn.execute(
+                """INSERT OR IGNORE INTO credentials (vc_hash, issuer, degree, issuance_date, added_at, body)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (vc_hash, issuer, degree, issued, time.time(), json.dumps(vc)),
+            )
+            return cur.lastrowid if cur.rowcount else None
+
+    def update(self, cred_id, vc):
+        vc_hash, issuer, degree, issued = _index_fields(vc)
+        with self._db("update") as conn:
+            conn.execute(
+                """UPDATE credentials SET vc_hash = ?, issuer = ?, degree = ?, issuance_date = ?, body = ?
+                   WHERE id = ?""",
+                (vc_hash, issuer, degree, issued, json.dumps(vc), cred_id),
+            )
+
+    def delete(self, cred_id):
+        with self._db("delete") as conn:
+            conn.execute("DELETE FROM credentials WHERE id = ?", (cred_id,))
+
+    # --- Baca ---
+    @staticmethod
+    def _where(issuer=None, degree=None, vc_hash=None):
+        clauses, args = [], []
+        for column, value in (("issuer", issuer), ("degree", degree), ("vc_hash", vc_hash)):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", tuple(args)
+
+    def count(self, **filters):
+        where, args = self._where(**filters)
+        with self._db() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM credentials {where}", args).fetchone()[0]
+
+    def page(self, limit=20, offset=0, **filters):
+        """Satu halaman VC: list (id, vc). Hanya baris halaman ini yang di-parse."""
+        where, args = self._where(**filters)
+        with self._db("page") as conn:
+            rows = conn.execute(
+                f"SELECT id, body FROM credentials {where} ORDER BY issuance_date DESC, id DESC LIMIT ? OFFSET ?",
+                args + (limit, offset),
+            ).fetchall()
+        return [(row["id"], json.loads(row["body"])) for row in rows]
+
+    def summaries(self, limit=50, offset=0, **filters):
+        """Ringkasan (id, degree, issuer, issuance_date) tanpa parse body JSON."""
+        where, args = self._where(**filters)
+        with self._db("page") as conn:
+            rows = conn.execute(
+                f"""SELECT id, degree, issuer, issuance_date FROM credentials {where}
+                    ORDER BY issuance_date DESC, id DESC LIMIT ? OFFSET ?""",
+                args + (limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_many(self, cred_ids):
+        if not cred_ids:
+            return []
+        marks = ",".join("?" * len(cred_ids))
+        with self._db("get") as conn:
+            rows = conn.execute(f"SELECT id, body FROM credentials WHERE id IN ({marks})", tuple(cred_ids)).fetchall()
+        by_id = {row["id"]: json.loads(row["body"]) for row in rows}
+        return [by_id[i] for i in cred_ids if i in by_id]
+
+    def distinct(self, column):
+        """Nilai unik kolom index (untuk filter UI)."""
+        assert column in ("issuer", "degree")
+        with self._db() as conn:
+            return [r[0] for r in conn.execute(f"SELECT DISTINCT {column} FROM credentials ORDER BY 1")]
+
+    # --- Migrasi dari wallet JSON lama ---
+    def migrate_json(self, filename=LEGACY_JSON):
+        """
+        Import `data/<filename>` (format utils.save_db) satu kali.
+        Return jumlah VC yang diimport (0 jika sudah pernah / file tidak ada).
+        """
+        with self._db() as conn:
+            if conn.execute("SELECT 1 FROM migrations WHERE source = ?", (filename,)).fetchone():
+                return 0
+
+        imported = 0
+        for vc in utils.load_db(filename).get("credentials", []):
+            if self.add(vc) is not None:
+                imported += 1
+
+        with self._db() as conn:
+            conn.execute("INSERT OR REPLACE INTO migrations VALUES (?, ?)", (filename, time.time()))
+        return imported
+
+if __name__ == "__main__":
+    store = WalletStore()
+    print(f"📦 Migrasi {LEGACY_JSON}: {store.migrate_json()} kredensial diimport, total {store.count()}")